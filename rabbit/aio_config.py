@@ -1,5 +1,8 @@
 import logging
+from typing import List, Optional
+
 import aio_pika
+from aio_pika import ExchangeType
 
 # DEFAULT_LOG_FORMAT = "[%(asctime)s.%(msecs)03d] %(funcName)20s %(module)s:%(lineno)d %(levelname)-8s - %(message)s"
 DEFAULT_LOG_FORMAT = "[%(module)s:%(lineno)d %(levelname)-6s - %(message)s"
@@ -14,6 +17,9 @@ class RabbitMQConfig:
         dlx_name: str,  # Имя Dead Letter Exchange (DLX)
         dlx_key: str,  # Имя Dead Letter Queue (DLQ)
         connection_url: str,  # URL подключения к RabbitMQ
+        exchange_type: ExchangeType = ExchangeType.TOPIC,  # Тип основного обменника
+        dlx_exchange_type: ExchangeType = ExchangeType.FANOUT,  # Тип DLX
+        binding_keys: Optional[List[str]] = None,  # Ключи привязки основной очереди
     ):
         """
         Конфигурация RabbitMQ для микросервиса.
@@ -23,12 +29,21 @@ class RabbitMQConfig:
         :param dlx_name: Имя Dead Letter Exchange (DLX).
         :param dlx_key: Имя Dead Letter Queue (DLQ).
         :param connection_url: URL подключения к RabbitMQ.
+        :param exchange_type: Тип основного обменника (topic/direct/fanout).
+        :param dlx_exchange_type: Тип DLX (fanout собирает все отклонённые сообщения).
+        :param binding_keys: Ключи, с которыми основная очередь привязывается
+        к своему обменнику (по умолчанию - только routing_key).
         """
         self.exchange_name = exchange_name
         self.routing_key = routing_key
         self.dlx_name = dlx_name
         self.dlx_key = dlx_key
         self.connection_url = connection_url
+        self.exchange_type = ExchangeType(exchange_type)
+        self.dlx_exchange_type = ExchangeType(dlx_exchange_type)
+        self.binding_keys = (
+            list(binding_keys) if binding_keys is not None else [routing_key]
+        )
 
 
 # Общая конфигурация для подключения к RabbitMQ
@@ -3,19 +3,39 @@ import json
 import logging
 import os
 import socket
+import time
 import uuid
-from typing import Dict, Any, Callable, Optional, Union, List
+from dataclasses import dataclass
+from typing import (
+    Dict,
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    Optional,
+    Union,
+    List,
+    Set,
+    Type,
+)
 
 import aio_pika
-from aio_pika import IncomingMessage
 from aio_pika.abc import (
     AbstractChannel,
+    AbstractExchange,
     AbstractQueue,
     AbstractIncomingMessage,
     ExchangeType,
 )
+from pydantic import BaseModel
 
+from rabbit import metrics
 from rabbit.aio_config import RabbitMQConfig
+from rabbit.circuit_breaker import CircuitBreaker
+from rabbit.log_utils import PayloadLogger
+from rabbit.tracing import extract, inject, trace_span
+from rabbit.supervisor import RabbitSupervisor
+from rabbit.transport import connect_with_backoff
 
 logging.basicConfig(
     level=logging.INFO,  # Установите уровень на INFO
@@ -23,6 +43,47 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 log.setLevel(logging.INFO)
+# Тела сообщений: выключено по умолчанию, см. rabbit.log_utils.enable_payload_logging
+payload_log = PayloadLogger(__name__)
+
+
+MessageCallback = Callable[[Any], Awaitable[Any]]
+
+# Крайний срок RPC-запроса: unix-время в миллисекундах. После него вызывающий
+# ответа уже не ждёт, и консьюмер не начинает (или прерывает) обработку
+DEADLINE_HEADER = "x-deadline"
+
+
+def message_deadline(headers: Optional[Dict[str, Any]]) -> Optional[float]:
+    """
+    Крайний срок сообщения в секундах unix-времени (None - без срока).
+    """
+    if not headers:
+        return None
+    value = headers.get(DEADLINE_HEADER)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value / 1000
+    return None
+
+
+@dataclass(frozen=True)
+class MessageHandler:
+    """
+    Обработчик сообщений одного типа.
+
+    --- callback: Корутина, получающая тело сообщения (модель или словарь).
+    Для RPC-запросов возвращаемое значение отправляется в reply_to.
+    --- model: Pydantic-модель для валидации тела (None - словарь без валидации).
+    """
+
+    callback: MessageCallback
+    model: Optional[Type[BaseModel]] = None
+
+    def parse(self, body: bytes) -> Any:
+        if self.model is not None:
+            # Валидация сразу из bytes, без промежуточного словаря
+            return self.model.model_validate_json(body)
+        return json.loads(body)
 
 
 class AsyncRabbitBase:
@@ -31,13 +92,19 @@ class AsyncRabbitBase:
     Предоставляет методы для управления соединениями и объявления очередей.
     """
 
-    def __init__(self, config: RabbitMQConfig):
+    def __init__(
+        self,
+        config: RabbitMQConfig,
+        supervisor: Optional[RabbitSupervisor] = None,
+    ):
         """
         Инициализация базового класса.
 
         :param config: Конфигурация RabbitMQ для текущего сервиса.
+        :param supervisor: Супервизор соединения (если не передан - создаётся свой).
         """
         self.config = config
+        self.supervisor = supervisor or RabbitSupervisor(config.connection_url)
         self.pending_responses: Dict[str, asyncio.Future] = (
             {}
         )  # Хранилище ожидающих ответов
@@ -45,77 +112,74 @@ class AsyncRabbitBase:
     async def connect_with_retry(
         self,
         connection_url: str,
-        max_retries: int = 10,
-        delay: int = 5,
+        max_retries: Optional[int] = 10,
+        delay: float = 0.2,
     ) -> aio_pika.abc.AbstractRobustConnection:
         """
-        Подключение к RabbitMQ с механизмом повторных попыток.
+        Подключение к RabbitMQ с экспоненциальным backoff и jitter.
 
         :param connection_url: URL для подключения
         :param max_retries: Максимальное количество попыток
-        :param delay: Задержка между попытками в секундах
+        :param delay: Базовая задержка между попытками в секундах
         :return: Соединение с RabbitMQ
         """
         log.warning(f"🔗 Попытка подключения к RabbitMQ по URL: {connection_url}")
-        for attempt in range(max_retries):
-            try:
-                connection = await aio_pika.connect_robust(connection_url)
-                log.warning(
-                    f"✅ Успешное подключение к RabbitMQ (попытка {attempt + 1})"
-                )
-                return connection
-            except Exception as e:
-                log.warning(
-                    f"⚠️ Ошибка подключения к RabbitMQ (попытка {attempt + 1}/{max_retries}): {e}"
-                )
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(delay)
-                else:
-                    log.error(
-                        "❌ Не удалось подключиться к RabbitMQ после всех попыток"
-                    )
-                    raise
+        return await connect_with_backoff(
+            connection_url, max_retries=max_retries, base_delay=delay
+        )
 
     async def get_connection(self) -> aio_pika.abc.AbstractRobustConnection:
         """
-        Установить соединение с RabbitMQ.
+        Получить общее соединение с RabbitMQ от супервизора.
+
+        Соединение принадлежит супервизору - закрывать его нельзя.
 
         :return: Объект соединения aio_pika.RobustConnection.
         """
-        # return await aio_pika.connect_robust(self.config.connection_url)
-        return await self.connect_with_retry(self.config.connection_url)
+        return await self.supervisor.start()
 
     async def declare_infrastructure(
         self,
         channel: AbstractChannel,
         additional_bindings: Optional[List[Dict[str, str]]] = None,
+        robust: bool = True,
     ) -> AbstractQueue:
         """
         Объявить инфраструктуру RabbitMQ: DLX, DLQ, основной обменник и очередь.
+        Объявление идемпотентно и повторяется после восстановления соединения.
         :param channel: Канал для декларации объектов.
-        :param additional_bindings: Список дополнительных привязок.
+        :param additional_bindings: Список дополнительных привязок
+        (exchange_name, routing_key и необязательный exchange_type, по умолчанию topic).
+        :param robust: Запоминать ли объекты в robust-канале для автоматического
+        восстановления (при повторном объявлении после reconnect - False).
         :return: Объект основной очереди.
         """
         # Объявляем Dead Letter Exchange (DLX)
         dlx_exchange = await channel.declare_exchange(
             self.config.dlx_name,
-            aio_pika.ExchangeType.FANOUT,
+            self.config.dlx_exchange_type,
             durable=False,  # Durable (это сохраняет обменник в хранилище)
+            robust=robust,
         )
         log.info(
             f"✅ DLX (Dead Letter Exchange) объявлен: {dlx_exchange.name}\n🔺 Это обменник для обработки сообщений, которые не могут быть доставлены.🔻\n"
         )
 
         # Объявляем Dead Letter Queue (DLQ)
-        dlq = await channel.declare_queue(self.config.dlx_key, durable=False)
-        await dlq.bind(dlx_exchange)
+        dlq = await channel.declare_queue(
+            self.config.dlx_key, durable=False, robust=robust
+        )
+        await dlq.bind(dlx_exchange, robust=robust)
         log.info(
             f"🔗 DLQ (Dead Letter Queue) объявлена и привязана: {dlq.name}\n🔺 Это очередь для хранения недоставленных сообщений.🔻\n"
         )
 
         # Объявляем основной обменник
         main_exchange = await channel.declare_exchange(
-            self.config.exchange_name, aio_pika.ExchangeType.FANOUT, durable=False
+            self.config.exchange_name,
+            self.config.exchange_type,
+            durable=False,
+            robust=robust,
         )
         log.info(
             f"📦 Основной обменник объявлен: {main_exchange.name}\n🔺 Это основной обменник для маршрутизации сообщений в систему.🔻\n"
@@ -126,8 +190,11 @@ class AsyncRabbitBase:
             self.config.routing_key,
             durable=True,
             arguments={"x-dead-letter-exchange": self.config.dlx_name},
+            robust=robust,
         )
-        await main_queue.bind(main_exchange, routing_key=self.config.routing_key)
+        # Привязываем только нужные ключи - в очередь не попадают чужие события
+        for binding_key in self.config.binding_keys:
+            await main_queue.bind(main_exchange, routing_key=binding_key, robust=robust)
         log.info(
             f"📬 Основная очередь объявлена и привязана: {main_queue.name}\n🔺 Это очередь, в которую будут поступать сообщения, связанные с ключом маршрутизации.🔻\n"
         )
@@ -137,9 +204,14 @@ class AsyncRabbitBase:
                 exchange_name = binding["exchange_name"]
                 routing_key = binding.get("routing_key", "")
                 extra_exchange = await channel.declare_exchange(
-                    exchange_name, aio_pika.ExchangeType.FANOUT, durable=False
+                    exchange_name,
+                    binding.get("exchange_type", ExchangeType.TOPIC),
+                    durable=False,
+                    robust=robust,
+                )
+                await main_queue.bind(
+                    extra_exchange, routing_key=routing_key, robust=robust
                 )
-                await main_queue.bind(extra_exchange, routing_key=routing_key)
                 log.info(
                     f"🔗 Очередь {main_queue.name} привязана к обменнику {exchange_name} "
                     f"с ключом маршрутизации '{routing_key}'"
@@ -147,36 +219,191 @@ class AsyncRabbitBase:
                 log.debug(f"Дополнительная привязка: {binding}")
         return main_queue
 
+    async def resolve_response(
+        self, message: Union[AbstractIncomingMessage, Dict[str, Any]]
+    ) -> None:
+        """
+        Сопоставить ответ на RPC-запрос с ожидающим future по correlation_id.
+
+        :param message: Входящее сообщение или уже декодированное тело ответа.
+        """
+        if isinstance(message, dict):
+            correlation_id = message.get("correlation_id")
+            body = message
+        elif hasattr(message, "body"):
+            # AbstractIncomingMessage или сообщение брокера в памяти
+            correlation_id = message.correlation_id
+            body = json.loads(message.body.decode())
+        else:
+            raise ValueError("Неизвестный тип сообщения!")
+
+        log.debug("📥 Получен ответ с correlation_id=%s", correlation_id)
+        payload_log.log("📥 Тело ответа correlation_id=%s:", body, correlation_id)
+
+        if correlation_id and correlation_id in self.pending_responses:
+            future = self.pending_responses.pop(correlation_id)
+            if not future.done():
+                future.set_result(body)
+        else:
+            log.warning(
+                "❗Получен ответ с неизвестным correlation_id=%s", correlation_id
+            )
+
 
 # Класс продюсера для микросервиса
 class ServicePublisher(AsyncRabbitBase):
     """
     Класс для публикации сообщений в RabbitMQ для конкретного микросервиса.
+
+    Использует общий канал супервизора: топология и очередь для RPC-ответов
+    объявляются один раз при старте и повторно после восстановления соединения.
     """
 
-    async def publish_message(self, message: Dict[str, Any]) -> None:
+    def __init__(
+        self,
+        config: RabbitMQConfig,
+        supervisor: Optional[RabbitSupervisor] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+    ):
+        """
+        :param failure_threshold: RPC-таймаутов подряд, после которых запросы
+        к этому получателю завершаются сразу (circuit breaker).
+        :param reset_timeout: Через сколько секунд пропустить пробный запрос.
+        """
+        super().__init__(config, supervisor)
+        self._exchange: Optional[AbstractExchange] = None  # Основной обменник
+        self._reply_queue: Optional[AbstractQueue] = None  # Очередь RPC-ответов
+        self._start_lock = asyncio.Lock()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}  # Очередь получателя -> цепь
+
+    def circuit_breaker(self, target: str) -> CircuitBreaker:
+        """
+        Circuit breaker для RPC-получателя (ключа маршрутизации запроса).
+        """
+        breaker = self._breakers.get(target)
+        if breaker is None:
+            breaker = self._breakers[target] = CircuitBreaker(
+                target,
+                failure_threshold=self.failure_threshold,
+                reset_timeout=self.reset_timeout,
+            )
+        return breaker
+
+    async def start(self) -> None:
+        """
+        Объявить топологию продюсера (идемпотентно).
+        """
+        async with self._start_lock:
+            if self._exchange is None:
+                await self.supervisor.add_topology_hook(self._declare_topology)
+
+    async def _declare_topology(self, reconnect: bool) -> None:
+        channel = await self.supervisor.shared_channel()
+        await self.declare_infrastructure(channel, robust=not reconnect)
+        if reconnect:
+            # Обменник и очередь ответов восстановлены robust-каналом
+            return
+        # Получаем объявленный обменник
+        self._exchange = await channel.declare_exchange(
+            self.config.exchange_name, self.config.exchange_type, durable=False
+        )
+        # Одна очередь ответов на продюсера вместо временной очереди на каждый запрос
+        self._reply_queue = await channel.declare_queue(exclusive=True)
+        await self._reply_queue.consume(self.resolve_response, no_ack=True)
+
+    async def publish_message(
+        self, message: Dict[str, Any], routing_key: Optional[str] = None
+    ) -> None:
         """
         Отправить сообщение в обменник.
 
         :param message: Тело сообщения в формате словаря.
+        :param routing_key: Ключ маршрутизации (тип события, например "user.created");
+        по умолчанию - routing_key из конфигурации.
         """
-        connection = await self.get_connection()
-        async with connection:
-            channel = await connection.channel()
-            await self.declare_infrastructure(channel)
-            # Получаем объявленный обменник
-            exchange = await channel.declare_exchange(
-                self.config.exchange_name, aio_pika.ExchangeType.FANOUT, durable=False
-            )
-            message_body = json.dumps(message)
-            log.info(
-                f"📤 Отправка сообщения: {message_body}\n🔺 Сообщение будет отправлено в {self.config.exchange_name} обменник для дальнейшей обработки.🔻\n"
+        started = time.perf_counter()
+        await self.start()
+        routing_key = routing_key or self.config.routing_key
+        exchange_name = self.config.exchange_name
+        message_body = json.dumps(message)
+        log.debug(
+            "📤 Отправка сообщения в обменник %s с ключом '%s'",
+            self.config.exchange_name,
+            routing_key,
+        )
+        payload_log.log("📤 Тело сообщения '%s':", message, routing_key)
+
+        # publish ждёт подтверждения брокера (publisher confirms канала)
+        with trace_span(
+            f"publish {routing_key}", **{"messaging.destination": exchange_name}
+        ), metrics.CONFIRM_DURATION.labels(exchange_name).time():
+            await self._exchange.publish(
+                # Тип сообщения в свойствах AMQP: консьюмер выбирает обработчик без разбора тела
+                aio_pika.Message(
+                    body=message_body.encode(),
+                    type=routing_key,
+                    headers=inject(),  # Контекст трассировки для консьюмера
+                ),
+                routing_key=routing_key,
             )
+        metrics.MESSAGES_PUBLISHED.labels(exchange_name, routing_key).inc()
+        metrics.PUBLISH_DURATION.labels(exchange_name).observe(
+            time.perf_counter() - started
+        )
 
-            await exchange.publish(
-                aio_pika.Message(body=message_body.encode()),
-                routing_key="",
-            )
+    async def publish_many(
+        self, messages: Iterable[Dict[str, Any]], routing_key: Optional[str] = None
+    ) -> int:
+        """
+        Отправить пачку сообщений в обменник.
+
+        Публикации отправляются подряд, а подтверждения брокера ожидаются
+        одновременно, поэтому пачка стоит примерно одного round-trip.
+
+        :param messages: Тела сообщений.
+        :param routing_key: Ключ маршрутизации для всех сообщений пачки.
+        :return: Количество отправленных сообщений.
+        """
+        started = time.perf_counter()
+        await self.start()
+        routing_key = routing_key or self.config.routing_key
+        exchange_name = self.config.exchange_name
+
+        with trace_span(
+            f"publish_many {routing_key}", **{"messaging.destination": exchange_name}
+        ) as span, metrics.CONFIRM_DURATION.labels(exchange_name).time():
+            headers = inject()
+            confirmations = [
+                self._exchange.publish(
+                    aio_pika.Message(
+                        body=json.dumps(message).encode(),
+                        type=routing_key,
+                        headers=headers,
+                    ),
+                    routing_key=routing_key,
+                )
+                for message in messages
+            ]
+            await asyncio.gather(*confirmations)
+            if span is not None:
+                span.set_attribute("messaging.batch_size", len(confirmations))
+
+        log.debug(
+            "📤 Отправлено сообщений в обменник %s с ключом '%s': %d",
+            exchange_name,
+            routing_key,
+            len(confirmations),
+        )
+        metrics.MESSAGES_PUBLISHED.labels(exchange_name, routing_key).inc(
+            len(confirmations)
+        )
+        metrics.PUBLISH_DURATION.labels(exchange_name).observe(
+            time.perf_counter() - started
+        )
+        return len(confirmations)
 
     async def rpc_request(
         self,
@@ -185,164 +412,403 @@ class ServicePublisher(AsyncRabbitBase):
         routing_key: Optional[str] = None,
         correlation_id: Optional[str] = None,
         timeout: int = 30,
+        message_type: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Отправка RPC-запроса через RabbitMQ и ожидание ответа.
+
+        Таймаут передаётся получателю как крайний срок (заголовок x-deadline и
+        TTL сообщения): просроченный запрос не обрабатывается. Если получатель
+        подряд не отвечает, circuit breaker завершает запросы к нему сразу.
+
+        :param message_type: Тип запроса (например "user.get_user_data"),
+        по нему консьюмер выбирает обработчик.
+        :return: Ответ или {"status": "error", "message": ...} при таймауте,
+        ошибке соединения или публикации и разомкнутой цепи.
         """
         if correlation_id is None:
             correlation_id = str(uuid.uuid4())
+        type_label = message_type or "untyped"
+        target_exchange = exchange_name or self.config.exchange_name
+        target_routing_key = routing_key or self.config.routing_key
 
-        connection = await self.get_connection()
-        async with connection:
-            channel = await connection.channel()
-            callback_queue = await channel.declare_queue(exclusive=True)
+        breaker = self.circuit_breaker(target_routing_key)
+        if not breaker.allow():
+            metrics.RPC_REJECTED.labels(type_label).inc()
+            log.warning(
+                "⛔ Получатель %s недоступен (цепь разомкнута), RPC %s не отправлен",
+                target_routing_key,
+                type_label,
+            )
+            return {"status": "error", "message": "Service unavailable"}
+
+        started = time.perf_counter()
+        # None - исход неизвестен (запрос отменён вызывающим), на цепь не влияет
+        succeeded: Optional[bool] = None
+
+        try:
+            await self.start()
+            channel = await self.supervisor.shared_channel()
 
             # Создаем future для ожидания ответа
-            future = asyncio.get_event_loop().create_future()
+            future = asyncio.get_running_loop().create_future()
             self.pending_responses[correlation_id] = future
 
-            try:
-                target_exchange = exchange_name or self.config.exchange_name
-                target_routing_key = routing_key or self.config.routing_key
-
-                log.info(
-                    f"📤 Отправка RPC-запроса в exchange={target_exchange}, routing_key={target_routing_key}\n"
-                    f"Message: {message}\nCallback: {callback_queue.name}\n с correlation_id={correlation_id}"
-                )
+            log.debug(
+                "📤 Отправка RPC-запроса в exchange=%s, routing_key=%s, correlation_id=%s",
+                target_exchange,
+                target_routing_key,
+                correlation_id,
+            )
+            payload_log.log("📤 Тело RPC-запроса %s:", message, correlation_id)
 
+            with trace_span(
+                f"rpc {type_label}", **{"messaging.correlation_id": correlation_id}
+            ) as span:
                 # Публикуем сообщение
-                await channel.default_exchange.publish(
-                    aio_pika.Message(
-                        body=json.dumps(message).encode(),
-                        reply_to=callback_queue.name,
-                        correlation_id=correlation_id,
-                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-                    ),
-                    routing_key=target_routing_key,
-                )
+                with metrics.CONFIRM_DURATION.labels("").time():
+                    await channel.default_exchange.publish(
+                        aio_pika.Message(
+                            body=json.dumps(message).encode(),
+                            reply_to=self._reply_queue.name,
+                            correlation_id=correlation_id,
+                            type=message_type,
+                            headers=inject(
+                                {DEADLINE_HEADER: int((time.time() + timeout) * 1000)}
+                            ),
+                            # Брокер сам удалит запрос, не дождавшийся консьюмера
+                            expiration=timeout,
+                            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                        ),
+                        routing_key=target_routing_key,
+                    )
+                metrics.MESSAGES_PUBLISHED.labels("", type_label).inc()
 
                 # Ожидаем ответ
                 try:
                     response = await asyncio.wait_for(future, timeout=timeout)
+                    succeeded = True
+                    metrics.RPC_DURATION.labels(type_label).observe(
+                        time.perf_counter() - started
+                    )
                     return response
                 except asyncio.TimeoutError:
+                    succeeded = False
+                    metrics.RPC_TIMEOUTS.labels(type_label).inc()
+                    if span is not None:
+                        span.status = "timeout"
                     log.error(
-                        f"⏳ RPC запрос истек по времени (timeout)! correlation_id={correlation_id}"
+                        "⏳ RPC запрос истек по времени (timeout)! correlation_id=%s",
+                        correlation_id,
                     )
                     return {"status": "error", "message": "Request timeout"}
-            finally:
-                try:
-                    # Убираем future из словаря
-                    await self.pending_responses.pop(correlation_id, None)
-                    # Удаляем временную очередь
-                    await callback_queue.delete()
-                except Exception as e:
-                    log.error(f"Error in cleanup: {str(e)}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Брокер недоступен или публикация не удалась: сбой для circuit breaker
+            succeeded = False
+            log.error(
+                "❌ RPC %s к %s не отправлен: %s", type_label, target_routing_key, e
+            )
+            return {"status": "error", "message": "Service unavailable"}
+        finally:
+            # Убираем future из словаря
+            self.pending_responses.pop(correlation_id, None)
+            breaker.record(succeeded)
 
 
 # Класс потребителя для микросервиса
 class ServiceConsumer(AsyncRabbitBase):
     """
     Класс для обработки сообщений из очереди RabbitMQ для конкретного микросервиса.
+
+    Потребление ведётся через callback-подписку на robust-канале супервизора,
+    поэтому после рестарта брокера оно возобновляется без перезапуска консьюмера.
+
+    Обработчики регистрируются по типу сообщения (свойство AMQP `type`,
+    иначе ключ маршрутизации):
+
+        @consumer.on("user.created", model=AuthUserSchema)
+        async def on_user_created(user: AuthUserSchema): ...
+
+    Сообщения неизвестного типа отклоняются в DLX до разбора тела.
     """
 
+    def __init__(
+        self,
+        config: RabbitMQConfig,
+        supervisor: Optional[RabbitSupervisor] = None,
+        prefetch_count: int = 32,
+    ):
+        """
+        :param config: Конфигурация RabbitMQ для текущего сервиса.
+        :param supervisor: Супервизор соединения.
+        :param prefetch_count: Сколько неподтверждённых сообщений брокер отдаёт
+        консьюмеру одновременно (верхняя граница обработчиков "в полёте").
+        """
+        super().__init__(config, supervisor)
+        self.prefetch_count = prefetch_count
+        self._channel: Optional[AbstractChannel] = None
+        self._queue: Optional[AbstractQueue] = None
+        self._consumer_tag: Optional[str] = None
+        self._message_callback: Optional[MessageCallback] = None
+        self._handlers: Dict[str, MessageHandler] = {}  # Тип сообщения -> обработчик
+        self._additional_bindings: Optional[List[Dict[str, str]]] = None
+        self._in_flight: Set[asyncio.Task] = set()  # Обработчики "в полёте"
+        self._stopped = asyncio.Event()
+
+    @property
+    def in_flight(self) -> int:
+        """Количество сообщений, обрабатываемых прямо сейчас."""
+        return len(self._in_flight)
+
+    def add_handler(
+        self,
+        message_type: str,
+        callback: MessageCallback,
+        model: Optional[Type[BaseModel]] = None,
+    ) -> None:
+        """
+        Зарегистрировать обработчик для типа сообщения.
+
+        :param message_type: Тип сообщения (например "user.created").
+        :param callback: Корутина, получающая тело сообщения.
+        :param model: Pydantic-модель тела (валидируется только для этого типа).
+        """
+        if message_type in self._handlers:
+            raise ValueError(f"Обработчик для '{message_type}' уже зарегистрирован")
+        self._handlers[message_type] = MessageHandler(callback=callback, model=model)
+
+    def on(
+        self, message_type: str, model: Optional[Type[BaseModel]] = None
+    ) -> Callable[[MessageCallback], MessageCallback]:
+        """
+        Декоратор регистрации обработчика для типа сообщения.
+
+        :param message_type: Тип сообщения (например "user.created").
+        :param model: Pydantic-модель тела сообщения.
+        """
+
+        def decorator(callback: MessageCallback) -> MessageCallback:
+            self.add_handler(message_type, callback, model)
+            return callback
+
+        return decorator
+
+    async def start(
+        self,
+        message_callback: Optional[MessageCallback] = None,
+        additional_bindings: Optional[List[Dict[str, str]]] = None,
+    ) -> None:
+        """
+        Объявить инфраструктуру и подписаться на очередь (не блокирует).
+
+        :param message_callback: Обработчик сообщений без зарегистрированного типа
+        (словарь). Если не задан - такие сообщения отклоняются.
+        :param additional_bindings: Список дополнительных привязок в формате:
+        [{"exchange_name": "user_events", "routing_key": "user.created"}, ...]
+        """
+        self._message_callback = message_callback
+        self._additional_bindings = additional_bindings
+        self._stopped.clear()
+        await self.supervisor.add_topology_hook(self._declare_topology)
+
+    async def _declare_topology(self, reconnect: bool) -> None:
+        if reconnect:
+            # Подписка восстановлена robust-очередью, обновляем только объявления
+            await self.declare_infrastructure(
+                self._channel, self._additional_bindings, robust=False
+            )
+            return
+
+        self._channel = await self.supervisor.channel()
+        await self._channel.set_qos(prefetch_count=self.prefetch_count)
+        # Объявляем инфраструктуру (обменники, очереди, привязки)
+        self._queue = await self.declare_infrastructure(
+            self._channel, self._additional_bindings
+        )
+        self._consumer_tag = await self._queue.consume(self._on_message)
+        log.info(
+            "👀 Ждём сообщений... ⏳ - Ожидание поступления новых сообщений в очередь для обработки."
+        )
+
     async def consume_messages(
         self,
-        message_callback: Callable[[Dict[str, Any]], Any],
+        message_callback: Optional[MessageCallback] = None,
         additional_bindings: Optional[List[Dict[str, str]]] = None,
     ) -> None:
         """
-        Начать обработку сообщений из очереди.
+        Начать обработку сообщений из очереди и ждать до вызова stop().
         :param additional_bindings: Список дополнительных привязок в формате:
-        [{"exchange_name": "user_exchange", "routing_key": ""}, ...]
+        [{"exchange_name": "user_events", "routing_key": "user.created"}, ...]
         :param message_callback: Функция обратного вызова для обработки каждого сообщения.
         """
-        async with await self.get_connection() as connection:
-            channel = await connection.channel()
-            # Объявляем инфраструктуру (обменники, очереди, привязки)
-            queue = await self.declare_infrastructure(channel, additional_bindings)
+        await self.start(message_callback, additional_bindings)
+        await self._stopped.wait()
 
-            async with queue.iterator() as queue_iter:
-                log.info(
-                    "👀 Ждём сообщений... ⏳ - Ожидание поступления новых сообщений в очередь для обработки."
+    async def stop(self, drain_timeout: float = 15.0) -> None:
+        """
+        Корректная остановка консьюмера:
+        1) отписка от очереди - брокер перестаёт присылать новые сообщения;
+        2) ожидание обработчиков "в полёте" не дольше drain_timeout (они сами делают ack);
+        3) закрытие канала - брокер вернёт в очередь только неподтверждённые сообщения.
+
+        :param drain_timeout: Максимальное время ожидания обработчиков в секундах.
+        """
+        self.supervisor.remove_topology_hook(self._declare_topology)
+        if self._queue is not None and self._consumer_tag is not None:
+            try:
+                await self._queue.cancel(self._consumer_tag)
+            except Exception as e:
+                log.warning(f"⚠️ Не удалось отписаться от очереди: {e}")
+            self._consumer_tag = None
+
+        if self._in_flight:
+            log.info(
+                f"⏳ Ожидание завершения {len(self._in_flight)} обработчиков (до {drain_timeout} с)"
+            )
+            _, pending = await asyncio.wait(
+                tuple(self._in_flight), timeout=drain_timeout
+            )
+            if pending:
+                log.warning(
+                    f"⚠️ {len(pending)} обработчиков не уложились в {drain_timeout} с и будут отменены"
                 )
-                async for raw_message in queue_iter:
-                    # Явно указываем тип для IDE и обрабатываем корутину, если требуется
-                    if isinstance(raw_message, AbstractIncomingMessage):
-                        message: AbstractIncomingMessage = raw_message
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if self._channel is not None and not self._channel.is_closed:
+            await self._channel.close()
+        self._stopped.set()
+
+    async def _on_message(self, message: AbstractIncomingMessage) -> None:
+        # aio_pika вызывает колбэк в отдельной задаче - регистрируем её как "в полёте"
+        task = asyncio.current_task()
+        self._in_flight.add(task)
+        in_flight = metrics.IN_FLIGHT.labels(self.config.routing_key)
+        in_flight.inc()
+        try:
+            await self._process_message(message)
+        finally:
+            self._in_flight.discard(task)
+            in_flight.dec()
+
+    async def _process_message(self, message: AbstractIncomingMessage) -> None:
+        message_type = message.type or message.routing_key
+        queue_name = self.config.routing_key
+        handler = self._handlers.get(message_type)
+        if handler is None and self._message_callback is None:
+            # Неизвестный тип - отклоняем в DLX, не разбирая тело
+            log.warning("⚠️ Сообщение неизвестного типа '%s' отклонено", message_type)
+            await message.reject(requeue=False)
+            metrics.MESSAGES_CONSUMED.labels(queue_name, "unknown", "rejected").inc()
+            metrics.DLQ_REJECTIONS.labels(queue_name, "unknown_type").inc()
+            return
+        type_label = message_type if handler is not None else "untyped"
+        deadline = message_deadline(message.headers)
+        if deadline is not None and deadline <= time.time():
+            # Вызывающий уже не ждёт ответа - не тратим БД и не засоряем DLQ
+            log.warning(
+                "⌛ Просроченный запрос '%s' отброшен без обработки", message_type
+            )
+            await message.ack()
+            metrics.MESSAGES_CONSUMED.labels(queue_name, type_label, "expired").inc()
+            return
+        started = time.perf_counter()
+
+        async with message.process():
+            try:
+                # Span обработчика - продолжение трассы продюсера (traceparent в заголовках)
+                with trace_span(
+                    f"consume {type_label}",
+                    parent=extract(message.headers),
+                    **{"messaging.queue": queue_name},
+                ):
+                    if handler is not None:
+                        payload = handler.parse(message.body)
+                        callback = handler.callback
                     else:
-                        message: AbstractIncomingMessage = await raw_message
+                        payload = json.loads(message.body.decode("utf-8"))
+                        callback = self._message_callback
+                    log.debug("📥 Получено сообщение типа '%s'", message_type)
+                    payload_log.log(
+                        "📥 Тело сообщения '%s':", message.body, message_type
+                    )
 
-                    async with message.process():
+                    if deadline is None:
+                        result = await callback(payload)
+                    else:
                         try:
-                            body: Dict[str, Any] = json.loads(
-                                message.body.decode("utf-8")
+                            # Обработчик прерывается, когда вызывающий перестаёт ждать
+                            result = await asyncio.wait_for(
+                                callback(payload), timeout=deadline - time.time()
                             )
-                            log.info(f"📥 Получено сообщение: {body}")
-
-                            # Проверяем наличие correlation_id
-                            if "correlation_id" in body:
-                                await self.resolve_response(body)
-                            else:
-                                await message_callback(body)
+                        except asyncio.TimeoutError:
+                            if time.time() < deadline:
+                                raise  # Таймаут внутри обработчика - обычная ошибка
+                            log.warning(
+                                "⌛ Обработка '%s' прервана: истёк крайний срок запроса",
+                                message_type,
+                            )
+                            metrics.MESSAGES_CONSUMED.labels(
+                                queue_name, type_label, "expired"
+                            ).inc()
+                            return
+                    # Ответ на RPC-запрос отправляется по свойствам reply_to/correlation_id
+                    if message.reply_to and result is not None:
+                        await self.reply_to_rpc_request(message, result)
 
-                        except Exception as e:
-                            log.error(f"❌ Ошибка обработки сообщения: {e}")
-                            raise
+            except Exception as e:
+                log.error("❌ Ошибка обработки сообщения '%s': %s", message_type, e)
+                # process() отклоняет сообщение без повторной постановки - уходит в DLX
+                metrics.MESSAGES_CONSUMED.labels(queue_name, type_label, "error").inc()
+                metrics.DLQ_REJECTIONS.labels(queue_name, "handler_error").inc()
+                raise
+            finally:
+                metrics.HANDLER_DURATION.labels(queue_name, type_label).observe(
+                    time.perf_counter() - started
+                )
+        metrics.MESSAGES_CONSUMED.labels(queue_name, type_label, "ok").inc()
 
     async def reply_to_rpc_request(
-        self, original_message: Dict[str, Any], response: Dict[str, Any]
+        self,
+        original_message: Union[AbstractIncomingMessage, Dict[str, Any]],
+        response: Dict[str, Any],
     ) -> None:
         """
-        Отправка ответа на RPC-запрос.
+        Отправка ответа на RPC-запрос через общий канал супервизора.
 
-        :param original_message: Оригинальное сообщение
+        :param original_message: Входящее сообщение (reply_to и correlation_id
+        берутся из свойств AMQP) или словарь с этими полями.
         :param response: Ответ для отправки
         """
+        if isinstance(original_message, dict):
+            reply_to = original_message.get("reply_to")
+            correlation_id = original_message.get("correlation_id")
+        else:
+            reply_to = original_message.reply_to
+            correlation_id = original_message.correlation_id
         try:
-            log.info(f"----- Отправка ответа: {response}")
             # Преобразуем данные в response в JSON-совместимый формат
             for key, value in response.items():
                 if isinstance(value, bytes):
                     response[key] = value.decode("utf-8")
-            async with await self.get_connection() as connection:
-                async with connection:
-                    channel = await connection.channel()
-                    # Проверьте, что response сериализуем в JSON
-                    if isinstance(response, bytes):
-                        response = json.loads(response.decode("utf-8"))
-                    log.info(
-                        f'📤 Отправка ответа: {response}, correlation_id={original_message.get("correlation_id")}, reply_to={original_message.get("reply_to")}'
-                    )
-                    await channel.default_exchange.publish(
-                        aio_pika.Message(
-                            body=json.dumps(response).encode("utf-8"),
-                            correlation_id=original_message.get(
-                                "correlation_id"
-                            ),  # Устанавливаем корреляционный ID
-                        ),
-                        routing_key=original_message.get("reply_to", ""),
-                    )
-        except Exception as e:
-            log.error(f"Ошибка отправки ответа: {e}")
-
-    async def resolve_response(self, message: Union[IncomingMessage, Dict[str, Any]]):
-        if isinstance(message, IncomingMessage):
-            correlation_id = message.correlation_id
-            body = json.loads(message.body.decode())
-        elif isinstance(message, dict):
-            correlation_id = message.get("correlation_id")
-            body = message
-        else:
-            raise ValueError("Неизвестный тип сообщения!")
-
-        log.info(f"📥 Получен ответ с correlation_id={correlation_id}")
-
-        if correlation_id and correlation_id in self.pending_responses:
-            future = self.pending_responses.pop(correlation_id)
-            if not future.done():
-                future.set_result(body)
-        else:
-            log.warning(
-                f"❗Получен ответ с неизвестным correlation_id={correlation_id}"
+            channel = await self.supervisor.shared_channel()
+            log.debug(
+                "📤 Отправка ответа: correlation_id=%s, reply_to=%s",
+                correlation_id,
+                reply_to,
             )
+            payload_log.log("📤 Тело ответа %s:", response, correlation_id)
+            await channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=json.dumps(response).encode("utf-8"),
+                    correlation_id=correlation_id,  # Устанавливаем корреляционный ID
+                    headers=inject(),
+                ),
+                routing_key=reply_to or "",
+            )
+            metrics.MESSAGES_PUBLISHED.labels("", "rpc.reply").inc()
+        except Exception as e:
+            log.error("Ошибка отправки ответа: %s", e)
@@ -0,0 +1,105 @@
+"""
+Circuit breaker для RPC-запросов к другим сервисам.
+
+Пока получатель недоступен, запросы к нему завершаются сразу, а не ждут
+полный таймаут:
+
+    closed    - запросы идут как обычно, подряд идущие сбои считаются;
+    open      - после failure_threshold сбоев подряд запросы отклоняются
+                сразу в течение reset_timeout секунд;
+    half_open - по истечении reset_timeout пропускаются пробные запросы:
+                успех закрывает цепь, сбой снова открывает её.
+"""
+
+import time
+from enum import Enum
+from typing import Optional
+
+from rabbit import metrics
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+# Значения gauge rabbit_circuit_state
+STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Состояние цепи для одного получателя (очереди RPC).
+    """
+
+    def __init__(
+        self,
+        target: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+        half_open_max_calls: int = 1,
+    ):
+        """
+        :param target: Имя получателя (метка метрик).
+        :param failure_threshold: Сбоев подряд до размыкания цепи.
+        :param reset_timeout: Время в разомкнутом состоянии до пробного запроса (сек).
+        :param half_open_max_calls: Одновременных пробных запросов в half_open.
+        """
+        self.target = target
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._set_state(CircuitState.CLOSED)
+
+    def _set_state(self, state: CircuitState) -> None:
+        self.state = state
+        metrics.CIRCUIT_STATE.labels(self.target).set(STATE_VALUES[state])
+
+    def allow(self) -> bool:
+        """
+        Можно ли отправить запрос сейчас (в half_open занимает слот пробы).
+        """
+        if self.state is CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._set_state(CircuitState.HALF_OPEN)
+            self._probes = 0
+        if self.state is CircuitState.HALF_OPEN:
+            if self._probes >= self.half_open_max_calls:
+                return False
+            self._probes += 1
+        return True
+
+    def record(self, succeeded: Optional[bool]) -> None:
+        """
+        Учесть исход запроса, пропущенного allow().
+
+        :param succeeded: True - ответ получен, False - сбой (таймаут, ошибка
+        публикации), None - исход неизвестен (запрос отменён вызывающим).
+        """
+        if succeeded is None:
+            if self.state is CircuitState.HALF_OPEN and self._probes > 0:
+                self._probes -= 1  # Освобождаем слот пробного запроса
+        elif succeeded:
+            self.record_success()
+        else:
+            self.record_failure()
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self.state is not CircuitState.CLOSED:
+            self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if (
+            self.state is CircuitState.HALF_OPEN
+            or self._failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._set_state(CircuitState.OPEN)
@@ -0,0 +1,277 @@
+"""
+Пул соединений с БД с метриками Prometheus.
+
+Метрики пишутся в общий реестр rabbit.metrics.REGISTRY и отдаются на том же
+/metrics, что и метрики RabbitMQ:
+
+    db_pool_checkout_wait_seconds  - ожидание соединения из пула (вместе с
+                                     открытием нового соединения сверх пула);
+    db_pool_checkout_timeouts_total - ожидание дольше pool_timeout;
+    db_pool_checked_out / db_pool_overflow / db_pool_capacity - занятые
+                                     соединения, занятые сверх pool_size и предел;
+    db_connection_lifetime_seconds - время жизни закрытых соединений
+                                     (pool_recycle, инвалидация, dispose).
+
+ReplicaSet выбирает реплику для сессий только на чтение; track_writes и
+ReplicaSet.remember_writes закрепляют чтения клиента за primary после его
+собственной записи.
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from rabbit import metrics
+
+log = logging.getLogger(__name__)
+
+REPLICA_SELECTIONS = ("round_robin", "least_lag")
+# Время последней записи клиента (unix-время): cookie для браузеров,
+# заголовок - для остальных клиентов
+LAST_WRITE_COOKIE = "db_last_write"
+LAST_WRITE_HEADER = "X-DB-Last-Write"
+
+# Отставание реплики в секундах; догнавшая WAL реплика отстаёт на 0,
+# даже если на primary давно не было записей
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool, измеряющий время получения соединения.
+    """
+
+    metrics_name = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.DB_POOL_CHECKOUT_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            metrics.DB_POOL_CHECKOUT_WAIT.labels(self.metrics_name).observe(
+                time.perf_counter() - started
+            )
+
+    def recreate(self):
+        # engine.dispose() заменяет пул новым экземпляром того же класса
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def instrument_engine(engine: AsyncEngine, name: str, capacity: int) -> None:
+    """
+    Подключить метрики к пулу движка (create_async_engine(poolclass=InstrumentedAsyncPool)).
+
+    :param engine: Асинхронный движок.
+    :param name: Метка pool в метриках (например, имя профиля).
+    :param capacity: pool_size + max_overflow.
+    """
+    sync_engine = engine.sync_engine
+    if isinstance(sync_engine.pool, InstrumentedAsyncPool):
+        sync_engine.pool.metrics_name = name
+
+    # Пул читается через движок: после dispose() это уже новый экземпляр
+    metrics.DB_POOL_CHECKED_OUT.labels(name).set_function(
+        lambda: sync_engine.pool.checkedout()
+    )
+    metrics.DB_POOL_OVERFLOW.labels(name).set_function(
+        lambda: max(0, sync_engine.pool.overflow())
+    )
+    metrics.DB_POOL_CAPACITY.labels(name).set(capacity)
+
+    @event.listens_for(sync_engine.pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        connection_record.info["connected_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine.pool, "close")
+    def on_close(dbapi_connection, connection_record):
+        connected_at = connection_record.info.pop("connected_at", None)
+        if connected_at is not None:
+            metrics.DB_CONNECTION_LIFETIME.labels(name).observe(
+                time.monotonic() - connected_at
+            )
+
+
+class ReplicaSet:
+    """
+    Выбор реплики для чтения: round_robin или least_lag среди реплик с
+    отставанием не больше max_lag. Отставание проверяется фоновой задачей
+    раз в lag_check_interval секунд; недоступная реплика исключается до
+    следующей успешной проверки.
+
+    Read-your-writes: в течение sticky_primary_seconds после записи клиента
+    его чтения идут на primary. Время записи клиент возвращает в cookie
+    (или заголовке), поэтому это работает с любым воркером и экземпляром
+    сервиса, а записи других клиентов на выбор реплики не влияют.
+    """
+
+    def __init__(
+        self,
+        engines: Dict[str, AsyncEngine],
+        selection: str = "round_robin",
+        max_lag: float = 10.0,
+        lag_check_interval: float = 5.0,
+        sticky_primary_seconds: float = 2.0,
+    ):
+        """
+        :param engines: Движки реплик по именам (метки метрик).
+        :param selection: round_robin или least_lag.
+        :param max_lag: Допустимое отставание реплики (сек).
+        :param lag_check_interval: Период проверки отставания (сек).
+        :param sticky_primary_seconds: Чтения с primary после записи (сек, 0 - выключено).
+        """
+        if selection not in REPLICA_SELECTIONS:
+            raise ValueError(f"Неизвестный способ выбора реплики: {selection}")
+        self.engines = engines
+        self.selection = selection
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.sticky_primary_seconds = sticky_primary_seconds
+        # До первой проверки реплики считаются догнавшими
+        self.lags: Dict[str, float] = {name: 0.0 for name in engines}
+        self._names = itertools.cycle(sorted(engines))
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def pick(self, last_write: Optional[float] = None) -> Optional[AsyncEngine]:
+        """
+        Движок реплики для очередной сессии чтения (None - читать с primary).
+
+        :param last_write: Время последней записи клиента (last_write(request)).
+        """
+        if not self.engines:
+            return None
+        self._ensure_probe()
+        # Время из будущего не принимаем: клиент не закрепит себя за primary надолго
+        if (
+            last_write is not None
+            and 0 <= time.time() - last_write < self.sticky_primary_seconds
+        ):
+            metrics.DB_READS_ROUTED.labels("primary_sticky").inc()
+            return None
+        healthy = [name for name, lag in self.lags.items() if lag <= self.max_lag]
+        if not healthy:
+            metrics.DB_READS_ROUTED.labels("primary_fallback").inc()
+            return None
+        if self.selection == "least_lag":
+            name = min(healthy, key=self.lags.__getitem__)
+        else:
+            name = next(n for n in self._names if n in healthy)
+        metrics.DB_READS_ROUTED.labels(name).inc()
+        return self.engines[name]
+
+    @staticmethod
+    def last_write(request: Any) -> Optional[float]:
+        """Время последней записи клиента из cookie или заголовка запроса."""
+        value = request.cookies.get(LAST_WRITE_COOKIE) or request.headers.get(
+            LAST_WRITE_HEADER
+        )
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+
+    async def remember_writes(self, request: Any, call_next):
+        """
+        HTTP-middleware: если запрос что-то записал (track_writes), вернуть
+        клиенту время записи в cookie и заголовке.
+
+        Подключается через app.middleware("http")(db_helper.replicas.remember_writes).
+        """
+        response = await call_next(request)
+        written_at = getattr(request.state, "db_last_write", None)
+        if written_at is not None and self.engines and self.sticky_primary_seconds > 0:
+            value = f"{written_at:.3f}"
+            response.headers[LAST_WRITE_HEADER] = value
+            response.set_cookie(
+                LAST_WRITE_COOKIE,
+                value,
+                max_age=math.ceil(self.sticky_primary_seconds),
+                httponly=True,
+                samesite="lax",
+            )
+        return response
+
+    def _ensure_probe(self) -> None:
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.get_running_loop().create_task(
+                self._probe_loop()
+            )
+
+    async def probe(self) -> None:
+        """Измерить отставание всех реплик."""
+        for name, engine in self.engines.items():
+            try:
+                async with engine.connect() as conn:
+                    lag = float((await conn.execute(REPLICA_LAG_QUERY)).scalar() or 0)
+            except Exception as e:
+                if self.lags[name] != math.inf:
+                    log.error("❌ Реплика %s недоступна: %s", name, e)
+                lag = math.inf
+            self.lags[name] = lag
+            metrics.DB_REPLICA_LAG.labels(name).set(lag)
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.lag_check_interval)
+
+    async def close(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        for engine in self.engines.values():
+            await engine.dispose()
+
+
+def track_writes(session: AsyncSession, state: Any) -> None:
+    """
+    Записать в state.db_last_write время commit, если сессия что-то изменила:
+    flush объектов или ORM INSERT/UPDATE/DELETE через execute. Commit без
+    изменений (и записи других сессий) клиента к primary не привязывают.
+
+    :param session: Сессия запроса.
+    :param state: request.state.
+    """
+    sync_session = session.sync_session
+
+    def after_flush(flushed_session, flush_context) -> None:
+        sync_session.info["wrote"] = True
+
+    def do_orm_execute(orm_execute_state) -> None:
+        if (
+            orm_execute_state.is_insert
+            or orm_execute_state.is_update
+            or orm_execute_state.is_delete
+        ):
+            sync_session.info["wrote"] = True
+
+    def after_commit(committed_session) -> None:
+        if sync_session.info.pop("wrote", False):
+            state.db_last_write = time.time()
+
+    def after_rollback(rolled_back_session) -> None:
+        sync_session.info.pop("wrote", None)
+
+    event.listen(sync_session, "after_flush", after_flush)
+    event.listen(sync_session, "do_orm_execute", do_orm_execute)
+    event.listen(sync_session, "after_commit", after_commit)
+    event.listen(sync_session, "after_rollback", after_rollback)
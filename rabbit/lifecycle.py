@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from rabbit.base_aio import ServiceConsumer
+from rabbit.supervisor import RabbitSupervisor
+
+log = logging.getLogger(__name__)
+
+ConsumerFactory = Callable[[], Awaitable[ServiceConsumer]]
+
+
+class ConsumerGroup:
+    """
+    Набор консьюмеров, запускаемых как управляемые задачи (lifespan FastAPI, воркер).
+
+    Запуск не блокирует старт приложения: подключение к брокеру идёт в фоне.
+    При остановке консьюмеры сначала перестают получать сообщения, затем
+    дожидаются обработчиков "в полёте" и только после этого закрывается соединение,
+    поэтому rolling deploy не приводит к массовой повторной доставке.
+    """
+
+    def __init__(self, supervisor: RabbitSupervisor, drain_timeout: float = 15.0):
+        """
+        :param supervisor: Супервизор соединения, общий для всех консьюмеров группы.
+        :param drain_timeout: Максимальное время ожидания обработчиков при остановке.
+        """
+        self.supervisor = supervisor
+        self.drain_timeout = drain_timeout
+        self._tasks: List[asyncio.Task] = []
+        self._connect_task: Optional[asyncio.Task] = None
+
+    def start(self, *factories: ConsumerFactory) -> None:
+        """
+        Запустить консьюмеры в фоновых задачах.
+
+        Соединение устанавливается в фоне даже без консьюмеров (они вынесены
+        в отдельный воркер), чтобы продюсеры и health-check видели готовность.
+
+        :param factories: Корутинные функции, создающие и запускающие консьюмер.
+        """
+        if self._connect_task is None:
+            self._connect_task = asyncio.create_task(self.supervisor.start())
+        for factory in factories:
+            self._tasks.append(asyncio.create_task(factory()))
+
+    async def shutdown(self) -> None:
+        """
+        Корректно остановить все консьюмеры и закрыть соединение с RabbitMQ.
+        """
+        if self._connect_task is not None and not self._connect_task.done():
+            self._connect_task.cancel()
+        self._connect_task = None
+
+        consumers: List[ServiceConsumer] = []
+        for task in self._tasks:
+            if not task.done():
+                # Подключение ещё не установлено - сообщений "в полёте" нет
+                task.cancel()
+            try:
+                consumers.append(await task)
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                log.error(f"❌ Консьюмер не был запущен: {e}")
+        self._tasks.clear()
+
+        await asyncio.gather(
+            *(consumer.stop(self.drain_timeout) for consumer in consumers),
+            return_exceptions=True,
+        )
+        await self.supervisor.close()
+        log.info(f"🛑 Остановлено консьюмеров: {len(consumers)}")
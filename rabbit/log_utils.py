@@ -0,0 +1,106 @@
+import json
+import logging
+import random
+from typing import Any, Optional
+
+# Ключи, значения которых никогда не попадают в лог
+SENSITIVE_KEYS = frozenset(
+    {"hashed_password", "password", "access_token", "refresh_token", "token"}
+)
+REDACTED = "***"
+
+# Параметры логирования тел сообщений (меняются через enable_payload_logging)
+_payload_sample_rate = 1.0
+_payload_max_length = 512
+
+
+def _redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in SENSITIVE_KEYS else _redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_redact(item) for item in value]
+    return value
+
+
+class LazyPayload:
+    """
+    Тело сообщения для лога: сериализуется, маскируется и обрезается
+    только в момент форматирования записи (если запись вообще будет выведена).
+    """
+
+    __slots__ = ("payload", "max_length")
+
+    def __init__(self, payload: Any, max_length: Optional[int] = None):
+        self.payload = payload
+        self.max_length = max_length or _payload_max_length
+
+    def __str__(self) -> str:
+        payload = self.payload
+        if isinstance(payload, (bytes, bytearray)):
+            try:
+                payload = json.loads(payload)
+            except ValueError:
+                payload = payload.decode("utf-8", errors="replace")
+        if hasattr(payload, "model_dump"):
+            payload = payload.model_dump(mode="json")
+        text = json.dumps(_redact(payload), ensure_ascii=False, default=str)
+        if len(text) > self.max_length:
+            return f"{text[:self.max_length]}... ({len(text)} символов)"
+        return text
+
+
+class PayloadLogger:
+    """
+    Логгер тел сообщений "<name>.payload".
+
+    По умолчанию выключен: записи идут на уровне DEBUG, поэтому при обычном
+    уровне INFO проверка сводится к isEnabledFor без форматирования.
+    Включается на уровне логгера (например, только для rabbit.base_aio.payload)
+    или через enable_payload_logging(); поддерживает выборку части сообщений.
+    """
+
+    def __init__(self, name: str):
+        self.logger = logging.getLogger(f"{name}.payload")
+
+    def enabled(self) -> bool:
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return False
+        return _payload_sample_rate >= 1.0 or random.random() < _payload_sample_rate
+
+    def log(self, msg: str, payload: Any, *args: Any) -> None:
+        """
+        Записать тело сообщения (лениво, с маскированием и обрезкой).
+
+        :param msg: Шаблон сообщения в %-формате, тело добавляется в конец.
+        :param payload: Тело сообщения (dict, bytes или pydantic-модель).
+        """
+        if self.enabled():
+            self.logger.debug(f"{msg} %s", *args, LazyPayload(payload))
+
+
+def enable_payload_logging(
+    name: str = "",
+    sample_rate: float = 1.0,
+    max_length: int = 512,
+) -> None:
+    """
+    Включить логирование тел сообщений.
+
+    :param name: Имя модуля (например "rabbit.base_aio"); пустое - все модули.
+    :param sample_rate: Доля логируемых сообщений (0..1).
+    :param max_length: Максимальная длина тела в записи.
+    """
+    global _payload_sample_rate, _payload_max_length
+    _payload_sample_rate = sample_rate
+    _payload_max_length = max_length
+
+    if name:
+        logging.getLogger(f"{name}.payload").setLevel(logging.DEBUG)
+        return
+    # Все уже созданные payload-логгеры
+    for logger_name in list(logging.root.manager.loggerDict):
+        if logger_name.endswith(".payload"):
+            logging.getLogger(logger_name).setLevel(logging.DEBUG)
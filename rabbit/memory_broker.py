@@ -0,0 +1,545 @@
+"""
+Брокер в памяти процесса - заменитель RabbitMQ для бенчмарков и локального запуска.
+
+Реализует ту часть интерфейсов aio_pika, которую использует пакет rabbit:
+соединение, каналы с prefetch, обменники (direct/fanout/topic и обменник
+по умолчанию), очереди с привязками, подписки с ack/reject и эксклюзивные
+очереди ответов RPC. Сетевого ввода-вывода нет, доставка идёт через event loop.
+
+Как в RabbitMQ: неподтверждённые сообщения возвращаются в очередь при
+закрытии канала, эксклюзивные очереди удаляются при закрытии соединения,
+сообщения с истёкшим expiration не доставляются (уходят в DLX очереди).
+"""
+
+import asyncio
+import itertools
+import logging
+import uuid
+from collections import deque
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from aio_pika import ExchangeType
+from aio_pika.message import encode_expiration
+
+log = logging.getLogger(__name__)
+
+DEFAULT_EXCHANGE = ""
+
+
+@lru_cache(maxsize=4096)
+def topic_matches(pattern: str, routing_key: str) -> bool:
+    """
+    Проверка ключа маршрутизации по шаблону topic-обменника
+    ("*" - ровно одно слово, "#" - ноль или больше слов).
+    """
+
+    def match(pattern_words: Tuple[str, ...], key_words: Tuple[str, ...]) -> bool:
+        if not pattern_words:
+            return not key_words
+        head, rest = pattern_words[0], pattern_words[1:]
+        if head == "#":
+            return any(match(rest, key_words[i:]) for i in range(len(key_words) + 1))
+        if not key_words:
+            return False
+        if head != "*" and head != key_words[0]:
+            return False
+        return match(rest, key_words[1:])
+
+    return match(tuple(pattern.split(".")), tuple(routing_key.split(".")))
+
+
+class CallbackSet(set):
+    """Набор колбэков соединения (совместим с CallbackCollection.add/discard)."""
+
+
+class MemoryIncomingMessage:
+    """Доставленное сообщение с семантикой ack/reject, как у aio_pika.IncomingMessage."""
+
+    def __init__(
+        self,
+        queue: "MemoryQueueState",
+        envelope: "Envelope",
+        delivery_tag: int,
+        consumer: Optional["MemoryConsumer"],
+    ):
+        self._queue = queue
+        self._envelope = envelope
+        self._consumer = consumer
+        self.delivery_tag = delivery_tag
+        self.processed = consumer is None  # no_ack - сообщение уже подтверждено
+
+    def __getattr__(self, name: str) -> Any:
+        # body, type, headers, reply_to, correlation_id, routing_key, exchange
+        return getattr(self._envelope, name)
+
+    async def ack(self, multiple: bool = False) -> None:
+        self._settle()
+
+    async def reject(self, requeue: bool = False) -> None:
+        self._settle()
+        if requeue:
+            self._envelope.redelivered = True
+            self._queue.requeue(self._envelope)
+        else:
+            self._queue.dead_letter(self._envelope)
+
+    async def nack(self, multiple: bool = False, requeue: bool = True) -> None:
+        await self.reject(requeue=requeue)
+
+    def process(
+        self,
+        requeue: bool = False,
+        reject_on_redelivered: bool = False,
+        ignore_processed: bool = False,
+    ) -> "MemoryProcessContext":
+        return MemoryProcessContext(self, requeue, ignore_processed)
+
+    def _settle(self) -> None:
+        if self._consumer is not None and self._consumer.channel.is_closed:
+            # Сообщение уже возвращено в очередь при закрытии канала
+            raise RuntimeError("Канал закрыт")
+        if self.processed:
+            raise RuntimeError("Сообщение уже обработано")
+        self.processed = True
+        self._consumer.release(self)
+
+
+class MemoryProcessContext:
+    def __init__(
+        self, message: MemoryIncomingMessage, requeue: bool, ignore_processed: bool
+    ):
+        self.message = message
+        self.requeue = requeue
+        self.ignore_processed = ignore_processed
+
+    async def __aenter__(self) -> MemoryIncomingMessage:
+        return self.message
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self.ignore_processed and self.message.processed:
+            return
+        if exc_type is None:
+            await self.message.ack()
+        elif not self.message.processed:
+            await self.message.reject(requeue=self.requeue)
+
+
+class Envelope:
+    """Опубликованное сообщение вместе с данными маршрутизации."""
+
+    __slots__ = (
+        "body",
+        "type",
+        "headers",
+        "reply_to",
+        "correlation_id",
+        "message_id",
+        "exchange",
+        "routing_key",
+        "redelivered",
+        "expires_at",
+    )
+
+    def __init__(self, message: Any, exchange: str, routing_key: str):
+        self.body: bytes = message.body
+        self.type: Optional[str] = message.type
+        self.headers: Dict[str, Any] = dict(message.headers or {})
+        self.reply_to: Optional[str] = message.reply_to
+        self.correlation_id: Optional[str] = message.correlation_id
+        self.message_id: Optional[str] = message.message_id
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.redelivered = False
+        # Срок жизни сообщения (время event loop); при повторной постановке не меняется
+        expiration = encode_expiration(getattr(message, "expiration", None))
+        self.expires_at: Optional[float] = (
+            None
+            if expiration is None
+            else asyncio.get_running_loop().time() + int(expiration) / 1000
+        )
+
+    def expired(self, now: float) -> bool:
+        return self.expires_at is not None and now >= self.expires_at
+
+
+class MemoryConsumer:
+    """Подписка на очередь с ограничением неподтверждённых сообщений (prefetch)."""
+
+    def __init__(
+        self,
+        tag: str,
+        callback: Callable[[MemoryIncomingMessage], Awaitable[Any]],
+        no_ack: bool,
+        channel: "MemoryChannel",
+        queue: "MemoryQueueState",
+    ):
+        self.tag = tag
+        self.callback = callback
+        self.no_ack = no_ack
+        self.channel = channel
+        self.queue = queue
+        # Неподтверждённые доставки по delivery_tag
+        self.pending: Dict[int, MemoryIncomingMessage] = {}
+
+    @property
+    def unacked(self) -> int:
+        return len(self.pending)
+
+    @property
+    def has_capacity(self) -> bool:
+        prefetch = self.channel.prefetch_count
+        return self.no_ack or not prefetch or self.unacked < prefetch
+
+    def release(self, message: MemoryIncomingMessage) -> None:
+        self.pending.pop(message.delivery_tag, None)
+        self.queue.dispatch()
+
+
+class MemoryQueueState:
+    """Состояние очереди внутри брокера (общее для всех каналов)."""
+
+    def __init__(self, broker: "MemoryBroker", name: str, arguments: Dict[str, Any]):
+        self.broker = broker
+        self.name = name
+        self.arguments = arguments
+        self.messages: Deque[Envelope] = deque()
+        self.consumers: List[MemoryConsumer] = []
+        self._next_consumer = 0
+        self._dispatching = False
+
+    def put(self, envelope: Envelope) -> None:
+        self.messages.append(envelope)
+        self.dispatch()
+
+    def requeue(self, envelope: Envelope) -> None:
+        self.messages.appendleft(envelope)
+        self.dispatch()
+
+    def drop_expired(self) -> None:
+        """Сообщения с истёкшим expiration уходят в DLX, как в RabbitMQ."""
+        if not self.messages:
+            return
+        now = asyncio.get_running_loop().time()
+        alive: Deque[Envelope] = deque()
+        for envelope in self.messages:
+            if envelope.expired(now):
+                self.dead_letter(envelope)
+            else:
+                alive.append(envelope)
+        self.messages = alive
+
+    def dead_letter(self, envelope: Envelope) -> None:
+        dlx = self.arguments.get("x-dead-letter-exchange")
+        if dlx is None:
+            return  # Без DLX отклонённое сообщение удаляется, как в RabbitMQ
+        if dlx != DEFAULT_EXCHANGE and dlx not in self.broker.exchanges:
+            # RabbitMQ молча отбрасывает сообщение, если DLX не объявлен
+            log.warning(
+                "⚠️ DLX %s очереди %s не объявлен, сообщение отброшено", dlx, self.name
+            )
+            return
+        envelope.expires_at = None  # В DLX сообщение попадает без expiration
+        routing_key = self.arguments.get(
+            "x-dead-letter-routing-key", envelope.routing_key
+        )
+        self.broker.route(dlx, envelope, routing_key)
+
+    def dispatch(self) -> None:
+        """Раздать сообщения консьюмерам по кругу с учётом prefetch."""
+        if self._dispatching:
+            return
+        self._dispatching = True
+        try:
+            while self.messages and self.consumers:
+                consumer = self._pick_consumer()
+                if consumer is None:
+                    return
+                envelope = self.messages.popleft()
+                if envelope.expired(asyncio.get_running_loop().time()):
+                    self.dead_letter(envelope)
+                    continue
+                self.broker.delivery_tags += 1
+                message = MemoryIncomingMessage(
+                    self,
+                    envelope,
+                    self.broker.delivery_tags,
+                    None if consumer.no_ack else consumer,
+                )
+                if not consumer.no_ack:
+                    consumer.pending[message.delivery_tag] = message
+                consumer.channel.spawn(consumer.callback(message))
+        finally:
+            self._dispatching = False
+
+    def _pick_consumer(self) -> Optional[MemoryConsumer]:
+        for offset in range(len(self.consumers)):
+            index = (self._next_consumer + offset) % len(self.consumers)
+            consumer = self.consumers[index]
+            if consumer.has_capacity:
+                self._next_consumer = index + 1
+                return consumer
+        return None
+
+
+class MemoryExchangeState:
+    def __init__(self, name: str, exchange_type: ExchangeType):
+        self.name = name
+        self.type = ExchangeType(exchange_type)
+        self.bindings: Set[Tuple[str, str]] = set()  # (очередь, ключ)
+
+
+class MemoryBroker:
+    """
+    Брокер в памяти: обменники, очереди, привязки и маршрутизация.
+    Один экземпляр разделяется всеми соединениями процесса.
+    """
+
+    def __init__(self):
+        self.exchanges: Dict[str, MemoryExchangeState] = {}
+        self.queues: Dict[str, MemoryQueueState] = {}
+        self.delivery_tags = 0
+
+    def declare_exchange(
+        self, name: str, exchange_type: ExchangeType
+    ) -> MemoryExchangeState:
+        exchange = self.exchanges.get(name)
+        if exchange is None:
+            exchange = self.exchanges[name] = MemoryExchangeState(name, exchange_type)
+        elif exchange.type != ExchangeType(exchange_type):
+            raise ValueError(
+                f"PRECONDITION_FAILED: обменник {name} уже объявлен с типом {exchange.type.value}"
+            )
+        return exchange
+
+    def declare_queue(
+        self, name: str, arguments: Optional[Dict[str, Any]]
+    ) -> MemoryQueueState:
+        queue = self.queues.get(name)
+        if queue is None:
+            queue = self.queues[name] = MemoryQueueState(
+                self, name, dict(arguments or {})
+            )
+        return queue
+
+    def delete_queue(self, name: str) -> None:
+        self.queues.pop(name, None)
+        for exchange in self.exchanges.values():
+            exchange.bindings = {b for b in exchange.bindings if b[0] != name}
+
+    def delete_exchange(self, name: str) -> None:
+        self.exchanges.pop(name, None)
+
+    def bind(self, queue: str, exchange: str, routing_key: str) -> None:
+        self.exchanges[exchange].bindings.add((queue, routing_key))
+
+    def unbind(self, queue: str, exchange: str, routing_key: str) -> None:
+        self.exchanges[exchange].bindings.discard((queue, routing_key))
+
+    def route(self, exchange_name: str, envelope: Envelope, routing_key: str) -> int:
+        """
+        Доставить сообщение во все подходящие очереди.
+
+        :return: Количество очередей, получивших сообщение.
+        """
+        if exchange_name == DEFAULT_EXCHANGE:
+            queue = self.queues.get(routing_key)
+            if queue is None:
+                return 0
+            queue.put(envelope)
+            return 1
+
+        exchange = self.exchanges.get(exchange_name)
+        if exchange is None:
+            raise ValueError(f"NOT_FOUND: обменник {exchange_name} не объявлен")
+
+        if exchange.type == ExchangeType.FANOUT:
+            targets = {queue for queue, _ in exchange.bindings}
+        elif exchange.type == ExchangeType.TOPIC:
+            targets = {
+                queue
+                for queue, key in exchange.bindings
+                if topic_matches(key, routing_key)
+            }
+        else:
+            targets = {queue for queue, key in exchange.bindings if key == routing_key}
+
+        for queue_name in targets:
+            queue = self.queues.get(queue_name)
+            if queue is not None:
+                # Каждой очереди - своя копия: ack/reject в одной не влияют на другие
+                copy = Envelope.__new__(Envelope)
+                for slot in Envelope.__slots__:
+                    setattr(copy, slot, getattr(envelope, slot))
+                copy.exchange, copy.routing_key = exchange_name, routing_key
+                queue.put(copy)
+        return len(targets)
+
+
+class MemoryExchange:
+    """Обменник в канале (аналог aio_pika.Exchange)."""
+
+    def __init__(self, channel: "MemoryChannel", name: str):
+        self.channel = channel
+        self.name = name
+
+    async def publish(self, message: Any, routing_key: str, **kwargs: Any) -> None:
+        self.channel.ensure_open()
+        envelope = Envelope(message, self.name, routing_key)
+        self.channel.broker.route(self.name, envelope, routing_key)
+
+
+class MemoryQueue:
+    """Очередь в канале (аналог aio_pika.Queue)."""
+
+    def __init__(self, channel: "MemoryChannel", state: MemoryQueueState):
+        self.channel = channel
+        self.state = state
+        self.name = state.name
+
+    async def bind(self, exchange: Any, routing_key: str = "", **kwargs: Any) -> None:
+        exchange_name = exchange if isinstance(exchange, str) else exchange.name
+        self.channel.broker.bind(self.name, exchange_name, routing_key or "")
+
+    async def unbind(self, exchange: Any, routing_key: str = "", **kwargs: Any) -> None:
+        exchange_name = exchange if isinstance(exchange, str) else exchange.name
+        self.channel.broker.unbind(self.name, exchange_name, routing_key or "")
+
+    async def consume(
+        self,
+        callback: Callable[[MemoryIncomingMessage], Awaitable[Any]],
+        no_ack: bool = False,
+        **kwargs: Any,
+    ) -> str:
+        self.channel.ensure_open()
+        tag = f"ctag-{next(self.channel.connection.consumer_tags)}"
+        consumer = MemoryConsumer(tag, callback, no_ack, self.channel, self.state)
+        self.state.consumers.append(consumer)
+        self.channel.consumers.add(consumer)
+        self.state.dispatch()
+        return tag
+
+    async def cancel(self, consumer_tag: str, **kwargs: Any) -> None:
+        for consumer in list(self.state.consumers):
+            if consumer.tag == consumer_tag:
+                self.state.consumers.remove(consumer)
+                # Выданные сообщения можно подтвердить до закрытия канала
+                if not consumer.pending:
+                    self.channel.consumers.discard(consumer)
+
+    async def get_message_count(self) -> int:
+        self.state.drop_expired()
+        return len(self.state.messages)
+
+
+class MemoryChannel:
+    """Канал (аналог aio_pika.RobustChannel) с prefetch и обменником по умолчанию."""
+
+    def __init__(self, connection: "MemoryConnection"):
+        self.connection = connection
+        self.broker = connection.broker
+        self.prefetch_count = 0
+        self.consumers: Set[MemoryConsumer] = set()
+        self.is_closed = False
+        self._tasks: Set[asyncio.Task] = set()
+        self.default_exchange = MemoryExchange(self, DEFAULT_EXCHANGE)
+
+    def ensure_open(self) -> None:
+        if self.is_closed:
+            raise RuntimeError("Канал закрыт")
+
+    def spawn(self, coroutine: Awaitable[Any]) -> None:
+        # Как и aio_pika, колбэк консьюмера выполняется в отдельной задаче
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def set_qos(self, prefetch_count: int = 0, **kwargs: Any) -> None:
+        self.prefetch_count = prefetch_count
+
+    async def declare_exchange(
+        self,
+        name: str,
+        type: ExchangeType = ExchangeType.DIRECT,
+        **kwargs: Any,
+    ) -> MemoryExchange:
+        self.ensure_open()
+        self.broker.declare_exchange(name, type)
+        return MemoryExchange(self, name)
+
+    async def get_exchange(self, name: str, **kwargs: Any) -> MemoryExchange:
+        if name not in self.broker.exchanges:
+            raise ValueError(f"NOT_FOUND: обменник {name} не объявлен")
+        return MemoryExchange(self, name)
+
+    async def declare_queue(
+        self,
+        name: Optional[str] = None,
+        arguments: Optional[Dict[str, Any]] = None,
+        exclusive: bool = False,
+        **kwargs: Any,
+    ) -> MemoryQueue:
+        self.ensure_open()
+        name = name or f"amq.gen-{uuid.uuid4().hex}"
+        if exclusive:
+            self.connection.exclusive_queues.add(name)
+        return MemoryQueue(self, self.broker.declare_queue(name, arguments))
+
+    async def queue_delete(self, queue_name: str, **kwargs: Any) -> None:
+        self.broker.delete_queue(queue_name)
+
+    async def exchange_delete(self, exchange_name: str, **kwargs: Any) -> None:
+        self.broker.delete_exchange(exchange_name)
+
+    async def close(self) -> None:
+        if self.is_closed:
+            return
+        self.is_closed = True
+        # Подписки канала снимаются, неподтверждённые сообщения возвращаются
+        # в начало своих очередей в исходном порядке с флагом redelivered
+        queues: Dict[str, MemoryQueueState] = {}
+        for consumer in self.consumers:
+            queue = consumer.queue
+            if consumer in queue.consumers:
+                queue.consumers.remove(consumer)
+            for tag in sorted(consumer.pending, reverse=True):
+                envelope = consumer.pending[tag]._envelope
+                envelope.redelivered = True
+                queue.messages.appendleft(envelope)
+            consumer.pending.clear()
+            queues[queue.name] = queue
+        self.consumers.clear()
+        for queue in queues.values():
+            queue.dispatch()
+
+
+class MemoryConnection:
+    """Соединение (аналог aio_pika.RobustConnection)."""
+
+    def __init__(self, broker: MemoryBroker):
+        self.broker = broker
+        self.is_closed = False
+        self.close_callbacks = CallbackSet()
+        self.reconnect_callbacks = CallbackSet()
+        self.consumer_tags = itertools.count(1)
+        self.exclusive_queues: Set[str] = set()  # Удаляются при закрытии соединения
+        self._channels: List[MemoryChannel] = []
+
+    async def channel(self, **kwargs: Any) -> MemoryChannel:
+        if self.is_closed:
+            raise RuntimeError("Соединение закрыто")
+        channel = MemoryChannel(self)
+        self._channels.append(channel)
+        return channel
+
+    async def close(self, exc: Optional[BaseException] = None) -> None:
+        if self.is_closed:
+            return
+        self.is_closed = True
+        for channel in self._channels:
+            await channel.close()
+        for name in self.exclusive_queues:
+            self.broker.delete_queue(name)
+        self.exclusive_queues.clear()
+        for callback in tuple(self.close_callbacks):
+            callback(self, exc)
@@ -0,0 +1,201 @@
+"""
+Метрики Prometheus для продюсеров и консьюмеров RabbitMQ и пулов соединений с БД.
+
+Метрики регистрируются в отдельном реестре REGISTRY: приложения отдают его
+на /metrics, воркер - через собственный HTTP-сервер, а в тестах значения
+можно читать напрямую (REGISTRY.get_sample_value(...)).
+"""
+
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+
+REGISTRY = CollectorRegistry()
+
+# Границы гистограмм: от долей миллисекунды (publish/confirm) до таймаута RPC
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+MESSAGES_PUBLISHED = Counter(
+    "rabbit_messages_published_total",
+    "Опубликованные сообщения",
+    ["exchange", "message_type"],
+    registry=REGISTRY,
+)
+PUBLISH_DURATION = Histogram(
+    "rabbit_publish_duration_seconds",
+    "Полное время публикации (сериализация, канал, подтверждение)",
+    ["exchange"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+CONFIRM_DURATION = Histogram(
+    "rabbit_publish_confirm_duration_seconds",
+    "Время ожидания подтверждения публикации брокером",
+    ["exchange"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+MESSAGES_CONSUMED = Counter(
+    "rabbit_messages_consumed_total",
+    "Полученные сообщения по результату обработки (ok/error/rejected/expired)",
+    ["queue", "message_type", "status"],
+    registry=REGISTRY,
+)
+HANDLER_DURATION = Histogram(
+    "rabbit_handler_duration_seconds",
+    "Время работы обработчика по типу сообщения",
+    ["queue", "message_type"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+IN_FLIGHT = Gauge(
+    "rabbit_messages_in_flight",
+    "Сообщения, обрабатываемые прямо сейчас",
+    ["queue"],
+    registry=REGISTRY,
+)
+RPC_DURATION = Histogram(
+    "rabbit_rpc_duration_seconds",
+    "Время RPC-запроса от публикации до ответа",
+    ["message_type"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+RPC_TIMEOUTS = Counter(
+    "rabbit_rpc_timeouts_total",
+    "RPC-запросы, не дождавшиеся ответа",
+    ["message_type"],
+    registry=REGISTRY,
+)
+RPC_REJECTED = Counter(
+    "rabbit_rpc_rejected_total",
+    "RPC-запросы, завершённые без отправки (разомкнутый circuit breaker)",
+    ["message_type"],
+    registry=REGISTRY,
+)
+CIRCUIT_STATE = Gauge(
+    "rabbit_circuit_state",
+    "Состояние circuit breaker получателя RPC (0 - closed, 1 - half_open, 2 - open)",
+    ["target"],
+    registry=REGISTRY,
+)
+RPC_CACHE = Counter(
+    "rabbit_rpc_cache_total",
+    "Обращения к кешу RPC-ответов (hit/miss/coalesced)",
+    ["cache", "result"],
+    registry=REGISTRY,
+)
+RECONNECTS = Counter(
+    "rabbit_reconnects_total",
+    "Восстановления соединения с RabbitMQ",
+    registry=REGISTRY,
+)
+CONNECTION_READY = Gauge(
+    "rabbit_connection_ready",
+    "Готовность соединения с RabbitMQ (1 - готово)",
+    registry=REGISTRY,
+)
+DLQ_REJECTIONS = Counter(
+    "rabbit_dlq_rejections_total",
+    "Сообщения, отклонённые в DLX (unknown_type, handler_error)",
+    ["queue", "reason"],
+    registry=REGISTRY,
+)
+
+# Время жизни соединений с БД: от секунд (инвалидация) до часов (pool_recycle)
+LIFETIME_BUCKETS = (1.0, 10.0, 60.0, 300.0, 900.0, 1800.0, 3600.0, 7200.0, 21600.0)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Ожидание соединения из пула (включая открытие соединения сверх пула)",
+    ["pool"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Соединение не получено за pool_timeout",
+    ["pool"],
+    registry=REGISTRY,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Соединения, выданные из пула",
+    ["pool"],
+    registry=REGISTRY,
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Соединения, открытые сверх pool_size",
+    ["pool"],
+    registry=REGISTRY,
+)
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_capacity",
+    "Предел соединений пула (pool_size + max_overflow)",
+    ["pool"],
+    registry=REGISTRY,
+)
+DB_CONNECTION_LIFETIME = Histogram(
+    "db_connection_lifetime_seconds",
+    "Время жизни закрытых соединений с БД",
+    ["pool"],
+    buckets=LIFETIME_BUCKETS,
+    registry=REGISTRY,
+)
+
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Отставание реплики БД (inf - реплика недоступна)",
+    ["replica"],
+    registry=REGISTRY,
+)
+DB_READS_ROUTED = Counter(
+    "db_reads_routed_total",
+    "Сессии чтения по месту выполнения (реплика, primary_sticky, primary_fallback)",
+    ["target"],
+    registry=REGISTRY,
+)
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """
+    Текущее состояние метрик в текстовом формате Prometheus.
+
+    :return: Тело ответа и его Content-Type.
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int, addr: str = "0.0.0.0") -> None:
+    """
+    Отдельный HTTP-сервер метрик (для воркера без FastAPI).
+
+    :param port: Порт сервера.
+    :param addr: Адрес, на котором слушает сервер.
+    """
+    start_http_server(port, addr=addr, registry=REGISTRY)
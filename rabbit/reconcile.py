@@ -0,0 +1,69 @@
+"""
+Общие функции сверки копий пользователей между сервисами user и auth.
+
+Обе стороны считают хеш каждой строки по одним и тем же полям и дайджест
+диапазона имён (after, until] - последовательно по строкам в порядке
+username COLLATE "C". Совпавшие дайджесты означают, что диапазон не нужно
+сравнивать построчно; по сети передаются только дайджесты и строки
+расходящихся диапазонов.
+"""
+
+import hashlib
+import json
+from typing import Any, Mapping, Optional
+
+# Поля, которые сервис user синхронизирует в auth событиями user.*
+SYNCED_FIELDS = (
+    "username",
+    "email",
+    "phone_number",
+    "hashed_password",
+    "is_active",
+    "is_superuser",
+)
+
+# Порядок имён должен совпадать в обеих БД независимо от локали кластера
+USERNAME_COLLATION = "C"
+
+
+def row_hash(row: Mapping[str, Any]) -> str:
+    """
+    Хеш синхронизируемых полей строки пользователя.
+
+    :param row: Строка (mapping) с полями SYNCED_FIELDS; хеш пароля - bytes или str.
+    """
+    values = []
+    for field in SYNCED_FIELDS:
+        value = row[field]
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        values.append(value)
+    canonical = json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class RangeDigest:
+    """
+    Дайджест диапазона: хеш последовательности (username, хеш строки).
+
+    Строки добавляются в порядке username, поэтому память не зависит
+    от размера диапазона.
+    """
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self.count = 0
+
+    def update(self, username: str, hashed_row: str) -> None:
+        self._hash.update(f"{username}\x00{hashed_row}\n".encode("utf-8"))
+        self.count += 1
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "digest": self.hexdigest()}
+
+
+def range_label(after: Optional[str], until: Optional[str]) -> str:
+    return f"({after or '-inf'}, {until or '+inf'}]"
@@ -0,0 +1,102 @@
+"""
+Объединение одинаковых RPC-запросов (single-flight) и кеш ответов с коротким TTL.
+
+Параллельные запросы с одним ключом ждут один и тот же запрос к брокеру,
+а удачный ответ какое-то время отдаётся из памяти процесса. Актуальность
+обеспечивается явной инвалидацией (по событиям об изменении данных) и TTL.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+from rabbit import metrics
+
+T = TypeVar("T")
+
+
+def always_cacheable(value: Any) -> bool:
+    return True
+
+
+class SingleFlightCache(Generic[T]):
+    """
+    Кеш результатов асинхронных загрузок с объединением параллельных вызовов.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        maxsize: int = 10000,
+        cacheable: Callable[[T], bool] = always_cacheable,
+    ):
+        """
+        :param name: Имя кеша (метка метрик).
+        :param ttl: Время жизни ответа в секундах (0 - только объединение запросов).
+        :param maxsize: Максимальное число ключей в кеше (вытесняются самые старые).
+        :param cacheable: Решает, можно ли сохранить результат (ошибки не кешируются).
+        """
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.cacheable = cacheable
+        self._values: "OrderedDict[Hashable, Tuple[float, T]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, "asyncio.Future[T]"] = {}
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        """
+        Значение из кеша, результат уже идущей загрузки или новая загрузка.
+
+        Загрузка выполняется отдельной задачей: отмена одного из ожидающих
+        не прерывает запрос для остальных.
+
+        :param key: Ключ запроса (например, имя пользователя).
+        :param loader: Фабрика корутины, выполняющей запрос.
+        :return: Результат загрузки.
+        """
+        entry = self._values.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                metrics.RPC_CACHE.labels(self.name, "hit").inc()
+                return entry[1]
+            del self._values[key]
+
+        future = self._in_flight.get(key)
+        if future is None:
+            metrics.RPC_CACHE.labels(self.name, "miss").inc()
+            future = asyncio.ensure_future(loader())
+            self._in_flight[key] = future
+            future.add_done_callback(partial(self._on_loaded, key))
+        else:
+            metrics.RPC_CACHE.labels(self.name, "coalesced").inc()
+        return await asyncio.shield(future)
+
+    def _on_loaded(self, key: Hashable, future: "asyncio.Future[T]") -> None:
+        if self._in_flight.get(key) is not future:
+            # Ключ инвалидирован во время загрузки - ответ мог устареть
+            return
+        del self._in_flight[key]
+        if future.cancelled() or future.exception() is not None or self.ttl <= 0:
+            return
+        value = future.result()
+        if not self.cacheable(value):
+            return
+        self._values[key] = (time.monotonic() + self.ttl, value)
+        self._values.move_to_end(key)
+        while len(self._values) > self.maxsize:
+            self._values.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Удалить ключ из кеша; идущая загрузка не попадёт в кеш,
+        а следующий вызов get выполнит новый запрос.
+        """
+        self._values.pop(key, None)
+        self._in_flight.pop(key, None)
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._in_flight.clear()
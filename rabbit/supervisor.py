@@ -0,0 +1,157 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from aio_pika.abc import AbstractRobustChannel, AbstractRobustConnection
+
+from rabbit import metrics
+from rabbit.transport import Transport, transport_for_url
+
+log = logging.getLogger(__name__)
+
+# Хук топологии: вызывается при регистрации (reconnect=False)
+# и после каждого восстановления соединения (reconnect=True).
+TopologyHook = Callable[[bool], Awaitable[None]]
+
+
+class RabbitSupervisor:
+    """
+    Супервизор соединения с RabbitMQ для консьюмеров и продюсеров сервиса.
+
+    Держит одно robust-соединение на процесс, подписывается на колбэки
+    закрытия/восстановления соединения, повторно объявляет топологию
+    через зарегистрированные хуки и выставляет признак готовности,
+    который приложение может отдавать в health-check.
+    """
+
+    def __init__(
+        self,
+        connection_url: str,
+        max_retries: Optional[int] = None,
+        base_delay: float = 0.2,
+        max_delay: float = 15.0,
+        reconnect_interval: float = 1.0,
+        transport: Optional[Transport] = None,
+    ):
+        """
+        :param connection_url: URL подключения к RabbitMQ.
+        :param max_retries: Максимальное количество попыток первого подключения.
+        :param base_delay: Базовая задержка backoff в секундах.
+        :param max_delay: Максимальная задержка backoff в секундах.
+        :param reconnect_interval: Интервал переподключения после обрыва (секунды).
+        :param transport: Транспорт (по умолчанию выбирается по схеме URL:
+        amqp:// - RabbitMQ, memory:// - брокер в памяти).
+        """
+        self.connection_url = connection_url
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.reconnect_interval = reconnect_interval
+        self.transport = transport or transport_for_url(connection_url)
+
+        self.connection: Optional[AbstractRobustConnection] = None
+        self.ready = asyncio.Event()  # Признак готовности (соединение + топология)
+        self._hooks: List[TopologyHook] = []
+        self._channel: Optional[AbstractRobustChannel] = None
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def is_ready(self) -> bool:
+        """Готов ли супервизор принимать и отправлять сообщения."""
+        return self.ready.is_set()
+
+    async def add_topology_hook(self, hook: TopologyHook) -> None:
+        """
+        Зарегистрировать хук объявления топологии и сразу выполнить его.
+
+        Хук вызывается с reconnect=False при регистрации и с reconnect=True
+        после каждого восстановления соединения.
+        """
+        await self.start()
+        self._hooks.append(hook)
+        await hook(False)
+
+    def remove_topology_hook(self, hook: TopologyHook) -> None:
+        """Убрать хук (например, при остановке консьюмера)."""
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    async def start(self) -> AbstractRobustConnection:
+        """
+        Установить соединение (идемпотентно).
+        """
+        async with self._start_lock:
+            if self.connection is not None and not self.connection.is_closed:
+                return self.connection
+
+            log.warning("🔗 Подключение супервизора к RabbitMQ")
+            self.connection = await self.transport.connect(
+                self.connection_url,
+                max_retries=self.max_retries,
+                base_delay=self.base_delay,
+                max_delay=self.max_delay,
+                reconnect_interval=self.reconnect_interval,
+            )
+            self.connection.close_callbacks.add(self._on_close)
+            self.connection.reconnect_callbacks.add(self._on_reconnect)
+            self.ready.set()
+            metrics.CONNECTION_READY.set(1)
+            return self.connection
+
+    async def channel(self) -> AbstractRobustChannel:
+        """
+        Открыть новый robust-канал (например, для консьюмера со своим prefetch).
+        """
+        connection = await self.start()
+        return await connection.channel()
+
+    async def shared_channel(self) -> AbstractRobustChannel:
+        """
+        Общий канал для публикации сообщений (создаётся один раз).
+        """
+        if self._channel is None or self._channel.is_closed:
+            self._channel = await self.channel()
+        return self._channel
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Дождаться готовности супервизора.
+
+        :param timeout: Время ожидания в секундах (None - без ограничения).
+        :return: True, если супервизор готов.
+        """
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def close(self) -> None:
+        """Закрыть соединение и сбросить признак готовности."""
+        self.ready.clear()
+        metrics.CONNECTION_READY.set(0)
+        if self.connection is not None and not self.connection.is_closed:
+            await self.connection.close()
+        self.connection = None
+        self._channel = None
+
+    async def _run_hooks(self, reconnect: bool) -> None:
+        for hook in tuple(self._hooks):
+            await hook(reconnect)
+
+    def _on_close(self, *args) -> None:
+        if self.ready.is_set():
+            log.warning("🔌 Соединение с RabbitMQ потеряно, ожидаем восстановления")
+        self.ready.clear()
+        metrics.CONNECTION_READY.set(0)
+
+    async def _on_reconnect(self, *args) -> None:
+        metrics.RECONNECTS.inc()
+        try:
+            await self._run_hooks(reconnect=True)
+        except Exception as e:
+            log.error("❌ Ошибка повторного объявления топологии: %s", e)
+            return
+        self.ready.set()
+        metrics.CONNECTION_READY.set(1)
+        log.warning("♻️ Соединение с RabbitMQ восстановлено, топология объявлена")
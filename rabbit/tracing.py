@@ -0,0 +1,310 @@
+"""
+Лёгкая трассировка в стиле OpenTelemetry: HTTP -> RabbitMQ -> консьюмер.
+
+Контекст трассировки передаётся в заголовке W3C `traceparent` (HTTP-запросы
+и заголовки AMQP-сообщений), текущий span хранится в contextvars.
+Пока экспортёр не настроен (configure_tracing), span'ы не создаются.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Protocol
+
+log = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """
+    Идентификаторы span'а для передачи между сервисами.
+
+    --- trace_id: 32 hex-символа, общий для всей цепочки.
+    --- span_id: 16 hex-символов.
+    """
+
+    trace_id: str
+    span_id: str
+
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @classmethod
+    def from_traceparent(cls, value: Any) -> Optional["SpanContext"]:
+        if isinstance(value, bytes):
+            value = value.decode("ascii", errors="ignore")
+        if not isinstance(value, str):
+            return None
+        parts = value.strip().split("-")
+        if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            return None
+        return cls(trace_id=parts[1], span_id=parts[2])
+
+
+@dataclass
+class Span:
+    """Завершённый или текущий участок трассы."""
+
+    name: str
+    context: SpanContext
+    parent_id: Optional[str] = None
+    start_time: float = field(default_factory=time.time)
+    end_time: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+    _duration: float = field(default=0.0, repr=False)
+
+    @property
+    def duration_ms(self) -> float:
+        return self._duration * 1000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        self._duration = time.perf_counter() - self._started
+        self.end_time = self.start_time + self._duration
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter(Protocol):
+    """Получатель завершённых span'ов."""
+
+    def export(self, span: Span) -> None: ...
+
+
+class InMemoryExporter:
+    """Хранит span'ы в памяти (тесты, бенчмарки, отладка)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class JsonFileExporter:
+    """
+    Дописывает span'ы в файл по одному JSON-объекту на строку (для офлайн-анализа).
+
+    export только кладёт span в очередь: сериализацию и запись на диск
+    пачками выполняет фоновый поток, event loop на файловом вводе-выводе
+    не блокируется. Оставшиеся span'ы дописываются в close() (и при выходе
+    из процесса).
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="span-writer", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    def export(self, span: Span) -> None:
+        if self._writer.is_alive():  # После close() или ошибки записи span'ы не копим
+            self._queue.put(span)
+
+    def close(self) -> None:
+        """Дописать накопленные span'ы и остановить поток записи."""
+        if self._writer.is_alive():
+            self._queue.put(self._STOP)
+            self._writer.join()
+        atexit.unregister(self.close)
+
+    def _write_loop(self) -> None:
+        try:
+            self._write_batches()
+        except Exception as e:
+            log.error("❌ Запись span'ов в %s остановлена: %s", self.path, e)
+
+    def _write_batches(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            while True:
+                batch = [self._queue.get()]
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = any(item is self._STOP for item in batch)
+                file.writelines(
+                    json.dumps(item.to_dict(), ensure_ascii=False, default=str) + "\n"
+                    for item in batch
+                    if item is not self._STOP
+                )
+                file.flush()
+                if stop:
+                    return
+
+
+class LoggingExporter:
+    """Пишет span'ы в лог."""
+
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger or log
+
+    def export(self, span: Span) -> None:
+        self.logger.info(
+            "🧭 span %s %.2f мс trace_id=%s",
+            span.name,
+            span.duration_ms,
+            span.context.trace_id,
+        )
+
+
+_exporter: Optional[SpanExporter] = None
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def configure_tracing(exporter: Optional[SpanExporter]) -> None:
+    """
+    Включить трассировку с указанным экспортёром (None - выключить).
+    """
+    global _exporter
+    previous, _exporter = _exporter, exporter
+    if previous is not None and previous is not exporter:
+        close = getattr(previous, "close", None)
+        if close is not None:
+            close()  # JsonFileExporter дописывает очередь span'ов
+
+
+def build_exporter(
+    kind: str, file_path: str = "traces.ndjson"
+) -> Optional[SpanExporter]:
+    """
+    Создать экспортёр по имени из настроек: none, log, memory или file.
+    """
+    exporters = {
+        "none": lambda: None,
+        "log": LoggingExporter,
+        "memory": InMemoryExporter,
+        "file": lambda: JsonFileExporter(file_path),
+    }
+    if kind not in exporters:
+        raise ValueError(f"Неизвестный экспортёр трассировки: {kind}")
+    return exporters[kind]()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def trace_span(
+    name: str,
+    parent: Optional[SpanContext] = None,
+    activate: bool = True,
+    **attributes: Any,
+) -> Iterator[Optional[Span]]:
+    """
+    Контекстный менеджер span'а.
+
+    :param name: Имя операции (например "db.session", "consume user.created").
+    :param parent: Внешний родительский контекст (из traceparent);
+    по умолчанию - текущий span.
+    :param activate: Делать ли span текущим для вложенных операций
+    (False - для span'ов, которые закрываются в другом контексте).
+    :param attributes: Атрибуты span'а.
+    :return: Span или None, если трассировка выключена.
+    """
+    exporter = _exporter
+    if exporter is None:
+        yield None
+        return
+
+    if parent is None:
+        running = _current_span.get()
+        parent = running.context if running is not None else None
+    span = Span(
+        name=name,
+        context=SpanContext(
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+        ),
+        parent_id=parent.span_id if parent else None,
+        attributes=attributes,
+    )
+    token = _current_span.set(span) if activate else None
+    try:
+        yield span
+    except BaseException as e:
+        span.status = "error"
+        span.set_attribute("error", repr(e))
+        raise
+    finally:
+        span.end()
+        if token is not None:
+            _current_span.reset(token)
+        try:
+            exporter.export(span)
+        except Exception as e:
+            log.warning("⚠️ Не удалось экспортировать span %s: %s", name, e)
+
+
+def inject(headers: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Добавить traceparent текущего span'а в заголовки (HTTP или AMQP).
+    """
+    headers = headers if headers is not None else {}
+    span = _current_span.get()
+    if span is not None:
+        headers[TRACEPARENT_HEADER] = span.context.to_traceparent()
+    return headers
+
+
+def extract(headers: Optional[Mapping[str, Any]]) -> Optional[SpanContext]:
+    """
+    Прочитать родительский контекст из заголовков (HTTP или AMQP).
+    """
+    if not headers:
+        return None
+    return SpanContext.from_traceparent(headers.get(TRACEPARENT_HEADER))
+
+
+async def trace_http_request(request, call_next):
+    """
+    HTTP-middleware: span на запрос с учётом входящего traceparent.
+
+    Подключается через app.middleware("http")(trace_http_request).
+    """
+    with trace_span(
+        f"HTTP {request.method} {request.url.path}",
+        parent=extract(request.headers),
+        **{"http.method": request.method, "http.path": request.url.path},
+    ) as span:
+        response = await call_next(request)
+        if span is not None:
+            span.set_attribute("http.status_code", response.status_code)
+            response.headers[TRACEPARENT_HEADER] = span.context.to_traceparent()
+        return response
@@ -0,0 +1,160 @@
+"""
+Транспорты пакета rabbit: реальный RabbitMQ (aio_pika) и брокер в памяти.
+
+Транспорт выбирается по схеме URL подключения:
+    amqp://, amqps://  - AioPikaTransport (aio_pika.connect_robust)
+    memory://<имя>     - InMemoryTransport (общий брокер процесса с этим именем)
+
+Брокер в памяти поддерживает обменники, очереди, привязки, DLX и очереди
+ответов RPC, поэтому однопроцессный запуск и тесты проходят весь поток
+событий без сети.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Any, Dict, Iterator, Optional, Protocol
+
+import aio_pika
+from aio_pika.abc import AbstractRobustConnection
+
+from rabbit.memory_broker import MemoryBroker, MemoryConnection
+
+log = logging.getLogger(__name__)
+
+MEMORY_SCHEME = "memory://"
+
+
+def backoff_delays(
+    base: float = 0.2,
+    maximum: float = 15.0,
+    factor: float = 2.0,
+) -> Iterator[float]:
+    """
+    Бесконечный генератор задержек экспоненциального backoff с "full jitter".
+
+    Каждая задержка выбирается случайно из [0, min(maximum, base * factor ** n)],
+    чтобы несколько сервисов не ломились в брокер одновременно после его рестарта.
+
+    :param base: Базовая задержка в секундах.
+    :param maximum: Верхняя граница задержки в секундах.
+    :param factor: Множитель экспоненты.
+    """
+    attempt = 0
+    while True:
+        cap = min(maximum, base * factor**attempt)
+        yield random.uniform(0, cap)
+        attempt += 1
+
+
+async def connect_with_backoff(
+    connection_url: str,
+    max_retries: Optional[int] = None,
+    base_delay: float = 0.2,
+    max_delay: float = 15.0,
+    reconnect_interval: float = 1.0,
+) -> AbstractRobustConnection:
+    """
+    Подключение к RabbitMQ с экспоненциальным backoff и jitter.
+
+    :param connection_url: URL для подключения.
+    :param max_retries: Максимальное количество попыток (None - без ограничения).
+    :param base_delay: Базовая задержка между попытками в секундах.
+    :param max_delay: Максимальная задержка между попытками в секундах.
+    :param reconnect_interval: Интервал переподключения robust-соединения после обрыва.
+    :return: Robust-соединение с RabbitMQ.
+    """
+    delays = backoff_delays(base=base_delay, maximum=max_delay)
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            connection = await aio_pika.connect_robust(
+                connection_url,
+                reconnect_interval=reconnect_interval,
+            )
+            log.warning("✅ Успешное подключение к RabbitMQ (попытка %d)", attempt)
+            return connection
+        except Exception as e:
+            if max_retries is not None and attempt >= max_retries:
+                log.error("❌ Не удалось подключиться к RabbitMQ после всех попыток")
+                raise
+            delay = next(delays)
+            log.warning(
+                "⚠️ Ошибка подключения к RabbitMQ (попытка %d): %s. Повтор через %.2f с",
+                attempt,
+                e,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+
+class Transport(Protocol):
+    """Способ получить соединение с брокером."""
+
+    async def connect(
+        self,
+        connection_url: str,
+        max_retries: Optional[int] = None,
+        base_delay: float = 0.2,
+        max_delay: float = 15.0,
+        reconnect_interval: float = 1.0,
+    ) -> Any: ...
+
+
+class AioPikaTransport:
+    """Реальный RabbitMQ через aio_pika.connect_robust с backoff."""
+
+    async def connect(
+        self,
+        connection_url: str,
+        max_retries: Optional[int] = None,
+        base_delay: float = 0.2,
+        max_delay: float = 15.0,
+        reconnect_interval: float = 1.0,
+    ) -> AbstractRobustConnection:
+        return await connect_with_backoff(
+            connection_url,
+            max_retries=max_retries,
+            base_delay=base_delay,
+            max_delay=max_delay,
+            reconnect_interval=reconnect_interval,
+        )
+
+
+_memory_brokers: Dict[str, MemoryBroker] = {}
+
+
+def get_memory_broker(name: str = "") -> MemoryBroker:
+    """
+    Брокер в памяти с указанным именем (один на процесс).
+    """
+    broker = _memory_brokers.get(name)
+    if broker is None:
+        broker = _memory_brokers[name] = MemoryBroker()
+    return broker
+
+
+class InMemoryTransport:
+    """Брокер в памяти процесса: без сети, доставка через event loop."""
+
+    def __init__(self, broker: Optional[MemoryBroker] = None):
+        """
+        :param broker: Брокер (по умолчанию - определяется именем из URL).
+        """
+        self.broker = broker
+
+    async def connect(
+        self, connection_url: str = MEMORY_SCHEME, **kwargs: Any
+    ) -> MemoryConnection:
+        broker = self.broker or get_memory_broker(connection_url[len(MEMORY_SCHEME) :])
+        return MemoryConnection(broker)
+
+
+def transport_for_url(connection_url: str) -> Transport:
+    """
+    Выбрать транспорт по схеме URL подключения.
+    """
+    if connection_url.startswith(MEMORY_SCHEME):
+        return InMemoryTransport()
+    return AioPikaTransport()
@@ -0,0 +1,239 @@
+"""
+Отдельный процесс-воркер для консьюмеров RabbitMQ.
+
+Позволяет масштабировать обработку очередей независимо от HTTP-приложения:
+
+    python -m rabbit.worker --service auth --concurrency 32 --processes 4
+
+Каждый процесс импортирует модули сервиса заново (multiprocessing "spawn"),
+поэтому у него свой event loop, свой пул соединений с БД и своё
+соединение с RabbitMQ. Запускать нужно из каталога сервиса (/app в контейнере)
+или указать его через --app-dir.
+"""
+
+import argparse
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from rabbit.aio_config import configure_logging
+from rabbit.log_utils import enable_payload_logging
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ServiceEntrypoint:
+    """
+    Точка входа консьюмеров сервиса.
+
+    --- module: Модуль сервиса с конфигурацией RabbitMQ.
+    --- factory: Корутинная функция, создающая и запускающая консьюмер.
+    --- supervisor: Имя супервизора соединения в модуле.
+    --- db_module: Модуль с db_helper (пул закрывается при остановке).
+    --- preload: Модули, импортируемые заранее в том же порядке, что и в main.py
+        (модули сервисов ссылаются друг на друга циклически).
+    """
+
+    module: str
+    factory: str
+    supervisor: str
+    db_module: Optional[str] = "core.models"
+    preload: Tuple[str, ...] = ("api",)
+
+
+SERVICES: Dict[str, ServiceEntrypoint] = {
+    "auth": ServiceEntrypoint(
+        module="auht_rabbit",
+        factory="start_consumer_auth",
+        supervisor="auth_supervisor",
+    ),
+    "user": ServiceEntrypoint(
+        module="user_rabbit",
+        factory="start_consumer_user",
+        supervisor="user_supervisor",
+    ),
+}
+
+
+async def serve(entry: ServiceEntrypoint, drain_timeout: float) -> None:
+    """
+    Запустить консьюмеры сервиса в текущем event loop и ждать сигнала остановки.
+    """
+    from rabbit.lifecycle import ConsumerGroup
+
+    for name in entry.preload:
+        importlib.import_module(name)
+    module = importlib.import_module(entry.module)
+    group = ConsumerGroup(
+        supervisor=getattr(module, entry.supervisor), drain_timeout=drain_timeout
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    group.start(getattr(module, entry.factory))
+    log.warning(f"🚀 Воркер {entry.module} запущен (pid={os.getpid()})")
+    await stop.wait()
+
+    log.warning(f"🛑 Остановка воркера {entry.module} (pid={os.getpid()})")
+    await group.shutdown()
+    if entry.db_module:
+        db_helper = getattr(importlib.import_module(entry.db_module), "db_helper")
+        await db_helper.dispose()
+
+
+def run_process(
+    service: str,
+    concurrency: int,
+    drain_timeout: float,
+    app_dir: str,
+    db_pool_size: Optional[int] = None,
+    payload_sample_rate: Optional[float] = None,
+    metrics_port: Optional[int] = None,
+    trace_file: Optional[str] = None,
+) -> None:
+    """
+    Точка входа дочернего процесса: настройка окружения и запуск event loop.
+
+    Настройки передаются через переменные окружения до импорта модулей сервиса,
+    чтобы их подхватил pydantic-settings.
+    """
+    os.environ["FASTAPI__RABBIT__PREFETCH_COUNT"] = str(concurrency)
+    os.environ.setdefault("FASTAPI__DB__PROFILE", "worker")
+    if db_pool_size is not None:
+        os.environ["FASTAPI__DB__POOL_SIZE"] = str(db_pool_size)
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+
+    configure_logging()
+    if metrics_port:
+        from rabbit.metrics import start_metrics_server
+
+        start_metrics_server(metrics_port)
+    if trace_file:
+        from rabbit.tracing import JsonFileExporter, configure_tracing
+
+        configure_tracing(JsonFileExporter(trace_file))
+    if payload_sample_rate:
+        enable_payload_logging("rabbit.base_aio", sample_rate=payload_sample_rate)
+    asyncio.run(serve(SERVICES[service], drain_timeout))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m rabbit.worker",
+        description="Запуск консьюмеров RabbitMQ отдельно от HTTP-приложения",
+    )
+    parser.add_argument("--service", choices=sorted(SERVICES), required=True)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=32,
+        help="Сообщений в обработке на процесс (prefetch_count)",
+    )
+    parser.add_argument(
+        "--processes", type=int, default=1, help="Количество процессов-воркеров"
+    )
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=15.0,
+        help="Время на завершение обработчиков при остановке (сек)",
+    )
+    parser.add_argument(
+        "--db-pool-size",
+        type=int,
+        default=None,
+        help="Размер пула соединений с БД на процесс (по умолчанию из настроек)",
+    )
+    parser.add_argument(
+        "--log-payloads",
+        type=float,
+        default=None,
+        metavar="SAMPLE_RATE",
+        help="Логировать тела сообщений с указанной долей выборки (0..1)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Порт метрик Prometheus; процесс N слушает порт + N",
+    )
+    parser.add_argument(
+        "--trace-file",
+        default=None,
+        help="Файл для span'ов трассировки (JSON по строке на span)",
+    )
+    parser.add_argument(
+        "--app-dir", default=os.getcwd(), help="Каталог с кодом сервиса"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    process_args = (
+        args.service,
+        args.concurrency,
+        args.drain_timeout,
+        args.app_dir,
+        args.db_pool_size,
+        args.log_payloads,
+    )
+
+    if args.processes <= 1:
+        run_process(*process_args, args.metrics_port, args.trace_file)
+        return
+
+    configure_logging()
+    context = multiprocessing.get_context("spawn")
+    stopping = False
+
+    def spawn(index: int) -> multiprocessing.Process:
+        metrics_port = args.metrics_port + index if args.metrics_port else None
+        process = context.Process(
+            target=run_process,
+            args=(*process_args, metrics_port, args.trace_file),
+            name=f"{args.service}-worker-{index}",
+        )
+        process.start()
+        return process
+
+    def handle_stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for process in processes:
+            if process.is_alive():
+                process.terminate()  # SIGTERM - дочерний процесс остановится корректно
+
+    processes = [spawn(index) for index in range(args.processes)]
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+    log.warning(f"🚀 Запущено процессов-воркеров {args.service}: {len(processes)}")
+
+    while any(process.is_alive() for process in processes) or not stopping:
+        if not stopping:
+            for index, process in enumerate(processes):
+                if not process.is_alive():
+                    log.error(
+                        f"❌ Воркер pid={process.pid} завершился с кодом {process.exitcode}, перезапуск"
+                    )
+                    processes[index] = spawn(index)
+        time.sleep(1)
+
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""create users and tokens
+
+Revision ID: 8959e6fd09b0
+Revises:
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8959e6fd09b0"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "active_tokens",
+        sa.Column("uuid", sa.Uuid(), nullable=False),
+        sa.Column("access_token", sa.LargeBinary(), nullable=False),
+        sa.Column("refresh_token", sa.LargeBinary(), nullable=True),
+        sa.Column("access_expires_at", sa.DateTime(), nullable=False),
+        sa.Column("refresh_expires_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("user_agent", sa.String(), nullable=True),
+        sa.Column("ip_address", sa.String(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("uuid", name=op.f("pk_active_tokens")),
+        sa.UniqueConstraint("uuid", name=op.f("uq_active_tokens_uuid")),
+    )
+    op.create_index(
+        op.f("ix_active_tokens_access_token"),
+        "active_tokens",
+        ["access_token"],
+        unique=True,
+    )
+    op.create_index(
+        op.f("ix_active_tokens_refresh_token"),
+        "active_tokens",
+        ["refresh_token"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_active_tokens_user_id"), "active_tokens", ["user_id"], unique=False
+    )
+    op.create_table(
+        "token_black_lists",
+        sa.Column("uuid", sa.Uuid(), nullable=False),
+        sa.Column("access_token", sa.LargeBinary(), nullable=False),
+        sa.Column("access_expires_at", sa.DateTime(), nullable=True),
+        sa.Column("refresh_token", sa.LargeBinary(), nullable=True),
+        sa.Column("refresh_expires_at", sa.DateTime(), nullable=True),
+        sa.Column("username", sa.String(length=50), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("uuid", name=op.f("pk_token_black_lists")),
+        sa.UniqueConstraint("uuid", name=op.f("uq_token_black_lists_uuid")),
+    )
+    op.create_index(
+        op.f("ix_token_black_lists_access_token"),
+        "token_black_lists",
+        ["access_token"],
+        unique=True,
+    )
+    op.create_index(
+        op.f("ix_token_black_lists_refresh_token"),
+        "token_black_lists",
+        ["refresh_token"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_token_black_lists_username"),
+        "token_black_lists",
+        ["username"],
+        unique=False,
+    )
+    op.create_table(
+        "users",
+        sa.Column("uuid", sa.Uuid(), nullable=False),
+        sa.Column("username", sa.String(length=50), nullable=False),
+        sa.Column("email", sa.String(length=50), nullable=False),
+        sa.Column("phone_number", sa.String(length=25), nullable=True),
+        sa.Column("hashed_password", sa.LargeBinary(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("is_superuser", sa.Boolean(), nullable=False),
+        sa.Column("tier_id", sa.Integer(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_users")),
+        sa.UniqueConstraint("uuid", name=op.f("uq_users_uuid")),
+    )
+    op.create_index(op.f("ix_users_username"), "users", ["username"], unique=True)
+    op.create_index(op.f("ix_users_email"), "users", ["email"], unique=True)
+    op.create_index(
+        op.f("ix_users_phone_number"), "users", ["phone_number"], unique=True
+    )
+    op.create_index(op.f("ix_users_is_active"), "users", ["is_active"], unique=False)
+    op.create_index(op.f("ix_users_tier_id"), "users", ["tier_id"], unique=False)
+    op.create_index(
+        "ix_users_username_c",
+        "users",
+        [sa.text('username COLLATE "C"')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_username_c", table_name="users")
+    op.drop_index(op.f("ix_users_tier_id"), table_name="users")
+    op.drop_index(op.f("ix_users_is_active"), table_name="users")
+    op.drop_index(op.f("ix_users_phone_number"), table_name="users")
+    op.drop_index(op.f("ix_users_email"), table_name="users")
+    op.drop_index(op.f("ix_users_username"), table_name="users")
+    op.drop_table("users")
+    op.drop_index(op.f("ix_token_black_lists_username"), table_name="token_black_lists")
+    op.drop_index(
+        op.f("ix_token_black_lists_refresh_token"), table_name="token_black_lists"
+    )
+    op.drop_index(
+        op.f("ix_token_black_lists_access_token"), table_name="token_black_lists"
+    )
+    op.drop_table("token_black_lists")
+    op.drop_index(op.f("ix_active_tokens_user_id"), table_name="active_tokens")
+    op.drop_index(op.f("ix_active_tokens_refresh_token"), table_name="active_tokens")
+    op.drop_index(op.f("ix_active_tokens_access_token"), table_name="active_tokens")
+    op.drop_table("active_tokens")
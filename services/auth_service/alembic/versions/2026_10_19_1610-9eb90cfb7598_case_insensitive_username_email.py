@@ -0,0 +1,83 @@
+"""case-insensitive username and email
+
+Уникальность username и email - без учёта регистра: уникальные индексы
+по lower(username) и lower(email) вместо индексов по столбцам.
+Индексы строятся CONCURRENTLY, без блокировки записи в users.
+
+Revision ID: 9eb90cfb7598
+Revises: 8959e6fd09b0
+Create Date: 2026-10-19 16:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9eb90cfb7598"
+down_revision: Union[str, None] = "8959e6fd09b0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FIELDS = ("username", "email")
+
+
+def check_duplicates(field: str) -> None:
+    """Уникальный индекс не построится, если значения совпадают без учёта регистра."""
+    if op.get_context().as_sql:
+        return
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                f"SELECT lower({field}) FROM users "
+                f"GROUP BY lower({field}) HAVING count(*) > 1 LIMIT 10"
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if duplicates:
+        raise RuntimeError(
+            f"Совпадающие без учёта регистра значения {field}: {duplicates}. "
+            "Устраните повторы в сервисе user (reconcile_job) и повторите миграцию."
+        )
+
+
+def upgrade() -> None:
+    for field in FIELDS:
+        check_duplicates(field)
+    with op.get_context().autocommit_block():
+        for field in FIELDS:
+            op.create_index(
+                f"uq_users_{field}_ci",
+                "users",
+                [sa.text(f"lower({field})")],
+                unique=True,
+                postgresql_concurrently=True,
+            )
+            op.drop_index(
+                f"ix_users_{field}",
+                table_name="users",
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for field in FIELDS:
+            op.create_index(
+                f"ix_users_{field}",
+                "users",
+                [field],
+                unique=True,
+                postgresql_concurrently=True,
+            )
+            op.drop_index(
+                f"uq_users_{field}_ci",
+                table_name="users",
+                postgresql_concurrently=True,
+            )
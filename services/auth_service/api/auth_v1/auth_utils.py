@@ -32,7 +32,9 @@ async def get_user_by_token_sub(
             )
         # Запрос к базе данных для поиска пользователя по имени
         result = await db.execute(
-            select(user_model.User).where(user_model.User.username == username)
+            select(user_model.User).where(
+                user_model.User.field_equals("username", username)
+            )
         )
         user = result.scalars().first()
 
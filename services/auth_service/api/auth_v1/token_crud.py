@@ -1,6 +1,7 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+from core.models import save
 from core.models.active_token_model import ActiveToken
 from core.models.token_blacklist_model import TokenBlackList
 from core.schemas.auth_user_schemas import AuthUserSchema
@@ -26,9 +27,7 @@ async def add_tokens_to_db(
         user_agent=user_agent,
         ip_address=ip_address,
     )
-    db.add(token_record)
-    await db.commit()
-    await db.refresh(token_record)
+    await save(db, token_record)
     return token_record
 
 
@@ -50,9 +49,7 @@ async def add_tokens_to_blacklist(
         access_expires_at=access_expires_at,
     )
 
-    db.add(db_token_blacklist)
-    await db.commit()
-    await db.refresh(db_token_blacklist)
+    await save(db, db_token_blacklist)
 
     return db_token_blacklist
 
@@ -9,7 +9,7 @@ from core.models import db_helper
 async def validate_auth_user(
     username: str = Form(),
     password: str = Form(),
-    db: AsyncSession = Depends(db_helper.session_getter),
+    db: AsyncSession = Depends(db_helper.read_session_getter),
 ):
     un_authed_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -61,7 +61,7 @@ async def get_current_token_payload(
 
 async def get_current_auth_user(
     payload: dict = Depends(get_current_token_payload),
-    db: AsyncSession = Depends(db_helper.session_getter),
+    db: AsyncSession = Depends(db_helper.read_session_getter),
 ) -> User:
     validate_token_type(payload=payload, token_type=ACCESS_TOKEN_TYPE)
     return await get_user_by_token_sub(payload=payload, db=db)
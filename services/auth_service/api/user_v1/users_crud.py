@@ -1,14 +1,15 @@
 import asyncio
 import uuid
-from typing import Annotated
+from typing import Annotated, Any, AsyncIterator, List, Mapping, Optional
 
 from fastapi.params import Depends
 from sqlalchemy import select
 
-from core.models import db_helper
+from core.models import db_helper, save
 from core.models.auth_user_model import User
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.schemas.auth_user_schemas import AuthUserSchema
+from rabbit.reconcile import SYNCED_FIELDS, USERNAME_COLLATION
 
 
 class CRUDUser:
@@ -17,16 +18,52 @@ class CRUDUser:
         return result.scalars().first()
 
     async def get_user_by_field(self, db: AsyncSession, field: str, value: str):
-        if field == "email":
-            result = await db.execute(select(User).where(User.email == value))
-            return result.scalars().first()
+        """
+        Пользователь по email, username (без учёта регистра) или phone_number.
+        """
+        if field not in ("email", "username", "phone_number"):
+            return None
+        result = await db.execute(select(User).where(User.field_equals(field, value)))
+        return result.scalars().first()
+
+    @staticmethod
+    def _username_range(after: Optional[str], until: Optional[str]):
+        key = User.username.collate(USERNAME_COLLATION)
+        conditions = []
+        if after is not None:
+            conditions.append(key > after)
+        if until is not None:
+            conditions.append(key <= until)
+        return (
+            select(*(getattr(User, field) for field in SYNCED_FIELDS))
+            .where(*conditions)
+            .order_by(key)
+        )
 
-        if field == "username":
-            result = await db.execute(select(User).where(User.username == value))
-            return result.scalars().first()
-        if field == "phone_number":
-            result = await db.execute(select(User).where(User.phone_number == value))
-            return result.scalars().first()
+    async def stream_users_range(
+        self, db: AsyncSession, after: Optional[str], until: Optional[str]
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """
+        Синхронизируемые поля пользователей диапазона имён (after, until]
+        в порядке username, порциями через серверный курсор.
+        """
+        stmt = self._username_range(after, until).execution_options(yield_per=1000)
+        result = await db.stream(stmt)
+        async for row in result.mappings():
+            yield row
+
+    async def get_users_range(
+        self,
+        db: AsyncSession,
+        after: Optional[str],
+        until: Optional[str],
+        limit: int,
+    ) -> List[Mapping[str, Any]]:
+        """
+        Страница (keyset) пользователей диапазона имён (after, until].
+        """
+        result = await db.execute(self._username_range(after, until).limit(limit))
+        return list(result.mappings().all())
 
     async def create_user(self, db: AsyncSession, user: AuthUserSchema):
         # Проверка, является ли хешированный пароль в байтах
@@ -44,9 +81,7 @@ class CRUDUser:
             is_superuser=user.is_superuser,
             tier_id=user.tier_id,
         )
-        db.add(db_user)
-        await db.commit()
-        await db.refresh(db_user)
+        await save(db, db_user)
         return db_user
 
     async def update_user(
@@ -58,8 +93,7 @@ class CRUDUser:
         update_data = user_update.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_user, key, value)
-        await db.commit()
-        await db.refresh(db_user)
+        await save(db, db_user)
         return db_user
 
     async def delete_user(self, db: AsyncSession, user_uuid: uuid.UUID):
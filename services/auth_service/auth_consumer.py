@@ -1,16 +1,16 @@
-import json
 import logging
 from enum import Enum
 from typing import Dict, Any
 
-import aio_pika
-from aio_pika import IncomingMessage
-from pydantic import ValidationError
-
-from core.schemas.auth_user_schemas import AuthUserSchema
+from core.schemas.auth_user_schemas import (
+    AuthUserSchema,
+    ReconcileRangeRequest,
+    UserEventMessage,
+)
 from rabbit.base_aio import ServiceConsumer
 from core.models import db_helper
 from api.user_v1.users_crud import crud_user
+from rabbit.reconcile import RangeDigest, row_hash
 
 log = logging.getLogger(__name__)
 
@@ -28,62 +28,98 @@ class AuthConsumer(ServiceConsumer):
 
     async def initialize(self):
         """
-        Инициализация консьюмера (объявление очередей и привязка к обменникам)
+        Инициализация консьюмера (регистрация обработчиков, объявление очередей,
+        привязка к обменникам и подписка на очередь). Не блокирует.
         """
-        await self.consume_messages(
-            self.process_user_event,
+        for event in UserEvent:
+            self.add_handler(
+                event.value, self.process_user_event, model=UserEventMessage
+            )
+        # RPC задания сверки сервиса user (python -m reconcile_job)
+        self.add_handler(
+            "auth.reconcile_digest", self.reconcile_digest, model=ReconcileRangeRequest
+        )
+        self.add_handler(
+            "auth.reconcile_rows", self.reconcile_rows, model=ReconcileRangeRequest
+        )
+        await self.start(
+            # Подписываемся только на обрабатываемые события пользователя,
+            # RPC-трафик user_events в очередь auth не попадает
             additional_bindings=[
-                {"exchange_name": "user_exchange", "routing_key": "auth_routing_key"}
+                {"exchange_name": "user_events", "routing_key": event.value}
+                for event in UserEvent
             ],
         )
 
-    async def process_user_event(self, message_data: Dict[str, Any]):
+    async def process_user_event(self, message: UserEventMessage):
         """
-        Обрабатывает события пользователя и возвращает результат
+        Обрабатывает события пользователя и возвращает результат.
+
+        Тело уже провалидировано по схеме UserEventMessage базовым консьюмером.
         """
         try:
-            # Получаем данные из декодированного сообщения
-            event_type = message_data.get("event_type")
-            user_data = message_data.get("user_data")
-
-            if not event_type or not user_data:
-                raise ValueError("Неполные данные в сообщении")
-
-            log.info(
-                f"📥 Получено сообщение: {message_data}, тип: {type(message_data)}"
-            )
-
+            user = message.user_data
             # Конвертируем строку обратно в bytes для хеша пароля
-            if "hashed_password" in user_data:
-                user_data["hashed_password"] = user_data["hashed_password"].encode()
+            if isinstance(user.hashed_password, str):
+                user.hashed_password = user.hashed_password.encode()
 
-            # Создаем объект схемы
-            try:
-                user = AuthUserSchema(**user_data)
-            except ValidationError as ve:
-                log.error(f"❌ Ошибка валидации данных пользователя: {str(ve)}")
-                return
-
-            result = await self.handle_user_event(event_type, user)
+            result = await self.handle_user_event(message.event_type, user)
 
             # Логируем успешную операцию
-            log.info(
-                f"✅ Успешно обработано {event_type} событие для пользователя {user.username}"
+            log.debug(
+                "✅ Успешно обработано %s событие для пользователя %s",
+                message.event_type,
+                user.username,
             )
 
             return result
 
         except Exception as e:
-            log.error(f"❌ Ошибка обработки сообщения: {str(e)}")
+            log.error("❌ Ошибка обработки события %s: %s", message.event_type, e)
             raise
 
+    async def reconcile_digest(self, request: ReconcileRangeRequest) -> Dict[str, Any]:
+        """
+        Дайджест пользователей диапазона (after, until] для сверки с сервисом user.
+
+        Строки читаются серверным курсором, память не зависит от размера диапазона.
+        """
+        digest = RangeDigest()
+        async with db_helper.session() as db:
+            async for row in crud_user.stream_users_range(
+                db, request.after, request.until
+            ):
+                digest.update(row["username"], row_hash(row))
+        return digest.to_dict()
+
+    async def reconcile_rows(self, request: ReconcileRangeRequest) -> Dict[str, Any]:
+        """
+        Страница строк расходящегося диапазона с хешами (не больше limit).
+
+        Следующая страница запрашивается с after = последнему имени этой.
+        """
+        async with db_helper.session() as db:
+            rows = await crud_user.get_users_range(
+                db, request.after, request.until, request.limit
+            )
+        return {
+            "rows": [
+                {
+                    **row,
+                    "hashed_password": row["hashed_password"].decode(),
+                    "hash": row_hash(row),
+                }
+                for row in rows
+            ]
+        }
+
     async def handle_user_event(
         self, event_type: str, user: AuthUserSchema
     ) -> Dict[str, Any]:
         """
         Обрабатывает различные типы событий пользователя
         """
-        async with db_helper.session_factory() as db:
+        async with db_helper.session() as db:
             try:
                 if event_type == UserEvent.CREATED:
                     result = await crud_user.create_user(db=db, user=user)
@@ -1,8 +1,31 @@
+import json
+import logging
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence
 
-from auht_rabbit import auth_config
+from aio_pika import ExchangeType
+from aio_pika.abc import AbstractIncomingMessage
+
+from auht_rabbit import auth_config, auth_supervisor
+from auth_consumer import UserEvent
+from core.config import settings
+from rabbit.aio_config import RabbitMQConfig
 from rabbit.base_aio import ServicePublisher
+from rabbit.rpc_cache import SingleFlightCache
+from rabbit.supervisor import RabbitSupervisor
+
+log = logging.getLogger(__name__)
+
+# События, после которых кешированные данные пользователя устаревают
+INVALIDATING_EVENTS = (UserEvent.UPDATED, UserEvent.DELETED)
+
+# Максимальный размер одного пакетного запроса (ограничение сервиса user)
+USERS_BATCH_SIZE = 1000
+
+
+def is_user_data(response: Dict[str, Any]) -> bool:
+    """Ошибки и таймауты RPC не кешируются."""
+    return "error" not in response and response.get("status") != "error"
 
 
 class AuthPublisher(ServicePublisher):
@@ -10,49 +33,125 @@ class AuthPublisher(ServicePublisher):
     Класс для публикации сообщений из микросервиса `auth`.
     """
 
+    def __init__(
+        self,
+        config: RabbitMQConfig,
+        supervisor: Optional[RabbitSupervisor] = None,
+        user_data_cache_ttl: float = 5.0,
+    ):
+        """
+        :param user_data_cache_ttl: Время жизни кешированных данных пользователя (сек).
+        """
+        super().__init__(config, supervisor)
+        self.user_data_cache: SingleFlightCache[Dict[str, Any]] = SingleFlightCache(
+            "user.get_user_data", ttl=user_data_cache_ttl, cacheable=is_user_data
+        )
+
+    async def _declare_topology(self, reconnect: bool) -> None:
+        await super()._declare_topology(reconnect)
+        if reconnect:
+            # Очередь инвалидации и подписка восстановлены robust-каналом, но
+            # события, отправленные без соединения, не придут - сбрасываем кеш
+            self.user_data_cache.clear()
+            return
+        # Своя эксклюзивная очередь на каждый процесс: кеш живёт в памяти процесса,
+        # а события из очереди auth достаются только одному из консьюмеров
+        channel = await self.supervisor.shared_channel()
+        user_exchange = await channel.declare_exchange(
+            "user_events", ExchangeType.TOPIC, durable=False
+        )
+        queue = await channel.declare_queue(exclusive=True)
+        for event in INVALIDATING_EVENTS:
+            await queue.bind(user_exchange, routing_key=event.value)
+        await queue.consume(self._invalidate_user_data, no_ack=True)
+
+    async def _invalidate_user_data(self, message: AbstractIncomingMessage) -> None:
+        try:
+            username = json.loads(message.body)["user_data"]["username"].lower()
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # Не знаем, чьи данные изменились - сбрасываем кеш целиком
+            log.warning("⚠️ Событие %s без имени пользователя", message.routing_key)
+            self.user_data_cache.clear()
+            return
+        # При смене имени старый ключ доживёт до конца TTL
+        self.user_data_cache.invalidate(username)  # Ключи кеша в нижнем регистре
+
     async def request_user_data(self, username: str) -> Dict[str, Any]:
         """
         Запрос данных пользователя через RabbitMQ.
 
+        Параллельные запросы одного пользователя объединяются в один RPC,
+        удачный ответ кешируется на user_data_cache_ttl секунд и сбрасывается
+        событиями user.updated / user.deleted.
+
         :param username: Имя пользователя.
-        :return: Данные пользователя.
+        :return: Данные пользователя (копия, её можно изменять).
         """
+        await self.start()
+        # Поиск пользователя без учёта регистра: "Foo" и "foo" - один ключ кеша
+        response = await self.user_data_cache.get(
+            username.lower(), lambda: self._request_user_data(username)
+        )
+        return dict(response)
+
+    async def _request_user_data(self, username: str) -> Dict[str, Any]:
         correlation_id = str(
             uuid.uuid4()
         )  # Уникальный ID для сопоставления запрос-ответ
-        message = {
-            "action": "get_user_data",
-            "username": username,
-            "reply_to": auth_config.routing_key,
-            "correlation_id": correlation_id,
-        }
-        # Если запрос идёт к user_exchange, передаём exchange_name и routing_key явно
+        # reply_to и correlation_id передаются в свойствах AMQP-сообщения
+        message = {"username": username}
+        # Если запрос идёт к user_events, передаём exchange_name и routing_key явно
         response = await self.rpc_request(
             message=message,
-            exchange_name="user_exchange",  # Используйте имя обменника для сервиса user
+            exchange_name="user_events",  # Используйте имя обменника для сервиса user
             routing_key="user_routing_key",  # Ключ маршрутизации для сервиса user
+            correlation_id=correlation_id,
+            message_type="user.get_user_data",
         )
         return response
 
-    async def publish_token_issued(self, user_id: int, username: str):
-        """
-        Публикует событие выдачи токена.
+    async def request_users_data(
+        self,
+        usernames: Sequence[str] = (),
+        ids: Sequence[int] = (),
+        timeout: int = 30,
+    ) -> Dict[str, Any]:
         """
-        message = {
-            "event": "token_issued",
-            "data": {"user_id": user_id, "username": username},
-        }
-        await self.publish_message(message)
+        Пакетный запрос данных пользователей (user.get_users_data).
 
-    async def publish_token_validated(self, username: str):
-        """
-        Публикует событие валидации токена.
+        Сервис user отвечает на пакет одним запросом к БД; списки длиннее
+        USERS_BATCH_SIZE разбиваются на несколько RPC, ответы объединяются.
+
+        :param usernames: Имена пользователей.
+        :param ids: ID пользователей.
+        :param timeout: Таймаут каждого RPC в секундах.
+        :return: {"users": [...], "not_found": {"usernames": [...], "ids": [...]}}
+        или описание ошибки первого неудачного RPC.
         """
-        message = {
-            "event": "token_validated",
-            "data": {"username": username},
-        }
-        await self.publish_message(message)
+        users: List[Dict[str, Any]] = []
+        not_found: Dict[str, List[Any]] = {"usernames": [], "ids": []}
+        usernames, ids = list(usernames), list(ids)
+        for offset in range(0, max(len(usernames), len(ids)), USERS_BATCH_SIZE):
+            response = await self.rpc_request(
+                message={
+                    "usernames": usernames[offset : offset + USERS_BATCH_SIZE],
+                    "ids": ids[offset : offset + USERS_BATCH_SIZE],
+                },
+                exchange_name="user_events",
+                routing_key="user_routing_key",
+                timeout=timeout,
+                message_type="user.get_users_data",
+            )
+            if not is_user_data(response):
+                return response
+            users.extend(response["users"])
+            for key in not_found:
+                not_found[key].extend(response["not_found"][key])
+        return {"users": users, "not_found": not_found}
 
 
-auth_publisher = AuthPublisher(config=auth_config)
+auth_publisher = AuthPublisher(
+    config=auth_config,
+    supervisor=auth_supervisor,
+    user_data_cache_ttl=settings.rabbit.user_data_cache_ttl,
+)
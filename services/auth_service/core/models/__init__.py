@@ -1,8 +1,8 @@
-__all__ = ("db_helper", "BaseModel", "ActiveToken", "TokenBlackList", "IdIntPrimaryKeyMixin", "User")
+__all__ = ("db_helper", "save", "BaseModel", "ActiveToken", "TokenBlackList", "IdIntPrimaryKeyMixin", "User")
 
 from .active_token_model import ActiveToken
 from .base_model import BaseModel
-from .db_helper import db_helper
+from .db_helper import db_helper, save
 from .token_blacklist_model import TokenBlackList
 from .mixins import IdIntPrimaryKeyMixin
 from .auth_user_model import User
\ No newline at end of file
@@ -1,19 +1,22 @@
 import uuid as uuid_pkg
 
 from pydantic import EmailStr
-from sqlalchemy import String, LargeBinary, Integer
+from sqlalchemy import Index, String, LargeBinary, Integer, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base_model import BaseModel
 from .mixins import IdIntPrimaryKeyMixin
 
+# Поля, уникальные и искомые без учёта регистра (индексы по lower(поле))
+CASE_INSENSITIVE_FIELDS = ("username", "email")
+
 
 class User(BaseModel, IdIntPrimaryKeyMixin):
     """
     Класс User представляет собой модель пользователя в базе данных. Он наследует от IdIntPrimaryKeyMixin и BaseModel.
     Поля класса:
 
-    .username: Mapped[str] - Уникальное имя пользователя. Строка длиной до 50 символов. Поле индексируется для ускорения поиска.
-    .email: Mapped[str] - Уникальный адрес электронной почты пользователя. Строка длиной до 50 символов. Поле индексируется для ускорения поиска.
+    .username: Mapped[str] - Имя пользователя, уникальное без учёта регистра. Строка длиной до 50 символов. Поиск - по индексу lower(username).
+    .email: Mapped[str] - Адрес электронной почты, уникальный без учёта регистра. Строка длиной до 50 символов. Поиск - по индексу lower(email).
     .phone_number: Mapped[str] - Уникальный номер телефона пользователя. Строка длиной до 25 символов. Поле индексируется для ускорения поиска.
     .hashed_password: Mapped[str] - Хэшированный пароль пользователя. Длина не ограничена.
     .uuid: Mapped[uuid_pkg.UUID] - Уникальный идентификатор пользователя в формате UUID. Генерируется автоматически с помощью uuid4.
@@ -25,8 +28,9 @@ class User(BaseModel, IdIntPrimaryKeyMixin):
     uuid: Mapped[uuid_pkg.UUID] = mapped_column(
         default=uuid_pkg.uuid4, primary_key=False, unique=True
     )
-    username: Mapped[str] = mapped_column(String(50), unique=True, index=True)
-    email: Mapped[str] = mapped_column(String(50), unique=True, index=True)
+    # Уникальность и индексы поиска - по lower(поле) (__table_args__)
+    username: Mapped[str] = mapped_column(String(50))
+    email: Mapped[str] = mapped_column(String(50))
     phone_number: Mapped[str] = mapped_column(
         String(25), nullable=True, unique=True, index=True
     )
@@ -39,6 +43,24 @@ class User(BaseModel, IdIntPrimaryKeyMixin):
         default=None,
     )
 
+    __table_args__ = (
+        Index("uq_users_username_ci", text("lower(username)"), unique=True),
+        Index("uq_users_email_ci", text("lower(email)"), unique=True),
+        # Keyset-обход в порядке, одинаковом для user и auth (сверка, rabbit.reconcile)
+        Index("ix_users_username_c", text('username COLLATE "C"')),
+    )
+
+    @classmethod
+    def field_equals(cls, field: str, value):
+        """
+        Условие поиска по полю. username и email сравниваются как
+        lower(поле) = lower(:value) - в форме выражения индекса uq_users_*_ci.
+        """
+        column = getattr(cls, field)
+        if field in CASE_INSENSITIVE_FIELDS:
+            return func.lower(column) == func.lower(value)
+        return column == value
+
     # active_tokens = relationship(
     #     "core.models.active_token_model.ActiveToken", back_populates="users"
     # )
@@ -28,4 +28,20 @@ class AuthUserSchema(BaseModel):
     hashed_password: bytes | str
     is_active: bool
     is_superuser: bool
-    tier_id: Optional[int]
\ No newline at end of file
+    tier_id: Optional[int]
+
+
+class UserEventMessage(BaseModel):
+    """Событие пользователя от сервиса user (user.created/updated/deleted)"""
+    event_type: str
+    user_data: AuthUserSchema
+
+
+class ReconcileRangeRequest(BaseModel):
+    """
+    RPC сверки с сервисом user: диапазон имён (after, until]
+    (типы auth.reconcile_digest и auth.reconcile_rows)
+    """
+    after: Optional[str] = None
+    until: Optional[str] = None
+    limit: Annotated[int, Field(gt=0, le=5000)] = 1000  # Только для reconcile_rows
@@ -1,17 +1,21 @@
-import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.openapi.docs import (
     get_redoc_html,
     get_swagger_ui_html,
     get_swagger_ui_oauth2_redirect_html,
 )
-from fastapi.responses import ORJSONResponse
+from fastapi.responses import ORJSONResponse, Response
 
+from core.config import settings
 from core.models import db_helper
+from rabbit.lifecycle import ConsumerGroup
+from rabbit.log_utils import enable_payload_logging
+from rabbit.metrics import render_latest
+from rabbit.tracing import build_exporter, configure_tracing, trace_http_request
 
-from auht_rabbit import start_consumer_auth
+from auht_rabbit import start_consumer_auth, auth_supervisor
 
 
 @asynccontextmanager
@@ -28,20 +32,24 @@ async def lifespan(app: FastAPI):
     """
 
     # Запуск приложения
-    # Запуск обработки сообщений (через rabbit mq)
-    task = asyncio.create_task(start_consumer_auth())
+    # Запуск обработки сообщений (через rabbit mq) в управляемых фоновых задачах,
+    # чтобы недоступность брокера не блокировала старт HTTP-приложения
+    if settings.rabbit.log_payloads:
+        enable_payload_logging(sample_rate=settings.rabbit.payload_sample_rate)
+    app.state.rabbit_supervisor = auth_supervisor
+    consumers = ConsumerGroup(
+        supervisor=auth_supervisor, drain_timeout=settings.rabbit.drain_timeout
+    )
+    # consume_in_app=False - очереди обрабатывает отдельный воркер (python -m rabbit.worker)
+    consumers.start(*([start_consumer_auth] if settings.rabbit.consume_in_app else []))
     print("Запуск консьюмера аутентификации... Done! :D")
     yield
     # Остановка приложения
     print("Завершение приложения... stopping server... Done!  :D")
-    await db_helper.dispose()  # Закрытие соединения с базой данных
 
-    # Завершение задачи консьюмера
-    task.cancel()  # Отмена задачи
-    try:
-        await task  # Ожидание завершения задачи
-    except asyncio.CancelledError:
-        pass  # Игнорируем ошибку отмены
+    # Дожидаемся обработчиков "в полёте" и закрываем соединение с RabbitMQ
+    await consumers.shutdown()
+    await db_helper.dispose()  # Закрытие соединения с базой данных
 
 
 def register_static_docs_routes(app: FastAPI):
@@ -104,6 +112,37 @@ def register_static_docs_routes(app: FastAPI):
         )
 
 
+def register_health_routes(app: FastAPI):
+    """
+    Регистрирует маршруты проверки готовности приложения и метрик Prometheus.
+
+    Параметры:
+    app (FastAPI): Экземпляр приложения FastAPI, для которого будут зарегистрированы маршруты.
+    """
+
+    @app.get("/health/ready", include_in_schema=False)
+    async def readiness(request: Request):
+        """
+        Возвращает 200, если соединение с RabbitMQ установлено и топология объявлена,
+        иначе 503 (используется балансировщиком и оркестратором).
+        """
+        supervisor = getattr(request.app.state, "rabbit_supervisor", None)
+        if supervisor is None or not supervisor.is_ready:
+            return ORJSONResponse(
+                {"status": "not_ready"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        return {"status": "ready"}
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """
+        Метрики RabbitMQ (публикация, обработка, RPC, соединение) в формате Prometheus.
+        """
+        body, content_type = render_latest()
+        return Response(content=body, media_type=content_type)
+
+
 def create_app(
     create_custom_static_urls: bool = False,
 ) -> FastAPI:
@@ -135,4 +174,14 @@ def create_app(
             app
         )  # Регистрация статических роутеров документации
 
+    register_health_routes(app)  # Регистрация маршрутов готовности и метрик
+
+    # Трассировка запросов: контекст уходит дальше в заголовках сообщений RabbitMQ
+    configure_tracing(
+        build_exporter(settings.tracing.exporter, settings.tracing.file_path)
+    )
+    app.middleware("http")(trace_http_request)
+    # Время записи клиента в cookie: его следующие чтения идут на primary
+    app.middleware("http")(db_helper.replicas.remember_writes)
+
     return app
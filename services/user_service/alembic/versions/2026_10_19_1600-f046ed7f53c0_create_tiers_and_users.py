@@ -0,0 +1,105 @@
+"""create tiers and users
+
+Revision ID: f046ed7f53c0
+Revises:
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f046ed7f53c0"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tiers",
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_tiers")),
+        sa.UniqueConstraint("id", name=op.f("uq_tiers_id")),
+        sa.UniqueConstraint("name", name=op.f("uq_tiers_name")),
+    )
+    op.create_table(
+        "users",
+        sa.Column("uuid", sa.Uuid(), nullable=False),
+        sa.Column("first_name", sa.String(length=30), nullable=True),
+        sa.Column("last_name", sa.String(length=30), nullable=True),
+        sa.Column("username", sa.String(length=50), nullable=False),
+        sa.Column("email", sa.String(length=50), nullable=False),
+        sa.Column("phone_number", sa.String(length=25), nullable=True),
+        sa.Column("hashed_password", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("is_deleted", sa.Boolean(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("is_superuser", sa.Boolean(), nullable=False),
+        sa.Column("tier_id", sa.Integer(), nullable=True),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.ForeignKeyConstraint(
+            ["tier_id"], ["tiers.id"], name=op.f("fk_users_tier_id_tiers")
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_users")),
+        sa.UniqueConstraint("id", name=op.f("uq_users_id")),
+        sa.UniqueConstraint("uuid", name=op.f("uq_users_uuid")),
+    )
+    op.create_index(op.f("ix_users_is_active"), "users", ["is_active"], unique=False)
+    op.create_index(op.f("ix_users_tier_id"), "users", ["tier_id"], unique=False)
+    op.create_index(
+        "uq_users_username_not_deleted",
+        "users",
+        ["username"],
+        unique=True,
+        postgresql_where=sa.text("NOT is_deleted"),
+    )
+    op.create_index(
+        "uq_users_email_not_deleted",
+        "users",
+        ["email"],
+        unique=True,
+        postgresql_where=sa.text("NOT is_deleted"),
+    )
+    op.create_index(
+        "uq_users_phone_number_not_deleted",
+        "users",
+        ["phone_number"],
+        unique=True,
+        postgresql_where=sa.text("NOT is_deleted"),
+    )
+    op.create_index(
+        "ix_users_username_c",
+        "users",
+        [sa.text('username COLLATE "C"')],
+        unique=False,
+        postgresql_where=sa.text("NOT is_deleted"),
+    )
+    op.create_index(
+        "ix_users_deleted_at_tombstones",
+        "users",
+        ["deleted_at"],
+        unique=False,
+        postgresql_where=sa.text("is_deleted"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_deleted_at_tombstones", table_name="users")
+    op.drop_index("ix_users_username_c", table_name="users")
+    op.drop_index("uq_users_phone_number_not_deleted", table_name="users")
+    op.drop_index("uq_users_email_not_deleted", table_name="users")
+    op.drop_index("uq_users_username_not_deleted", table_name="users")
+    op.drop_index(op.f("ix_users_tier_id"), table_name="users")
+    op.drop_index(op.f("ix_users_is_active"), table_name="users")
+    op.drop_table("users")
+    op.drop_table("tiers")
@@ -0,0 +1,85 @@
+"""case-insensitive username and email
+
+Уникальность username и email - без учёта регистра: частичные уникальные
+индексы по lower(username) и lower(email) вместо индексов по столбцам.
+Индексы строятся CONCURRENTLY, без блокировки записи в users.
+
+Revision ID: a618f41b0dc4
+Revises: f046ed7f53c0
+Create Date: 2026-10-19 16:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a618f41b0dc4"
+down_revision: Union[str, None] = "f046ed7f53c0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FIELDS = ("username", "email")
+
+
+def check_duplicates(field: str) -> None:
+    """Уникальный индекс не построится, если значения совпадают без учёта регистра."""
+    if op.get_context().as_sql:
+        return
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                f"SELECT lower({field}) FROM users WHERE NOT is_deleted "
+                f"GROUP BY lower({field}) HAVING count(*) > 1 LIMIT 10"
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if duplicates:
+        raise RuntimeError(
+            f"Совпадающие без учёта регистра значения {field}: {duplicates}. "
+            "Переименуйте или удалите повторы и повторите миграцию."
+        )
+
+
+def upgrade() -> None:
+    for field in FIELDS:
+        check_duplicates(field)
+    with op.get_context().autocommit_block():
+        for field in FIELDS:
+            op.create_index(
+                f"uq_users_{field}_ci",
+                "users",
+                [sa.text(f"lower({field})")],
+                unique=True,
+                postgresql_where=sa.text("NOT is_deleted"),
+                postgresql_concurrently=True,
+            )
+            op.drop_index(
+                f"uq_users_{field}_not_deleted",
+                table_name="users",
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for field in FIELDS:
+            op.create_index(
+                f"uq_users_{field}_not_deleted",
+                "users",
+                [field],
+                unique=True,
+                postgresql_where=sa.text("NOT is_deleted"),
+                postgresql_concurrently=True,
+            )
+            op.drop_index(
+                f"uq_users_{field}_ci",
+                table_name="users",
+                postgresql_concurrently=True,
+            )
@@ -1,3 +1,4 @@
+from .tier_catalog import tier_catalog
 from .tier_router import router as tier_router
 
-__all__ = ["tier_router"]
+__all__ = ["tier_catalog", "tier_router"]
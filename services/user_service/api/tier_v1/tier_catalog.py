@@ -0,0 +1,224 @@
+"""
+Каталог уровней доступа в памяти процесса.
+
+Уровней мало и меняются они редко, поэтому каталог целиком загружается
+при старте приложения, а чтения (по id, по имени, страницы) обслуживаются
+из памяти без запросов к БД. После записи уровня процесс перечитывает
+каталог и через Redis pub/sub сообщает остальным воркерам, что им тоже
+нужно перечитать его.
+"""
+
+import asyncio
+import bisect
+import logging
+import uuid
+from typing import AsyncContextManager, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from redis.asyncio import ConnectionPool, Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models import Tier, db_helper
+from core.schemas.tier_schemas import TierRead
+from utils.pagination import decode_cursor, encode_cursor
+
+log = logging.getLogger(__name__)
+
+TIER_CHANNEL = "tiers:invalidate"
+RESUBSCRIBE_DELAY = 5.0  # Пауза перед повторной подпиской после ошибки Redis (сек)
+# Ожидание сообщения за одну итерацию; между итерациями - проверка соединения (сек)
+LISTEN_TIMEOUT = 1.0
+
+
+class TierCatalog:
+    """
+    Снимок таблицы tier, индексированный по id и по имени.
+
+    Снимок заменяется целиком, поэтому читатели никогда не видят
+    частично загруженный каталог.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+        channel: str = TIER_CHANNEL,
+    ):
+        """
+        :param session_factory: Фабрика сессий для загрузки каталога (db_helper.session).
+        :param channel: Канал Redis для уведомлений об изменении уровней.
+        """
+        self._session_factory = session_factory
+        self.channel = channel
+        self.loaded = False
+        self._by_id: Dict[int, TierRead] = {}
+        self._by_name: Dict[str, TierRead] = {}
+        self._ids: List[int] = []  # Отсортированные id для страниц
+        self._lock = asyncio.Lock()
+        self._redis: Optional[Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._reconnected = False  # redis-py переподключил подписку сам
+        # Свои уведомления пропускаем: каталог уже перечитан в invalidate()
+        self._origin = uuid.uuid4().hex
+
+    async def load(self) -> None:
+        """Перечитать все уровни из БД и атомарно заменить снимок."""
+        # Загрузки выполняются по очереди: последняя начата после последней записи
+        async with self._lock:
+            async with self._session_factory() as db:
+                result = await db.execute(select(Tier).order_by(Tier.id))
+                tiers = [
+                    TierRead.model_validate(tier, from_attributes=True)
+                    for tier in result.scalars().all()
+                ]
+            self._by_id = {tier.id: tier for tier in tiers}
+            self._by_name = {tier.name: tier for tier in tiers}
+            self._ids = [tier.id for tier in tiers]
+            self.loaded = True
+        log.info("📚 Каталог уровней загружен: %d", len(tiers))
+
+    async def ensure_loaded(self) -> None:
+        """Загрузить каталог, если он ещё не загружен (например, старт без БД)."""
+        if not self.loaded:
+            await self.load()
+
+    def get(self, tier_id: int) -> Optional[TierRead]:
+        return self._by_id.get(tier_id)
+
+    def get_by_name(self, name: str) -> Optional[TierRead]:
+        return self._by_name.get(name)
+
+    def slice(self, skip: int, limit: int) -> List[TierRead]:
+        """Уровни по возрастанию id со смещением (прежний формат GET /tier)."""
+        by_id = self._by_id
+        return [by_id[tier_id] for tier_id in self._ids[skip : skip + limit]]
+
+    def page(
+        self, cursor: Optional[str], limit: int
+    ) -> Tuple[List[TierRead], Optional[str]]:
+        """
+        Страница уровней по возрастанию id с тем же курсором, что и keyset_page.
+        """
+        by_id, ids = self._by_id, self._ids
+        after = decode_cursor(cursor)
+        if after is not None and (
+            not isinstance(after, int) or isinstance(after, bool)
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Некорректный курсор страницы.",
+            )
+        start = 0 if after is None else bisect.bisect_right(ids, after)
+        items = [by_id[tier_id] for tier_id in ids[start : start + limit]]
+        if start + limit >= len(ids):
+            return items, None
+        return items, encode_cursor(items[-1].id)
+
+    async def invalidate(self) -> None:
+        """
+        Перечитать каталог после записи и уведомить остальные воркеры.
+        """
+        await self.load()
+        if self._redis is None:
+            return
+        try:
+            await self._redis.publish(self.channel, self._origin)
+        except Exception as e:
+            # Остальные воркеры перечитают каталог после переподписки
+            log.error("❌ Не удалось отправить уведомление об изменении уровней: %s", e)
+
+    async def start(self, redis: Optional[Redis] = None) -> None:
+        """
+        Загрузить каталог и подписаться на уведомления других воркеров.
+
+        :param redis: Клиент Redis; без него каталог обновляется только
+        при записях в этом процессе.
+        """
+        try:
+            await self.load()
+        except Exception as e:
+            log.error("❌ Каталог уровней не загружен при старте: %s", e)
+        if redis is not None:
+            self._redis = redis
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._redis = None
+
+    def _subscriber(self) -> Redis:
+        """
+        Клиент с отдельным пулом для подписки: параметры общего пула, но без
+        socket_timeout. На общем пуле чтение из тихого канала обрывается по
+        таймауту, redis-py молча переподключается, и уведомления, отправленные
+        в этот момент, теряются. health_check_interval сохраняется.
+        """
+        pool = self._redis.connection_pool
+        return Redis.from_pool(
+            ConnectionPool(
+                connection_class=pool.connection_class,
+                max_connections=1,
+                **{**pool.connection_kwargs, "socket_timeout": None},
+            )
+        )
+
+    def _on_reconnect(self, connection) -> None:
+        # Вызывается redis-py после переподключения подписки (он же
+        # переподписывается): уведомления из разрыва потеряны
+        self._reconnected = True
+
+    async def _listen(self) -> None:
+        resubscribed = False
+        redis = self._subscriber()
+        try:
+            while True:
+                pubsub = redis.pubsub()
+                try:
+                    await pubsub.subscribe(self.channel)
+                    # Первое подключение уже состоялось, колбэк сработает только при переподключении
+                    pubsub.connection.register_connect_callback(self._on_reconnect)
+                    if resubscribed:
+                        # Уведомления, отправленные без подписки, потеряны - перечитываем
+                        await self.load()
+                    while True:
+                        # get_message с таймаутом, а не listen(): так между
+                        # ожиданиями выполняется health check соединения
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=LISTEN_TIMEOUT
+                        )
+                        if self._reconnected:
+                            self._reconnected = False
+                            await self.load()
+                            continue
+                        if message is None or message["type"] != "message":
+                            continue
+                        origin = message["data"]
+                        if isinstance(origin, bytes):
+                            origin = origin.decode()
+                        if origin != self._origin:
+                            await self.load()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log.error("❌ Подписка на изменения уровней прервана: %s", e)
+                    resubscribed = True
+                    await asyncio.sleep(RESUBSCRIBE_DELAY)
+                finally:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+        finally:
+            try:
+                await redis.aclose()
+            except Exception:
+                pass
+
+
+tier_catalog = TierCatalog(db_helper.session)
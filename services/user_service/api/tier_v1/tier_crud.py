@@ -1,94 +1,118 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import update, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, UTC
 from fastapi import HTTPException, status
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from core.models import Tier
-from core.schemas.tier_schemas import TierCreate, TierUpdate
+from core.schemas.tier_schemas import TierCreate, TierRead, TierUpdate
+from .tier_catalog import tier_catalog
 
 
 class CRUDTier:
-    async def get_tiers(
-        self, db: AsyncSession, skip: int = 0, limit: int = 100
-    ) -> List[Tier]:
+    # Чтения обслуживает каталог в памяти (tier_catalog), БД не запрашивается
+
+    async def get_tiers(self, skip: int = 0, limit: int = 100) -> List[TierRead]:
         """Получение списка уровней с разбивкой на страницы"""
-        result = await db.execute(select(Tier).offset(skip).limit(limit))
-        return list(result.scalars().all())
+        await tier_catalog.ensure_loaded()
+        return tier_catalog.slice(skip, limit)
+
+    async def get_tiers_page(
+        self, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[TierRead], Optional[str]]:
+        """Получение страницы уровней по курсору (по возрастанию ID)"""
+        await tier_catalog.ensure_loaded()
+        return tier_catalog.page(cursor, limit)
 
-    async def get_tier(self, db: AsyncSession, tier_id: int) -> Tier:
-        """Получение уровня по ID"""
-        result = await db.execute(select(Tier).where(Tier.id == tier_id))
-        return result.scalar_one_or_none()
+    async def get_tier(self, tier_id: int) -> TierRead:
+        """Получение уровня по ID (404, если уровня нет)"""
+        await tier_catalog.ensure_loaded()
+        tier = tier_catalog.get(tier_id)
+        if tier is None:
+            raise self._not_found(tier_id)
+        return tier
 
-    async def get_tier_by_name(self, db: AsyncSession, name: str) -> Optional[Tier]:
+    async def get_tier_by_name(self, name: str) -> Optional[TierRead]:
         """Получение уровня по имени"""
-        result = await db.execute(select(Tier).where(Tier.name == name))
-        return result.scalar_one_or_none()
+        await tier_catalog.ensure_loaded()
+        return tier_catalog.get_by_name(name)
 
     async def create_tier(self, db: AsyncSession, tier_in: TierCreate) -> Tier:
         """Создание нового уровня"""
-        # Проверка уникальности имени уровня в БД
-        existing_tier = await self.get_tier_by_name(db, tier_in.name)
-        if existing_tier:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Уровень с именем '{tier_in.name}' уже существует",
-            )
-
-        # Создаем новый уровень
-        db_tier = Tier(name=tier_in.name, created_at=datetime.now())
-        db.add(db_tier)
+        # Один INSERT: занятое имя определяется по конфликту, без предварительного SELECT
+        query = (
+            insert(Tier)
+            .values(name=tier_in.name, created_at=datetime.now())
+            .on_conflict_do_nothing(index_elements=[Tier.name])
+            .returning(Tier)
+        )
+        db_tier = (await db.execute(query)).scalar_one_or_none()
+        if db_tier is None:
+            await db.rollback()
+            raise self._name_taken(tier_in.name)
         await db.commit()
-        await db.refresh(db_tier)
+        await tier_catalog.invalidate()
         return db_tier
 
     async def update_tier(
         self, db: AsyncSession, tier_id: int, tier_update: TierUpdate
     ) -> Tier:
         """Обновление уровня по ID"""
-        # Получаем уровень из БД по ID и проверяем его наличие
-        db_tier = await self.get_tier(db, tier_id)
-        if not db_tier:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Уровень с id {tier_id} не найден",
-            )
-
-        # Если в запросе был передан новый название уровня, проверяем его уникальность в БД
-        if tier_update.name and tier_update.name != db_tier.name:
-            existing_tier = await self.get_tier_by_name(db, tier_update.name)
-            if existing_tier:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Уровень с именем '{tier_update.name}' уже существует",
-                )
-
-        # Обновляем данные уровня
         update_data = tier_update.model_dump(exclude_unset=True)
         update_data["updated_at"] = datetime.now()
 
+        # Один UPDATE: отсутствие строки - 404, занятое имя - нарушение уникальности
         query = (
             update(Tier).where(Tier.id == tier_id).values(**update_data).returning(Tier)
         )
-        result = await db.execute(query)
-        updated_tier = result.scalar_one()
+        try:
+            updated_tier = (await db.execute(query)).scalar_one_or_none()
+        except IntegrityError:
+            await db.rollback()
+            raise self._name_taken(tier_update.name)
+        if updated_tier is None:
+            await db.rollback()
+            raise self._not_found(tier_id)
         await db.commit()
+        await tier_catalog.invalidate()
 
         return updated_tier
 
     async def delete_tier(self, db: AsyncSession, tier_id: int) -> None:
         """Удаление уровня по ID"""
-        # Проверяем существование уровня в БД
-        db_tier = await self.get_tier(db, tier_id)
-        if not db_tier:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Уровень с id {tier_id} не найден",
-            )
-
-        # Удаляем уровень из БД
-        await db.execute(delete(Tier).where(Tier.id == tier_id))
+        try:
+            result = await db.execute(delete(Tier).where(Tier.id == tier_id))
+        except IntegrityError:
+            # На уровень ссылаются пользователи (внешний ключ users.tier_id)
+            await db.rollback()
+            raise self._in_use(tier_id)
+        if result.rowcount == 0:
+            await db.rollback()
+            raise self._not_found(tier_id)
         await db.commit()
+        await tier_catalog.invalidate()
+
+    @staticmethod
+    def _not_found(tier_id: int) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Уровень с id {tier_id} не найден",
+        )
+
+    @staticmethod
+    def _in_use(tier_id: int) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Уровень с id {tier_id} назначен пользователям",
+        )
+
+    @staticmethod
+    def _name_taken(name: Optional[str]) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Уровень с именем '{name}' уже существует",
+        )
 
 
 # Создаем экземпляр класса
@@ -1,6 +1,6 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 #
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from .tier_crud import tier_crud
 from core.models import db_helper
 from core.schemas import tier_schemas
+from core.schemas.base_schemas import Page
 
 router = APIRouter(
     tags=["Tiers"],
@@ -22,12 +23,33 @@ router = APIRouter(
     # dependencies=[Depends(get_superuser_auth)],
 )
 async def get_all_tiers(
-    db: Annotated[AsyncSession, Depends(db_helper.session_getter)],
-    skip: int = 0,
-    limit: int = 100,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+):
+    """
+    Получение списка уровней с разбивкой на страницы (skip/limit).
+
+    Для обхода по курсору - GET /tier/page.
+    """
+    return await tier_crud.get_tiers(skip=skip, limit=limit)
+
+
+@router.get(
+    "/page",
+    response_model=Page[tier_schemas.TierRead],
+    # dependencies=[Depends(get_superuser_auth)],
+)
+async def get_tiers_page(
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
 ):
-    """Получение списка уровней с разбивкой на страницы"""
-    return await tier_crud.get_tiers(db=db, skip=skip, limit=limit)
+    """
+    Получение уровней по страницам с курсором.
+
+    Следующая страница запрашивается с cursor = next_cursor из ответа.
+    """
+    items, next_cursor = await tier_crud.get_tiers_page(cursor=cursor, limit=limit)
+    return Page(items=items, next_cursor=next_cursor)
 
 
 @router.get(
@@ -35,11 +57,9 @@ async def get_all_tiers(
     response_model=tier_schemas.TierRead,
     # dependencies=[Depends(get_superuser_auth)],
 )
-async def get_one_tier(
-    tier_id: int, db: Annotated[AsyncSession, Depends(db_helper.session_getter)]
-):
+async def get_one_tier(tier_id: int):
     """Получение уровня по ID"""
-    return await tier_crud.get_tier(db=db, tier_id=tier_id)
+    return await tier_crud.get_tier(tier_id=tier_id)
 
 
 @router.post(
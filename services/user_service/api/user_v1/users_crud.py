@@ -1,26 +1,40 @@
 import uuid
 import logging
-from typing import Annotated
+from typing import Annotated, Any, List, Mapping, Optional, Sequence, Tuple
 from fastapi import Cookie, Depends
-from sqlalchemy import select
-from core.models import user_model, db_helper
+from sqlalchemy import (
+    Integer,
+    Select,
+    String,
+    any_,
+    bindparam,
+    func,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from core.config import settings
+from core.models import user_model, db_helper, save
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.schemas import user_schemas
 from auth_utils import utils_jwt
 from user_publisher import UserPublisher, UserEvent
 from core.schemas import AuthUserSchema
-from user_rabbit import user_config
+from user_rabbit import user_config, user_supervisor
+from rabbit.reconcile import SYNCED_FIELDS, USERNAME_COLLATION
+from utils.pagination import keyset_page
 
 log = logging.getLogger(__name__)
 
 
 class CRUDUser:
     def __init__(self):
-        self.publisher = UserPublisher(config=user_config)
+        self.publisher = UserPublisher(config=user_config, supervisor=user_supervisor)
 
     async def get_user_me_by_token(
         self,
-        db: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+        db: Annotated[AsyncSession, Depends(db_helper.read_session_getter)],
         access_token: str | bytes = Cookie(None),
     ):
         try:
@@ -33,31 +47,131 @@ class CRUDUser:
 
     async def get_user(self, db: AsyncSession, user_uuid: uuid.UUID):
         result = await db.execute(
-            select(user_model.User).where(user_model.User.uuid == user_uuid)
+            select(user_model.User).where(
+                user_model.User.uuid == user_uuid, user_model.User.not_deleted()
+            )
         )
         return result.scalars().first()
 
     async def get_user_by_field(self, db: AsyncSession, field: str, value: str):
-        if field == "email":
-            result = await db.execute(
-                select(user_model.User).where(user_model.User.email == value)
+        """
+        Неудалённый пользователь по email, id, username или phone_number.
+
+        username и email сравниваются без учёта регистра; условия совпадают
+        с выражениями и предикатом частичных уникальных индексов, поэтому
+        поиск идёт по ним.
+        """
+        if field not in ("email", "id", "username", "phone_number"):
+            return None
+        result = await db.execute(
+            select(user_model.User).where(
+                user_model.User.field_equals(field, value),
+                user_model.User.not_deleted(),
             )
-            return result.scalars().first()
-        if field == "id":
-            result = await db.execute(
-                select(user_model.User).where(user_model.User.id == value)
+        )
+        return result.scalars().first()
+
+    async def get_users_by_usernames_or_ids(
+        self,
+        db: AsyncSession,
+        usernames: Sequence[str] = (),
+        ids: Sequence[int] = (),
+    ) -> List[user_model.User]:
+        """
+        Пользователи по списку имён и/или ID одним запросом.
+
+        Списки передаются одним параметром-массивом (= ANY(:usernames)),
+        поэтому текст запроса не зависит от размера пакета. Имена
+        сравниваются без учёта регистра по индексу uq_users_username_ci.
+        """
+        conditions = []
+        if usernames:
+            # Имена - только ASCII (UserCreate), str.lower() совпадает с lower() в БД
+            conditions.append(
+                func.lower(user_model.User.username)
+                == any_(
+                    bindparam(
+                        "usernames",
+                        [username.lower() for username in usernames],
+                        type_=ARRAY(String),
+                    )
+                )
             )
-            return result.scalars().first()
-        if field == "username":
-            result = await db.execute(
-                select(user_model.User).where(user_model.User.username == value)
+        if ids:
+            conditions.append(
+                user_model.User.id
+                == any_(bindparam("ids", list(ids), type_=ARRAY(Integer)))
             )
-            return result.scalars().first()
-        if field == "phone_number":
-            result = await db.execute(
-                select(user_model.User).where(user_model.User.phone_number == value)
+        if not conditions:
+            return []
+        result = await db.execute(
+            select(user_model.User).where(
+                or_(*conditions), user_model.User.not_deleted()
             )
-            return result.scalars().first()
+        )
+        return list(result.scalars().all())
+
+    async def get_users_page(
+        self,
+        db: AsyncSession,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        include_deleted: bool = False,
+    ) -> Tuple[List[user_model.User], Optional[str]]:
+        """
+        Страница пользователей по курсору (keyset по первичному ключу).
+        """
+        stmt = select(user_model.User)
+        if not include_deleted:
+            stmt = stmt.where(user_model.User.not_deleted())
+        return await keyset_page(db, stmt, user_model.User.id, cursor, limit)
+
+    @staticmethod
+    def export_users_query(include_deleted: bool = False) -> Select:
+        """
+        Запрос выгрузки пользователей: только публичные столбцы, без хеша пароля.
+        """
+        User = user_model.User
+        stmt = select(
+            User.id,
+            User.uuid,
+            User.username,
+            User.email,
+            User.phone_number,
+            User.first_name,
+            User.last_name,
+            User.is_active,
+            User.is_superuser,
+            User.is_deleted,
+            User.tier_id,
+            User.created_at,
+            User.updated_at,
+        ).order_by(User.id)
+        if not include_deleted:
+            stmt = stmt.where(User.not_deleted())
+        return stmt
+
+    async def get_synced_users_page(
+        self, db: AsyncSession, after: Optional[str], limit: int
+    ) -> List[Mapping[str, Any]]:
+        """
+        Страница (keyset по username) неудалённых пользователей для сверки с auth:
+        только синхронизируемые поля и tier_id, без загрузки ORM-объектов.
+        """
+        key = user_model.User.username.collate(USERNAME_COLLATION)
+        stmt = (
+            select(
+                *(getattr(user_model.User, field) for field in SYNCED_FIELDS),
+                user_model.User.tier_id,
+            )
+            .where(user_model.User.not_deleted())
+            .order_by(key)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(key > after)
+        result = await db.execute(stmt)
+        return list(result.mappings().all())
 
     async def create_user(self, db: AsyncSession, user: user_schemas.UserCreate):
         secret_password = utils_jwt.hash_password(user.password)
@@ -71,9 +185,7 @@ class CRUDUser:
             is_active=False,
             is_superuser=False,
         )
-        db.add(db_user)
-        await db.commit()
-        await db.refresh(db_user)
+        await save(db, db_user)
         # Отправляем событие в auth сервис
         auth_user = AuthUserSchema(
             username=db_user.username,
@@ -104,8 +216,7 @@ class CRUDUser:
         update_data = user_update.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_user, key, value)
-        await db.commit()
-        await db.refresh(db_user)
+        await save(db, db_user)
 
         # Отправляем событие в auth сервис
         auth_user = AuthUserSchema(
@@ -131,11 +242,31 @@ class CRUDUser:
         return db_user
 
     async def delete_user(self, db: AsyncSession, user_uuid: uuid.UUID):
-        db_user = await self.get_user(db=db, user_uuid=user_uuid)
-        if not db_user:
-            return None
+        """
+        Удалить пользователя и сообщить об этом сервису auth.
+
+        В режиме мягкого удаления (settings.soft_delete.enabled) строка
+        помечается одним UPDATE и выпадает из частичных индексов; физически
+        её удаляет compact_users после retention_days.
+        """
+        User = user_model.User
+        if settings.soft_delete.enabled:
+            result = await db.execute(
+                update(User)
+                .where(User.uuid == user_uuid, User.not_deleted())
+                .values(is_deleted=True, deleted_at=func.now())
+                .returning(User)
+            )
+            db_user = result.scalars().first()
+            if not db_user:
+                await db.rollback()
+                return None
+        else:
+            db_user = await self.get_user(db=db, user_uuid=user_uuid)
+            if not db_user:
+                return None
+            await db.delete(db_user)
 
-        # Создаем auth_user до удаления из базы
         auth_user = AuthUserSchema(
             username=db_user.username,
             phone_number=db_user.phone_number,
@@ -145,9 +276,6 @@ class CRUDUser:
             is_superuser=db_user.is_superuser,
             tier_id=1,  # Используйте актуальное значение из db_user если оно есть
         )
-
-        # Удаляем пользователя из базы данных
-        await db.delete(db_user)
         await db.commit()
         # Отправляем событие в auth сервис
         try:
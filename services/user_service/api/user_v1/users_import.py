@@ -0,0 +1,216 @@
+"""
+Массовый импорт пользователей из CSV или NDJSON.
+
+Тело запроса читается потоком и обрабатывается пачками: валидация схемой
+UserCreate, хеширование паролей в пуле процессов, вставка пачки одним
+INSERT ... ON CONFLICT DO NOTHING RETURNING и пачка событий user.created.
+Ошибки возвращаются по номерам строк; в памяти одновременно одна пачка.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth_utils import hash_passwords
+from core.config import settings
+from core.models import user_model
+from core.schemas import AuthUserSchema, UserCreate, UserImportError, UserImportReport
+from user_publisher import UserEvent, UserPublisher
+from utils.import_records import iter_records
+
+log = logging.getLogger(__name__)
+
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+MAX_REPORTED_ERRORS = 1000  # Отчёт не растёт вместе с размером файла
+HASH_WORKERS = settings.users_import.hash_workers
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+
+
+def import_format(content_type: Optional[str]) -> str:
+    """
+    Формат импорта по Content-Type запроса.
+
+    :raises HTTPException: 415 для неподдерживаемого типа.
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Поддерживаются text/csv и application/x-ndjson.",
+        )
+    return IMPORT_FORMATS[media_type]
+
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    """Пул процессов для bcrypt (создаётся при первом импорте)."""
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _hash_pool
+
+
+def shutdown_hash_pool() -> None:
+    """Остановить процессы пула (при остановке приложения)."""
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=True, cancel_futures=True)
+        _hash_pool = None
+
+
+async def hash_in_pool(passwords: List[str]) -> List[bytes]:
+    """Хеши паролей пачки: пачка делится между всеми процессами пула."""
+    if not passwords:
+        return []
+    loop = asyncio.get_running_loop()
+    pool = get_hash_pool()
+    size = -(-len(passwords) // HASH_WORKERS)
+    parts = await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, hash_passwords, passwords[i : i + size])
+            for i in range(0, len(passwords), size)
+        )
+    )
+    return [hashed for part in parts for hashed in part]
+
+
+class UserImporter:
+    """
+    Импорт пачками: на пачку - один INSERT, один commit и одна пачка событий.
+    """
+
+    def __init__(self, publisher: UserPublisher, chunk_size: int = 1000):
+        """
+        :param publisher: Продюсер событий user.created.
+        :param chunk_size: Количество записей в пачке.
+        """
+        self.publisher = publisher
+        self.chunk_size = chunk_size
+        self.report = UserImportReport()
+
+    def add_error(self, line: int, username: Optional[str], errors: List[str]) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < MAX_REPORTED_ERRORS:
+            self.report.errors.append(
+                UserImportError(line=line, username=username, errors=errors)
+            )
+
+    async def run(
+        self, db: AsyncSession, chunks: AsyncIterator[bytes], fmt: str
+    ) -> UserImportReport:
+        batch: List[Tuple[int, UserCreate]] = []
+        async for line, record, error in iter_records(chunks, fmt):
+            self.report.total += 1
+            if error is not None:
+                self.add_error(line, None, [error])
+                continue
+            try:
+                batch.append((line, UserCreate.model_validate(record)))
+            except ValidationError as e:
+                self.add_error(
+                    line,
+                    record.get("username"),
+                    [
+                        f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                        for err in e.errors()
+                    ],
+                )
+                continue
+            if len(batch) >= self.chunk_size:
+                await self.import_batch(db, batch)
+                batch = []
+        if batch:
+            await self.import_batch(db, batch)
+        log.info(
+            "📥 Импорт пользователей: записей %d, создано %d, ошибок %d",
+            self.report.total,
+            self.report.created,
+            self.report.failed,
+        )
+        return self.report
+
+    async def import_batch(
+        self, db: AsyncSession, batch: List[Tuple[int, UserCreate]]
+    ) -> None:
+        # Повторы внутри пачки: ON CONFLICT не отличит их от вставленной строки
+        seen: set = set()
+        unique: List[Tuple[int, UserCreate]] = []
+        for line, user in batch:
+            # username и email уникальны без учёта регистра (uq_users_*_ci)
+            keys = {
+                ("username", user.username.lower()),
+                ("email", user.email.lower()),
+                ("phone_number", user.phone_number),
+            }
+            if keys & seen:
+                self.add_error(line, user.username, ["Повтор внутри файла"])
+                continue
+            seen |= keys
+            unique.append((line, user))
+
+        hashed = await hash_in_pool([user.password for _, user in unique])
+        rows = [
+            {
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "username": user.username,
+                "email": user.email,
+                "phone_number": user.phone_number,
+                "hashed_password": hashed_password,
+                "is_active": False,
+                "is_superuser": False,
+            }
+            for (_, user), hashed_password in zip(unique, hashed)
+        ]
+        if not rows:
+            return
+        # Уже существующие (по любому уникальному полю) пропускаются без ошибки запроса
+        result = await db.execute(
+            insert(user_model.User)
+            .on_conflict_do_nothing()
+            .returning(user_model.User.username),
+            rows,
+        )
+        created = set(result.scalars().all())
+        await db.commit()
+
+        events = []
+        for (line, user), row in zip(unique, rows):
+            if user.username not in created:
+                self.add_error(line, user.username, ["Пользователь уже существует"])
+                continue
+            events.append(
+                AuthUserSchema(
+                    username=row["username"],
+                    email=row["email"],
+                    phone_number=row["phone_number"],
+                    hashed_password=row["hashed_password"],
+                    is_active=False,
+                    is_superuser=False,
+                    tier_id=None,
+                )
+            )
+        self.report.created += len(created)
+        try:
+            self.report.events_published += await self.publisher.publish_user_events(
+                UserEvent.CREATED, events
+            )
+        except Exception as e:
+            # Пользователи уже сохранены: расхождение с auth устранит reconcile_job
+            log.error("❌ Не удалось отправить события импорта в auth: %s", e)
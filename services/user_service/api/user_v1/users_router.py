@@ -2,11 +2,17 @@ import uuid
 from datetime import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Request, HTTPException, status
+from fastapi import APIRouter, Depends, Request, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.schemas import user_schemas
+from core.schemas.base_schemas import Page
 from .users_crud import crud_user
+from .users_import import UserImporter, import_format
+from .users_validation import get_superuser_auth
 from core.models import db_helper, user_model
+from api.tier_v1.tier_catalog import tier_catalog
+from utils.pagination import NDJSON_MEDIA_TYPE, stream_ndjson
 
 router = APIRouter(
     tags=["user"],
@@ -18,6 +24,67 @@ def testing():
     return {"message": "test"}
 
 
+@router.get(
+    "",
+    response_model=Page[user_schemas.UserRead],
+    dependencies=[Depends(get_superuser_auth)],
+)
+async def list_users(
+    db: Annotated[AsyncSession, Depends(db_helper.read_session_getter)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    include_deleted: bool = False,
+):
+    """
+    Список пользователей по страницам (для администратора).
+
+    Следующая страница запрашивается с cursor = next_cursor из ответа.
+    """
+    items, next_cursor = await crud_user.get_users_page(
+        db=db, cursor=cursor, limit=limit, include_deleted=include_deleted
+    )
+    return Page(items=items, next_cursor=next_cursor)
+
+
+@router.get("/export", dependencies=[Depends(get_superuser_auth)])
+async def export_users(include_deleted: bool = False):
+    """
+    Выгрузка всех пользователей в формате NDJSON (по объекту на строку).
+
+    Строки читаются серверным курсором и сразу отправляются клиенту,
+    поэтому память не зависит от количества пользователей.
+    """
+    return StreamingResponse(
+        stream_ndjson(
+            db_helper.read_session, crud_user.export_users_query(include_deleted)
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="users.ndjson"'},
+    )
+
+
+@router.post(
+    "/import",
+    response_model=user_schemas.UserImportReport,
+    dependencies=[Depends(get_superuser_auth)],
+)
+async def import_users(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    chunk_size: Annotated[int, Query(ge=1, le=5000)] = 1000,
+):
+    """
+    Массовый импорт пользователей (для администратора).
+
+    Тело - CSV с заголовком (Content-Type: text/csv) или NDJSON
+    (application/x-ndjson) с полями UserCreate. Тело читается потоком,
+    пользователи создаются пачками по chunk_size; ответ - отчёт с ошибками по строкам.
+    """
+    fmt = import_format(request.headers.get("content-type"))
+    importer = UserImporter(crud_user.publisher, chunk_size=chunk_size)
+    return await importer.run(db, request.stream(), fmt)
+
+
 @router.get("/me")
 def auth_user_check_self_info(
     user: Annotated[user_schemas.UserRead, Depends(crud_user.get_user_me_by_token)],
@@ -30,12 +97,14 @@ def auth_user_check_self_info(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Пользователь не авторизован.",
         )
+    tier = tier_catalog.get(user.tier_id) if user.tier_id else None  # Без запроса к БД
     return {
         "first_name": user.first_name,
         "last_name": user.last_name,
         "phone_number": user.phone_number,
         "username": user.username,
         "email": user.email,
+        "tier": tier.name if tier else None,
     }
 
 
@@ -90,7 +159,7 @@ async def auth_user_update(
 
 @router.delete(
     "/delete/{user_uuid}",
-    response_model=UserDelete,
+    response_model=user_schemas.UserDelete,
     dependencies=[Depends(get_superuser_auth)],
 )
 async def delete_user(
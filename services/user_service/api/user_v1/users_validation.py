@@ -1,14 +1,17 @@
+from typing import Annotated
+
 from api.user_v1.users_crud import crud_user
+from auth_utils import utils_jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.models import db_helper
+from core.models import db_helper, user_model
 from fastapi import Form, HTTPException, status, Depends
 
 
 async def validate_auth_user(
     username: str = Form(),
     password: str = Form(),
-    db: AsyncSession = Depends(db_helper.session_getter),
+    db: AsyncSession = Depends(db_helper.read_session_getter),
 ):
 
     print(f"validate_auth_user: {username}, {password}")
@@ -33,3 +36,20 @@ async def validate_auth_user(
             detail="Не подтвержденный пользователь.",
         )
     return db_user
+
+
+async def get_superuser_auth(
+    user: Annotated[user_model.User, Depends(crud_user.get_user_me_by_token)],
+) -> user_model.User:
+    """Зависимость для административных маршрутов: только суперпользователь."""
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Пользователь не авторизован.",
+        )
+    if not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Недостаточно прав.",
+        )
+    return user
@@ -2,6 +2,7 @@ from .utils_jwt import (
     decode_jwt,
     encode_jwt,
     hash_password,
+    hash_passwords,
     hash_token,
     validate_password,
     decrypt_token,
@@ -12,6 +13,7 @@ __all__ = [
     "decode_jwt",
     "encode_jwt",
     "hash_password",
+    "hash_passwords",
     "hash_token",
     "validate_password",
     "decrypt_token",
@@ -1,4 +1,5 @@
 import os
+from typing import List
 import bcrypt
 import logging
 from datetime import datetime, UTC, timedelta
@@ -7,6 +8,8 @@ from cryptography.fernet import Fernet
 import jwt
 from fastapi import HTTPException, status
 
+from rabbit.tracing import trace_span
+
 from core import settings
 
 logger = logging.getLogger(__name__)
@@ -54,8 +57,9 @@ def encode_jwt(
         exp=expire,
         iat=now,
     )
-    encoded = jwt.encode(to_encode, private_key, algorithm=algorithm)
-    encoded = hash_token(encoded)
+    with trace_span("jwt.encode"):
+        encoded = jwt.encode(to_encode, private_key, algorithm=algorithm)
+        encoded = hash_token(encoded)
 
     return encoded
 
@@ -68,8 +72,9 @@ def decode_jwt(
     try:
         if not token:
             return
-        token = decrypt_token(token)
-        decoded = jwt.decode(token, public_key, algorithms=[algorithms])
+        with trace_span("jwt.decode"):
+            token = decrypt_token(token)
+            decoded = jwt.decode(token, public_key, algorithms=[algorithms])
         return decoded
     except jwt.ExpiredSignatureError:
         logger.error("Токен истек")
@@ -90,14 +95,24 @@ JOKE_PEPPER = os.getenv("FASTAPI__SECOND__PEPPER").encode()
 def hash_password(password: str) -> bytes:  # Функция хеширования пароля
     salt = bcrypt.gensalt()
     peppered_password: bytes = password.encode() + PEPPER
-    pwd_bytes_first: bytes = bcrypt.hashpw(peppered_password, salt)
+    with trace_span("bcrypt.hashpw"):
+        pwd_bytes_first: bytes = bcrypt.hashpw(peppered_password, salt)
     pwd_bytes_last: bytes = JOKE_PEPPER + pwd_bytes_first
     return pwd_bytes_last
 
 
+def hash_passwords(passwords: List[str]) -> List[bytes]:
+    """
+    Хеширование пачки паролей (для пула процессов при массовом импорте:
+    bcrypt занимает CPU, поэтому пачки считаются параллельно в отдельных процессах).
+    """
+    return [hash_password(password) for password in passwords]
+
+
 def validate_password(
     password: str, hashed_password: bytes
 ) -> bool:  # Функция валидации пароля по хешу
     password = password.encode() + PEPPER
     hashed_password = hashed_password[5:]
-    return bcrypt.checkpw(password=password, hashed_password=hashed_password)
+    with trace_span("bcrypt.checkpw"):
+        return bcrypt.checkpw(password=password, hashed_password=hashed_password)
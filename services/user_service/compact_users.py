@@ -0,0 +1,169 @@
+"""
+Физическое удаление мягко удалённых пользователей.
+
+    python -m compact_users [--retention-days 30] [--batch-size 1000] [--dry-run] [--output report.json]
+
+Запускается из каталога сервиса user (/app в контейнере) по расписанию.
+Строки с is_deleted и deleted_at старше retention_days удаляются пачками
+по частичному индексу ix_users_deleted_at_tombstones: одна пачка - одна
+короткая транзакция, строки выбираются FOR UPDATE SKIP LOCKED, поэтому
+параллельный запуск и обычные запросы не ждут друг друга. Сервис auth
+не уведомляется: событие user.deleted отправлено при мягком удалении.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+# Длинные последовательные запросы: профиль пула batch, если не задан явно.
+# Задаётся до импорта модулей сервиса, чтобы его подхватил pydantic-settings.
+os.environ.setdefault("FASTAPI__DB__PROFILE", "batch")
+
+from core.config import settings
+from core.models import db_helper, user_model
+from rabbit.aio_config import configure_logging
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class CompactReport:
+    cutoff: str = ""  # Удаляются записи, помеченные раньше этого момента
+    deleted: int = 0  # Удалено строк (в dry-run - подлежит удалению)
+    batches: int = 0
+    seconds: float = 0.0
+
+
+class Compactor:
+    """
+    Удаление пачками: DELETE ... WHERE id IN (SELECT ... LIMIT n FOR UPDATE
+    SKIP LOCKED), commit после каждой пачки.
+    """
+
+    def __init__(
+        self,
+        retention_days: int = 30,
+        batch_size: int = 1000,
+        pause: float = 0.0,
+        dry_run: bool = False,
+    ):
+        """
+        :param retention_days: Сколько дней хранить мягко удалённые записи.
+        :param batch_size: Строк в одной транзакции.
+        :param pause: Пауза между пачками (сек), чтобы не нагружать реплики WAL.
+        :param dry_run: Только посчитать подлежащие удалению записи.
+        """
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.pause = pause
+        self.dry_run = dry_run
+        self.report = CompactReport()
+
+    def tombstones(self, cutoff: datetime):
+        User = user_model.User
+        return select(User.id).where(User.is_deleted, User.deleted_at < cutoff)
+
+    async def run(self) -> CompactReport:
+        started = time.perf_counter()
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        self.report.cutoff = cutoff.isoformat()
+        if self.dry_run:
+            async with db_helper.session() as db:
+                self.report.deleted = await db.scalar(
+                    select(func.count()).select_from(self.tombstones(cutoff).subquery())
+                )
+        else:
+            while True:
+                async with db_helper.session() as db:
+                    deleted = await self.compact_batch(db, cutoff)
+                if deleted:
+                    self.report.batches += 1
+                    self.report.deleted += deleted
+                    log.info(
+                        "🧹 Удалено записей: %d (всего %d)",
+                        deleted,
+                        self.report.deleted,
+                    )
+                if deleted < self.batch_size:
+                    break
+                if self.pause:
+                    await asyncio.sleep(self.pause)
+        self.report.seconds = round(time.perf_counter() - started, 3)
+        return self.report
+
+    async def compact_batch(self, db: AsyncSession, cutoff: datetime) -> int:
+        User = user_model.User
+        batch = (
+            self.tombstones(cutoff)
+            .order_by(User.deleted_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            delete(User)
+            .where(User.id.in_(batch.scalar_subquery()))
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = len(result.scalars().all())
+        await db.commit()
+        return deleted
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m compact_users",
+        description="Физическое удаление мягко удалённых пользователей",
+    )
+    parser.add_argument(
+        "--retention-days", type=int, default=settings.soft_delete.retention_days
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.soft_delete.batch_size
+    )
+    parser.add_argument(
+        "--pause", type=float, default=0.0, help="Пауза между пачками (сек)"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Только посчитать записи"
+    )
+    parser.add_argument("--output", default=None, help="Файл для JSON-отчёта")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> CompactReport:
+    try:
+        compactor = Compactor(
+            retention_days=args.retention_days,
+            batch_size=args.batch_size,
+            pause=args.pause,
+            dry_run=args.dry_run,
+        )
+        return await compactor.run()
+    finally:
+        await db_helper.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    configure_logging()
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    output = json.dumps(asdict(report), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
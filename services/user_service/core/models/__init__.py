@@ -1,5 +1,5 @@
 # Сначала импортируем базовые компоненты
-from .db_helper import db_helper
+from .db_helper import db_helper, save
 from .base_model import BaseModel
 from . import user_model, base_model, tier_model
 
@@ -10,6 +10,7 @@ from .tier_model import Tier
 # Определяем что экспортируем
 __all__ = (
     "db_helper",
+    "save",
     "BaseModel",
     "User",
     "Tier",
@@ -14,6 +14,8 @@ class BaseModel(DeclarativeBase):
     """
 
     __abstract__ = True  # Модель не будет создана в базе данных
+    # Серверные значения по умолчанию загружаются в RETURNING того же запроса
+    __mapper_args__ = {"eager_defaults": True}
 
     metadata = MetaData(
         naming_convention=settings.db.naming_convention
@@ -1,6 +1,15 @@
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Optional,
+    Sequence,
+)
 
+from fastapi import Request
+from sqlalchemy import make_url
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncEngine,
@@ -9,7 +18,14 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.orm import sessionmaker
 
-from core.config import settings
+from core.config import ENGINE_PROFILES, EngineProfile, settings
+from rabbit.db_pool import (
+    InstrumentedAsyncPool,
+    ReplicaSet,
+    instrument_engine,
+    track_writes,
+)
+from rabbit.tracing import trace_span
 
 
 class DatabaseHelper:
@@ -22,16 +38,26 @@ class DatabaseHelper:
         url: str,  # URL для подключения к базе данных
         echo: bool = False,  # Логирование SQL-запросов в консоль
         echo_pool: bool = False,  # Выводить логирование пула соединений
-        pool_size: int = 5,  # Размер количества соединений в пуле
-        max_overflow: int = 10,  # Количество превышения пула соединений
+        profile: EngineProfile = ENGINE_PROFILES["api"],  # Параметры пула и драйвера
+        name: str = "api",  # Метка пула в метриках
+        replica_urls: Sequence[str] = (),  # Реплики для сессий только на чтение
+        replica_selection: str = "round_robin",  # round_robin или least_lag
+        replica_max_lag: float = 10.0,  # Допустимое отставание реплики (сек)
+        sticky_primary_seconds: float = 2.0,  # Чтения клиента с primary после его записи (сек)
     ):
-        # Асинхронный движок
-        self.engine: AsyncEngine = create_async_engine(
-            url=url,
-            echo=echo,
-            echo_pool=echo_pool,
-            pool_size=pool_size,
-            max_overflow=max_overflow,
+        self.engine: AsyncEngine = self._create_engine(
+            url, echo, echo_pool, profile, name
+        )
+        self.replicas = ReplicaSet(
+            {
+                f"{name}_replica{i}": self._create_engine(
+                    replica_url, echo, echo_pool, profile, f"{name}_replica{i}"
+                )
+                for i, replica_url in enumerate(replica_urls)
+            },
+            selection=replica_selection,
+            max_lag=replica_max_lag,
+            sticky_primary_seconds=sticky_primary_seconds,
         )
 
         self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
@@ -41,22 +67,130 @@ class DatabaseHelper:
             expire_on_commit=False,  # Сами следим за изменениями в БД
         )  # Создание фабрики сессий для асинхронной работы с БД
 
+    @staticmethod
+    def _create_engine(
+        url: str, echo: bool, echo_pool: bool, profile: EngineProfile, name: str
+    ) -> AsyncEngine:
+        connect_args = {}
+        if make_url(url).get_driver_name() == "asyncpg":
+            # Кеш SQLAlchemy (prepared_statement_cache_size) и собственный кеш asyncpg
+            connect_args = {
+                "prepared_statement_cache_size": profile.statement_cache_size,
+                "statement_cache_size": profile.statement_cache_size,
+            }
+            if profile.command_timeout is not None:
+                connect_args["command_timeout"] = profile.command_timeout
+        engine = create_async_engine(
+            url=url,
+            echo=echo,
+            echo_pool=echo_pool,
+            poolclass=InstrumentedAsyncPool,
+            pool_size=profile.pool_size,
+            max_overflow=profile.max_overflow,
+            pool_timeout=profile.pool_timeout,
+            pool_recycle=profile.pool_recycle,
+            pool_pre_ping=profile.pool_pre_ping,
+            connect_args=connect_args,
+        )
+        instrument_engine(
+            engine, name, capacity=profile.pool_size + profile.max_overflow
+        )
+        return engine
+
     async def dispose(self) -> None:  # Закрытие соединения с базой данных
         await self.engine.dispose()  # Закрытие подключения к БД
+        await self.replicas.close()
 
     async def session_getter(
-        self,
+        self, request: Request
     ) -> AsyncGenerator[AsyncSession, None]:  # Асинхронный генератор сессий
-        async with self.session_factory() as session:  # Создание сессии
-            yield session  # Возвращаем сессию в контекстный менеджер
+        """
+        Зависимость FastAPI: сессия primary, одна на запрос.
+
+        Все зависимости запроса получают одну и ту же сессию (request.state),
+        а соединение из пула она берёт только при первом обращении к БД -
+        маршрут без запросов к БД соединение не занимает.
+        """
+        async with self._request_scoped(
+            request, "primary", self.session_factory, "db.session"
+        ) as session:
+            yield session
 
     @asynccontextmanager
     async def session(self) -> AsyncSession:
         """
         Асинхронный контекстный менеджер для работы с сессиями.
         """
-        async with self.session_factory() as session:
+        with trace_span("db.session"):
+            async with self.session_factory() as session:
+                yield session
+
+    def _read_session(self, last_write: Optional[float] = None) -> AsyncSession:
+        engine = self.replicas.pick(last_write)
+        if engine is None:
+            return self.session_factory()
+        return self.session_factory(bind=engine)
+
+    async def read_session_getter(
+        self, request: Request
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Зависимость FastAPI: сессия только на чтение (реплика, если настроена).
+
+        Если в запросе уже открыта сессия primary, чтения идут через неё;
+        после недавней записи этого клиента (cookie db_last_write) - primary.
+        """
+        last_write = self.replicas.last_write(request)
+        async with self._request_scoped(
+            request, "read", lambda: self._read_session(last_write), "db.read_session"
+        ) as session:
+            yield session
+
+    def _shared_session(
+        self, request: Request, primary: bool
+    ) -> Optional[AsyncSession]:
+        """Сессия, уже открытая в запросе (сессия primary годится и для чтения)."""
+        sessions = getattr(request.state, "db_sessions", {})
+        session = sessions.get("primary")
+        if session is None:
+            session = sessions.get("read")
+            if session is not None and primary and session.bind is not self.engine:
+                session = None  # Сессия реплики не годится для записи
+        return session
+
+    @asynccontextmanager
+    async def _request_scoped(
+        self,
+        request: Request,
+        key: str,
+        factory: Callable[[], AsyncSession],
+        span: str,
+    ) -> AsyncIterator[AsyncSession]:
+        session = self._shared_session(request, primary=key == "primary")
+        if session is not None:
             yield session
+            return
+        sessions = getattr(request.state, "db_sessions", None)
+        if sessions is None:
+            sessions = request.state.db_sessions = {}
+        # Span не делаем текущим: генератор зависимости закрывается вне контекста запроса
+        with trace_span(span, activate=False):
+            async with factory() as session:
+                track_writes(session, request.state)  # Для ReplicaSet.remember_writes
+                sessions[key] = session
+                try:
+                    yield session
+                finally:
+                    del sessions[key]
+
+    @asynccontextmanager
+    async def read_session(self) -> AsyncSession:
+        """
+        Контекстный менеджер сессии только на чтение (реплика, если настроена).
+        """
+        with trace_span("db.read_session"):
+            async with self._read_session() as session:
+                yield session
 
     def get_sync_session(self) -> sessionmaker:
         """Создает синхронную сессию для работы с sqladmin"""
@@ -69,10 +203,27 @@ class DatabaseHelper:
         return self.engine.sync_engine
 
 
+async def save(db: AsyncSession, *instances: Any) -> None:
+    """
+    Добавить объекты в сессию и зафиксировать транзакцию без db.refresh().
+
+    Первичный ключ и серверные значения по умолчанию приходят в RETURNING
+    того же INSERT/UPDATE (eager_defaults в BaseModel), клиентские default
+    и onupdate вычисляются до запроса, а expire_on_commit=False сохраняет
+    атрибуты после commit - повторный SELECT не нужен.
+    """
+    db.add_all(instances)
+    await db.commit()
+
+
 db_helper = DatabaseHelper(
     url=str(settings.db.url),  # URL для подключения к базе данных
     echo=settings.db.echo,  # Логирование SQL-запросов в консоль
     echo_pool=settings.db.echo_pool,  # Выводить логирование пула соединений
-    pool_size=settings.db.pool_size,  # Размер количества соединений в пуле
-    max_overflow=settings.db.max_overflow,  # Количество превышения пула соединений
+    profile=settings.db.engine_profile(),  # Профиль пула (FASTAPI__DB__PROFILE)
+    name=settings.db.profile,
+    replica_urls=[str(url) for url in settings.db.replica_urls],
+    replica_selection=settings.db.replica_selection,
+    replica_max_lag=settings.db.replica_max_lag,
+    sticky_primary_seconds=settings.db.sticky_primary_seconds,
 )
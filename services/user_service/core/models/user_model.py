@@ -2,7 +2,16 @@ import uuid as uuid_pkg
 from datetime import datetime, UTC, timezone
 from typing import TYPE_CHECKING, List
 
-from sqlalchemy import String, DateTime, ForeignKey, LargeBinary
+from sqlalchemy import (
+    Index,
+    String,
+    DateTime,
+    ForeignKey,
+    LargeBinary,
+    func,
+    not_,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base_model import BaseModel  # относительный импорт
 from core.mixins import IdIntPrimaryKeyMixin
@@ -12,6 +21,11 @@ if TYPE_CHECKING:
 
     # from services.user_service.core.models.restaurant_model import Restaurant
 
+# Предикат частичных индексов: запросы должны фильтровать так же (User.not_deleted())
+NOT_DELETED = "NOT is_deleted"
+# Поля, уникальные и искомые без учёта регистра (индексы по lower(поле))
+CASE_INSENSITIVE_FIELDS = ("username", "email")
+
 
 class User(BaseModel, IdIntPrimaryKeyMixin):
     """
@@ -20,15 +34,15 @@ class User(BaseModel, IdIntPrimaryKeyMixin):
 
     .first_name: Mapped[str] - Имя пользователя. Строка длиной до 30 символов.
     .last_name: Mapped[str] - Фамилия пользователя. Строка длиной до 30 символов.
-    .username: Mapped[str] - Уникальное имя пользователя. Строка длиной до 50 символов. Поле индексируется для ускорения поиска.
-    .email: Mapped[str] - Уникальный адрес электронной почты пользователя. Строка длиной до 50 символов. Поле индексируется для ускорения поиска.
-    .phone_number: Mapped[str] - Уникальный номер телефона пользователя. Строка длиной до 25 символов. Поле индексируется для ускорения поиска.
+    .username: Mapped[str] - Имя пользователя, уникальное среди неудалённых без учёта регистра. Строка длиной до 50 символов.
+    .email: Mapped[str] - Адрес электронной почты, уникальный среди неудалённых без учёта регистра. Строка длиной до 50 символов.
+    .phone_number: Mapped[str] - Номер телефона, уникальный среди неудалённых. Строка длиной до 25 символов.
     .hashed_password: Mapped[str] - Хэшированный пароль пользователя. Длина не ограничена.
     .uuid: Mapped[uuid_pkg.UUID] - Уникальный идентификатор пользователя в формате UUID. Генерируется автоматически с помощью uuid4.
     .created_at: Mapped[datetime] - Дата и время создания записи пользователя. Устанавливается автоматически на текущее время в формате UTC при создании записи.
     .updated_at: Mapped[datetime | None] - Дата и время последнего обновления записи пользователя. По умолчанию None, что означает, что значение не установлено при создании.
     .deleted_at: Mapped[datetime | None] - Дата и время, когда запись была помечена как удаленная. По умолчанию None, что означает, что запись не удалена.
-    .is_deleted: Mapped[bool] - Логическое значение, указывающее, была ли запись удалена. По умолчанию False. Поле индексируется для ускорения поиска удаленных записей.
+    .is_deleted: Mapped[bool] - Логическое значение, указывающее, была ли запись удалена (мягкое удаление). По умолчанию False. Удалённые записи не попадают в частичные индексы поиска.
     .is_active: Mapped[bool]- Логическое значение, указывающее, подтвержден ли пользователь. По умолчанию False. Поле индексируется для ускорения поиска.
     .is_superuser: Mapped[bool] - Логическое значение, указывающее, является ли пользователь суперпользователем. По умолчанию False.
     .tier_id: Mapped[int | None] - Идентификатор уровня доступа пользователя, который ссылается на другую таблицу tier. Это поле может быть None, если у пользователя нет уровня доступа. Поле индексируется для ускорения поиска.
@@ -39,11 +53,10 @@ class User(BaseModel, IdIntPrimaryKeyMixin):
     )
     first_name: Mapped[str] = mapped_column(String(30), nullable=True)
     last_name: Mapped[str] = mapped_column(String(30), nullable=True)
-    username: Mapped[str] = mapped_column(String(50), unique=True, index=True)
-    email: Mapped[str] = mapped_column(String(50), unique=True, index=True)
-    phone_number: Mapped[str] = mapped_column(
-        String(25), nullable=True, unique=True, index=True
-    )
+    # Уникальность и индексы поиска - частичные, только по неудалённым (__table_args__)
+    username: Mapped[str] = mapped_column(String(50))
+    email: Mapped[str] = mapped_column(String(50))
+    phone_number: Mapped[str] = mapped_column(String(25), nullable=True)
     hashed_password: Mapped[bytes] = mapped_column(LargeBinary)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -57,9 +70,8 @@ class User(BaseModel, IdIntPrimaryKeyMixin):
     deleted_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
         default=None,
-        onupdate=lambda: datetime.now(timezone.utc),
     )
-    is_deleted: Mapped[bool] = mapped_column(default=False, index=True)
+    is_deleted: Mapped[bool] = mapped_column(default=False)
     is_active: Mapped[bool] = mapped_column(default=False, index=True)
     is_superuser: Mapped[bool] = mapped_column(default=False)
 
@@ -70,6 +82,56 @@ class User(BaseModel, IdIntPrimaryKeyMixin):
     )
 
     tiers = relationship("core.models.tier_model.Tier", back_populates="users")
+
+    __table_args__ = (
+        Index(
+            "uq_users_username_ci",
+            text("lower(username)"),
+            unique=True,
+            postgresql_where=text(NOT_DELETED),
+        ),
+        Index(
+            "uq_users_email_ci",
+            text("lower(email)"),
+            unique=True,
+            postgresql_where=text(NOT_DELETED),
+        ),
+        Index(
+            "uq_users_phone_number_not_deleted",
+            "phone_number",
+            unique=True,
+            postgresql_where=text(NOT_DELETED),
+        ),
+        # Keyset-обход в порядке, одинаковом для user и auth (сверка, rabbit.reconcile)
+        Index(
+            "ix_users_username_c",
+            text('username COLLATE "C"'),
+            postgresql_where=text(NOT_DELETED),
+        ),
+        # Очередь compact_users: только удалённые записи
+        Index(
+            "ix_users_deleted_at_tombstones",
+            "deleted_at",
+            postgresql_where=text("is_deleted"),
+        ),
+    )
+
+    @classmethod
+    def not_deleted(cls):
+        """Условие "не удалён" в форме предиката частичных индексов (NOT is_deleted)."""
+        return not_(cls.is_deleted)
+
+    @classmethod
+    def field_equals(cls, field: str, value):
+        """
+        Условие поиска по полю. username и email сравниваются как
+        lower(поле) = lower(:value) - в форме выражения индекса uq_users_*_ci.
+        """
+        column = getattr(cls, field)
+        if field in CASE_INSENSITIVE_FIELDS:
+            return func.lower(column) == func.lower(value)
+        return column == value
+
     # active_tokens = relationship(
     #     "app.core.models.active_token_model.ActiveToken", back_populates="users"
     # )
@@ -12,6 +12,8 @@ from .user_schemas import (
     UserTierUpdate,
     UserRead,
     UserRestoreDeleted,
+    UserImportError,
+    UserImportReport,
 )
 from .tier_schemas import (
     Tier,
@@ -23,7 +25,7 @@ from .tier_schemas import (
     TierRead,
     TierDelete,
 )
-from .auth_user_schemas import AuthUserSchema
+from .auth_user_schemas import AuthUserSchema, UserDataRequest, UsersDataRequest
 
 __all__ = [
     "User",
@@ -36,6 +38,8 @@ __all__ = [
     "UserTierUpdate",
     "UserRead",
     "UserRestoreDeleted",
+    "UserImportError",
+    "UserImportReport",
     "Tier",
     "TierCreate",
     "TierUpdate",
@@ -48,4 +52,6 @@ __all__ = [
     "user_schemas",
     "tier_schemas",
     "AuthUserSchema",
+    "UserDataRequest",
+    "UsersDataRequest",
 ]
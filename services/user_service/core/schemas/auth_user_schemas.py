@@ -1,7 +1,10 @@
-from typing import Annotated, Optional
+from typing import Annotated, List, Optional
 
 from pydantic import BaseModel, Field, EmailStr
 
+# Ограничение размера пакетного RPC: ответ должен уместиться в одно сообщение
+MAX_BATCH_SIZE = 1000
+
 
 class AuthUserSchema(BaseModel):
     """Схема для пользователя"""
@@ -28,4 +31,21 @@ class AuthUserSchema(BaseModel):
     hashed_password: bytes | str
     is_active: bool
     is_superuser: bool
-    tier_id: Optional[int]
\ No newline at end of file
+    tier_id: Optional[int]
+
+
+class UserDataRequest(BaseModel):
+    """RPC-запрос данных пользователя от сервиса auth (тип user.get_user_data)"""
+    username: str
+
+
+class UsersDataRequest(BaseModel):
+    """
+    Пакетный RPC-запрос данных пользователей (тип user.get_users_data).
+
+    Пользователи ищутся одним запросом к БД по именам и/или ID;
+    запросы крупнее MAX_BATCH_SIZE клиент разбивает на части.
+    """
+    usernames: Annotated[List[str], Field(max_length=MAX_BATCH_SIZE)] = []
+    ids: Annotated[List[int], Field(max_length=MAX_BATCH_SIZE)] = []
+
@@ -1,6 +1,6 @@
 import uuid as uuid_pkg
 from datetime import datetime, UTC, timezone
-from typing import Any
+from typing import Any, Generic, List, TypeVar
 
 from pydantic import BaseModel, Field, field_serializer
 
@@ -91,6 +91,23 @@ class PersistentDeletion(BaseModel):
         return None
 
 
+# -------------- Пагинация --------------
+ItemT = TypeVar("ItemT")
+
+
+class Page(BaseModel, Generic[ItemT]):
+    """
+    Страница списка с курсорной (keyset) пагинацией.
+
+    Атрибуты:
+    --- items (list): Элементы страницы.
+    --- next_cursor (str | None): Курсор следующей страницы (None - страница последняя).
+    """
+
+    items: List[ItemT]
+    next_cursor: str | None = None
+
+
 # -------------- Токен --------------
 class TokenInfo(BaseModel):
     access_token: str | bytes
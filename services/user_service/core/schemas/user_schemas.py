@@ -181,3 +181,37 @@ class UserRestoreDeleted(BaseModel):
     """
 
     is_deleted: bool
+
+
+class UserImportError(BaseModel):
+    """
+    Ошибка строки массового импорта.
+
+    Атрибуты:
+    --- line (int): Номер строки во входном файле (с 1, включая заголовок CSV).
+    --- username (str | None): Имя пользователя из строки, если удалось прочитать.
+    --- errors (list[str]): Описание ошибок.
+    """
+
+    line: int
+    username: str | None = None
+    errors: list[str]
+
+
+class UserImportReport(BaseModel):
+    """
+    Итог массового импорта пользователей.
+
+    Атрибуты:
+    --- total (int): Прочитано записей.
+    --- created (int): Создано пользователей.
+    --- failed (int): Записей с ошибками (в errors - не больше первых 1000).
+    --- events_published (int): Отправлено событий user.created.
+    --- errors (list[UserImportError]): Ошибки по строкам.
+    """
+
+    total: int = 0
+    created: int = 0
+    failed: int = 0
+    events_published: int = 0
+    errors: list[UserImportError] = []
@@ -1,9 +1,8 @@
-import asyncio
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from fastapi.responses import ORJSONResponse
+from fastapi import FastAPI, Request, status
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.openapi.docs import (
     get_redoc_html,
     get_swagger_ui_html,
@@ -12,8 +11,16 @@ from fastapi.openapi.docs import (
 from fastapi_limiter import FastAPILimiter
 
 from core.redis import RedisClient, get_settings
+from core.config import settings
 from core.models import db_helper
-# from user_rabbit import start_consumer_user
+from api.tier_v1 import tier_catalog
+from api.user_v1.users_import import shutdown_hash_pool
+from rabbit.lifecycle import ConsumerGroup
+from rabbit.log_utils import enable_payload_logging
+from rabbit.metrics import render_latest
+from rabbit.tracing import build_exporter, configure_tracing, trace_http_request
+from user_rabbit import start_consumer_user, user_supervisor
+from utils.upload_image import UploadSizeLimitMiddleware
 
 log = logging.getLogger(__name__)
 
@@ -37,7 +44,26 @@ async def lifespan(app: FastAPI):
     # await RedisClient.init_pool(get_settings())
     # rediska = await RedisClient.get_client(get_settings())
     # await FastAPILimiter.init(rediska)
-    # user_consumer_task = asyncio.create_task(start_consumer_user())
+    redis = None
+    if settings.redis.enabled:
+        try:
+            redis = await RedisClient.get_client(settings)
+        except Exception as e:
+            log.error(f"Redis недоступен, каталог уровней без уведомлений: {e}")
+    # Уровни читаются из памяти; записи в других воркерах приходят через Redis pub/sub
+    await tier_catalog.start(redis)
+    # Запуск обработки сообщений (через rabbit mq) в управляемых фоновых задачах,
+    # готовность соединения отдаётся в /health/ready
+    if settings.rabbit.log_payloads:
+        enable_payload_logging(sample_rate=settings.rabbit.payload_sample_rate)
+    app.state.rabbit_supervisor = user_supervisor
+    consumers = ConsumerGroup(
+        supervisor=user_supervisor, drain_timeout=settings.rabbit.drain_timeout
+    )
+    # consume_in_app=False - очереди обрабатывает отдельный воркер (python -m rabbit.worker)
+    consumers.start(
+        *([start_consumer_user] if settings.rabbit.consume_in_app else [])
+    )
     log.info("Запуск консьюмера пользователя... Done! :D")
 
     yield
@@ -45,14 +71,13 @@ async def lifespan(app: FastAPI):
 
     print("Завершение приложения... stopping server... Done!  :D")
     # Закрываем соединения при остановке
-    # await RedisClient.close()
+    await tier_catalog.close()
+    if redis is not None:
+        await RedisClient.close()
+    # Дожидаемся обработчиков "в полёте" и закрываем соединение с RabbitMQ
+    await consumers.shutdown()
+    shutdown_hash_pool()  # Процессы bcrypt массового импорта
     await db_helper.dispose()  # Закрытие соединения с базой данных
-    # Завершение задачи консьюмера
-    # user_consumer_task.cancel()  # Отмена задачи
-    # try:
-    #     await user_consumer_task  # Ожидание завершения задачи
-    # except asyncio.CancelledError:
-    #     pass  # Игнорируем ошибку отмены
 
 
 def register_static_docs_routes(app: FastAPI):
@@ -115,6 +140,37 @@ def register_static_docs_routes(app: FastAPI):
         )
 
 
+def register_health_routes(app: FastAPI):
+    """
+    Регистрирует маршруты проверки готовности приложения и метрик Prometheus.
+
+    Параметры:
+    app (FastAPI): Экземпляр приложения FastAPI, для которого будут зарегистрированы маршруты.
+    """
+
+    @app.get("/health/ready", include_in_schema=False)
+    async def readiness(request: Request):
+        """
+        Возвращает 200, если соединение с RabbitMQ установлено и топология объявлена,
+        иначе 503 (используется балансировщиком и оркестратором).
+        """
+        supervisor = getattr(request.app.state, "rabbit_supervisor", None)
+        if supervisor is None or not supervisor.is_ready:
+            return ORJSONResponse(
+                {"status": "not_ready"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        return {"status": "ready"}
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """
+        Метрики RabbitMQ (публикация, обработка, RPC, соединение) в формате Prometheus.
+        """
+        body, content_type = render_latest()
+        return Response(content=body, media_type=content_type)
+
+
 def create_app(
     create_custom_static_urls: bool = False,
     middleware: list = None,
@@ -151,4 +207,16 @@ def create_app(
             app
         )  # Регистрация статических роутеров документации
 
+    register_health_routes(app)  # Регистрация маршрутов готовности и метрик
+
+    # Трассировка запросов: контекст уходит дальше в заголовках сообщений RabbitMQ
+    configure_tracing(
+        build_exporter(settings.tracing.exporter, settings.tracing.file_path)
+    )
+    app.middleware("http")(trace_http_request)
+    # Время записи клиента в cookie: его следующие чтения идут на primary
+    app.middleware("http")(db_helper.replicas.remember_writes)
+    # Загрузки изображений больше предела отклоняются до разбора multipart
+    app.add_middleware(UploadSizeLimitMiddleware)
+
     return app
@@ -0,0 +1,243 @@
+"""
+Сверка пользователей сервиса user с их копией в сервисе auth.
+
+    python -m reconcile_job --chunk-size 1000 [--dry-run] [--output report.json]
+
+Запускается из каталога сервиса user (/app в контейнере). Пользователи
+читаются страницами (keyset по username), для каждой страницы сервис auth
+по RPC считает дайджест того же диапазона имён. Построчно сравниваются
+только диапазоны с разными дайджестами, и для них публикуются
+корректирующие события user.created / user.updated / user.deleted.
+Память ограничена размером страницы.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+# Длинные последовательные запросы: профиль пула batch, если не задан явно.
+# Задаётся до импорта модулей сервиса, чтобы его подхватил pydantic-settings.
+os.environ.setdefault("FASTAPI__DB__PROFILE", "batch")
+
+from api.user_v1.users_crud import crud_user
+from core.models import db_helper
+from core.schemas import AuthUserSchema
+from pydantic import ValidationError
+from rabbit.aio_config import configure_logging
+from rabbit.reconcile import RangeDigest, range_label, row_hash
+from user_publisher import UserEvent, UserPublisher
+from user_rabbit import user_supervisor
+
+log = logging.getLogger(__name__)
+
+# Очередь сервиса auth: RPC сверки приходят через обменник по умолчанию
+AUTH_QUEUE = "auth_routing_key"
+# Предел limit в auth.reconcile_rows (ReconcileRangeRequest в сервисе auth)
+MAX_CHUNK_SIZE = 5000
+
+
+class ReconcileError(Exception):
+    """Сервис auth не ответил на RPC сверки."""
+
+
+@dataclass
+class ReconcileReport:
+    users: int = 0  # Неудалённых пользователей в сервисе user
+    ranges: int = 0  # Сравнено диапазонов
+    mismatched_ranges: int = 0  # Диапазонов с разными дайджестами
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0  # Корректирующих событий, которые не удалось отправить
+    seconds: float = 0.0
+
+
+class Reconciler:
+    """
+    Сверка страница за страницей: дайджест диапазона, при расхождении -
+    построчное сравнение с корректирующими событиями.
+    """
+
+    def __init__(
+        self,
+        publisher: UserPublisher,
+        chunk_size: int = 1000,
+        dry_run: bool = False,
+        timeout: int = 60,
+    ):
+        """
+        :param publisher: Продюсер сервиса user (RPC к auth и события user.*).
+        :param chunk_size: Размер страницы пользователей и строк auth.
+        :param dry_run: Только отчёт, без публикации событий.
+        :param timeout: Таймаут одного RPC к auth в секундах.
+        """
+        self.publisher = publisher
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.timeout = timeout
+        self.report = ReconcileReport()
+
+    async def run(self) -> ReconcileReport:
+        started = time.perf_counter()
+        after: Optional[str] = None
+        while True:
+            async with db_helper.session() as db:
+                page = await crud_user.get_synced_users_page(db, after, self.chunk_size)
+            last_page = len(page) < self.chunk_size
+            # Последний диапазон открыт справа: в него попадают лишние строки auth
+            until = None if last_page else page[-1]["username"]
+            await self.reconcile_range(after, until, page)
+            if last_page:
+                break
+            after = until
+        self.report.seconds = round(time.perf_counter() - started, 3)
+        return self.report
+
+    async def reconcile_range(
+        self,
+        after: Optional[str],
+        until: Optional[str],
+        page: List[Mapping[str, Any]],
+    ) -> None:
+        local_digest = RangeDigest()
+        local_rows: Dict[str, Any] = {}
+        for row in page:
+            hashed_row = row_hash(row)
+            local_digest.update(row["username"], hashed_row)
+            local_rows[row["username"]] = (hashed_row, row)
+        self.report.users += len(page)
+        self.report.ranges += 1
+
+        remote = await self._rpc("auth.reconcile_digest", after=after, until=until)
+        if remote["digest"] == local_digest.hexdigest():
+            return
+
+        self.report.mismatched_ranges += 1
+        log.info(
+            "🔍 Расхождение в диапазоне %s: user=%d, auth=%d",
+            range_label(after, until),
+            local_digest.count,
+            remote["count"],
+        )
+        cursor = after
+        while True:
+            response = await self._rpc(
+                "auth.reconcile_rows", after=cursor, until=until, limit=self.chunk_size
+            )
+            rows = response["rows"]
+            for remote_row in rows:
+                local = local_rows.pop(remote_row["username"], None)
+                if local is None:
+                    await self._correct(UserEvent.DELETED, remote_row)
+                elif local[0] != remote_row["hash"]:
+                    await self._correct(UserEvent.UPDATED, local[1])
+            if len(rows) < self.chunk_size:
+                break
+            cursor = rows[-1]["username"]
+        for _, row in local_rows.values():
+            await self._correct(UserEvent.CREATED, row)
+
+    async def _rpc(self, message_type: str, **request: Any) -> Dict[str, Any]:
+        response = await self.publisher.rpc_request(
+            request,
+            routing_key=AUTH_QUEUE,
+            message_type=message_type,
+            timeout=self.timeout,
+        )
+        if "error" in response or response.get("status") == "error":
+            raise ReconcileError(f"{message_type}: {response}")
+        return response
+
+    async def _correct(self, event: UserEvent, row: Mapping[str, Any]) -> None:
+        counter = {
+            UserEvent.CREATED: "created",
+            UserEvent.UPDATED: "updated",
+            UserEvent.DELETED: "deleted",
+        }[event]
+        setattr(self.report, counter, getattr(self.report, counter) + 1)
+        log.info("🛠 %s: %s", event.value, row["username"])
+        if self.dry_run:
+            return
+
+        hashed_password = row["hashed_password"]
+        try:
+            auth_user = AuthUserSchema(
+                username=row["username"],
+                email=row["email"],
+                phone_number=row["phone_number"],
+                hashed_password=(
+                    hashed_password.encode()
+                    if isinstance(hashed_password, str)
+                    else hashed_password
+                ),
+                is_active=row["is_active"],
+                is_superuser=row["is_superuser"],
+                tier_id=row.get("tier_id"),
+            )
+        except ValidationError as e:
+            self.report.failed += 1
+            log.error("❌ Пользователь %s не прошёл валидацию: %s", row["username"], e)
+            return
+        response = await self.publisher.publish_user_event(event, auth_user)
+        if response and response.get("status") == "error":
+            self.report.failed += 1
+
+
+def chunk_size(value: str) -> int:
+    size = int(value)
+    if not 1 <= size <= MAX_CHUNK_SIZE:
+        raise argparse.ArgumentTypeError(f"допустимо от 1 до {MAX_CHUNK_SIZE}")
+    return size
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m reconcile_job",
+        description="Сверка пользователей сервиса user с сервисом auth",
+    )
+    parser.add_argument(
+        "--chunk-size", type=chunk_size, default=1000, help=f"1..{MAX_CHUNK_SIZE}"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Только отчёт, без событий"
+    )
+    parser.add_argument("--timeout", type=int, default=60, help="Таймаут RPC (сек)")
+    parser.add_argument("--output", default=None, help="Файл для JSON-отчёта")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> ReconcileReport:
+    await user_supervisor.start()
+    try:
+        reconciler = Reconciler(
+            crud_user.publisher,
+            chunk_size=args.chunk_size,
+            dry_run=args.dry_run,
+            timeout=args.timeout,
+        )
+        return await reconciler.run()
+    finally:
+        await user_supervisor.close()
+        await db_helper.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    configure_logging()
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    output = json.dumps(asdict(report), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,89 @@
-import json
-from typing import Dict, Any, Annotated
+from typing import Dict, Any
 
 from rabbit.base_aio import ServiceConsumer
 import logging
 from api.user_v1 import users_crud
 from core.models import db_helper
 from core.models.user_model import User
+from core.schemas import UserDataRequest, UsersDataRequest
 
 log = logging.getLogger(__name__)
 
 
+def user_data(user: User) -> Dict[str, Any]:
+    """Данные пользователя для ответа RPC (хеш пароля - строкой для JSON)."""
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "hashed_password": user.hashed_password.decode(),
+        "is_active": user.is_active,
+    }
+
+
 class UserConsumer(ServiceConsumer):
     """
     Класс для обработки сообщений, относящихся к пользователям.
     """
 
-    async def handle_user_request(
-        self,
-        message: Dict[str, Any],
-    ) -> None:
+    async def initialize(self):
         """
-        Обработчик запросов на получение данных пользователя.
+        Регистрация обработчиков и подписка на очередь. Не блокирует.
+        """
+        self.add_handler(
+            "user.get_user_data", self.handle_user_request, model=UserDataRequest
+        )
+        self.add_handler(
+            "user.get_users_data", self.handle_users_request, model=UsersDataRequest
+        )
+        await self.start()
 
-        :param message: Входящее сообщение из RabbitMQ.
+    async def handle_user_request(self, request: UserDataRequest) -> Dict[str, Any]:
         """
-        try:
-            log.warning(f"Начало обработки сообщения: {message}\nТип:")
-            if isinstance(message, bytes):
-                message = json.loads(message.decode("utf-8"))
-            action = message.get("action")
-            username = message.get("username")
-            correlation_id = message.get("correlation_id")
-            log.info(f"Получен запрос: action={action}, username={username} 😊")
-            if action == "get_user_data" and username:
-                async with db_helper.session() as session:
-                    user: User = await users_crud.crud_user.get_user_by_field(
-                        db=session, field="username", value=username
-                    )
-                    response = (
-                        {
-                            "id": user.id,
-                            "username": user.username,
-                            "email": user.email,
-                            "hashed_password": user.hashed_password,
-                            "is_active": user.is_active,
-                            "correlation_id": correlation_id,
-                        }
-                        if user
-                        else {"error": "Пользователь не найден"}
-                    )
-            else:
-                response = {"error": "Неправильный запрос"}
+        Обработчик RPC-запросов на получение данных пользователя.
 
-            # Отправляем ответ обратно
-            await self.reply_to_rpc_request(message, response)
-            log.info("Ответ отправлен обратно успешно! 🚀")
-        except Exception as e:
-            log.error(f"❌ Ошибка обработки запроса: {e}")
+        Ответ отправляется базовым консьюмером по reply_to/correlation_id запроса.
 
-    async def process_auth_events(self, message: dict):
+        :param request: Провалидированный запрос из RabbitMQ.
+        :return: Данные пользователя или описание ошибки.
         """
-        Обрабатывает события, поступающие от микросервиса `auth`.
+        log.debug(
+            "Получен запрос данных пользователя: username=%s 😊", request.username
+        )
+        # Только primary: auth кеширует ответ после user.updated / user.deleted,
+        # и отстающая реплика вернула бы в кеш старые данные на весь TTL
+        async with db_helper.session() as session:
+            user: User = await users_crud.crud_user.get_user_by_field(
+                db=session, field="username", value=request.username
+            )
+        if not user:
+            return {"error": "Пользователь не найден"}
+        return user_data(user)
+
+    async def handle_users_request(self, request: UsersDataRequest) -> Dict[str, Any]:
         """
-        event = message.get("event")
-        data = message.get("data")
+        Пакетный RPC: данные нескольких пользователей одним запросом к БД и одним ответом.
 
-        if event == "token_issued":
-            user_id = data.get("user_id")
-            username = data.get("username")
-            log.info(
-                f"Обработано событие: токен выдан для пользователя {username} (ID: {user_id})."
-            )
-            # Логика обработки события
-        elif event == "token_validated":
-            username = data.get("username")
-            log.info(
-                f"Обработано событие: токен подтвержден для пользователя {username}."
+        :param request: Списки имён и/или ID пользователей.
+        :return: {"users": [...], "not_found": {"usernames": [...], "ids": [...]}}.
+        """
+        log.debug(
+            "Получен пакетный запрос данных: %d имён, %d ID",
+            len(request.usernames),
+            len(request.ids),
+        )
+        async with db_helper.session() as session:  # Только primary, как выше
+            users = await users_crud.crud_user.get_users_by_usernames_or_ids(
+                db=session, usernames=request.usernames, ids=request.ids
             )
-            # Логика обработки события
-        else:
-            log.warning(f"Неизвестное событие: {event}.")
+        found_usernames = {user.username.lower() for user in users}
+        found_ids = {user.id for user in users}
+        return {
+            "users": [user_data(user) for user in users],
+            "not_found": {
+                "usernames": [
+                    u for u in request.usernames if u.lower() not in found_usernames
+                ],
+                "ids": [i for i in request.ids if i not in found_ids],
+            },
+        }
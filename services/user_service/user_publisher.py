@@ -1,6 +1,6 @@
 import logging
 from enum import Enum
-from typing import Dict, Any
+from typing import Dict, Any, Iterable
 
 from rabbit.base_aio import ServicePublisher
 
@@ -24,7 +24,9 @@ class UserPublisher(ServicePublisher):
         """
         Публикует событие пользователя и ждет подтверждения от auth сервиса
         """
-        log.info(f"Публикация {event_type} события для пользователя {user_data}")
+        log.debug(
+            "Публикация %s события для пользователя %s", event_type, user_data.username
+        )
         message = {
             "event_type": event_type,
             "user_data": {
@@ -35,14 +37,48 @@ class UserPublisher(ServicePublisher):
 
         # Отправляем сообщение
         try:
-            await self.publish_message(message)
-            log.info(
-                f"✅ Сообщение {message} успешно отправлено в обменник {self.config.exchange_name}"
+            # Тип события - ключ маршрутизации: событие получат только подписанные на него очереди
+            await self.publish_message(message, routing_key=UserEvent(event_type).value)
+            log.debug(
+                "✅ Событие %s успешно отправлено в обменник %s",
+                event_type,
+                self.config.exchange_name,
             )
         except Exception as e:
-            log.error(f"❌ Ошибка отправки сообщения {message}: {str(e)}")
+            # Тело сообщения не логируем: в нём хеш пароля
+            log.error(
+                "❌ Ошибка отправки события %s для пользователя %s: %s",
+                event_type,
+                user_data.username,
+                e,
+            )
             # Возвращаем ошибку вместо raise, чтобы не прерывать создание пользователя
             return {
                 "status": "error",
                 "message": f"Failed to sync with auth service: {str(e)}",
             }
+
+    async def publish_user_events(
+        self, event_type: UserEvent, users_data: Iterable[Any]
+    ) -> int:
+        """
+        Публикует пачку событий одного типа (массовый импорт): подтверждения
+        брокера ожидаются одновременно, а не по одному на пользователя.
+
+        :return: Количество отправленных событий.
+        """
+        messages = [
+            {
+                "event_type": event_type,
+                "user_data": {
+                    **user_data.dict(),
+                    "hashed_password": user_data.hashed_password.decode(),
+                },
+            }
+            for user_data in users_data
+        ]
+        if not messages:
+            return 0
+        return await self.publish_many(
+            messages, routing_key=UserEvent(event_type).value
+        )
@@ -0,0 +1,120 @@
+"""
+Потоковый разбор файлов импорта: CSV (первая строка - заголовок) и NDJSON.
+
+Тело читается порциями байтов, в памяти - только текущая запись. Запись
+CSV может занимать несколько строк: перевод строки внутри поля в кавычках
+не разрывает запись.
+"""
+
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# Одна запись входного файла: (номер первой строки, запись или None, ошибка разбора)
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+# Состояния разбора строки CSV (диалект excel)
+_FIELD_START, _IN_FIELD, _IN_QUOTES, _QUOTE_IN_QUOTES = range(4)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Строки потока байтов (UTF-8, BOM допускается) без накопления всего тела."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+def ends_in_quotes(line: str, in_quotes: bool = False) -> bool:
+    """
+    Остаётся ли поле CSV открытым в кавычках после строки.
+
+    Кавычка открывает поле только в его начале, "" внутри поля - экранированная
+    кавычка; кавычки в середине поля без кавычек - обычные символы (как в csv).
+
+    :param line: Строка без перевода строки.
+    :param in_quotes: Было ли поле открыто в кавычках до этой строки.
+    """
+    state = _IN_QUOTES if in_quotes else _FIELD_START
+    for char in line:
+        if state == _IN_QUOTES:
+            if char == '"':
+                state = _QUOTE_IN_QUOTES
+        elif char == ",":
+            state = _FIELD_START
+        elif state == _FIELD_START and char == '"':
+            state = _IN_QUOTES
+        elif state == _QUOTE_IN_QUOTES and char == '"':
+            state = _IN_QUOTES
+        else:
+            state = _IN_FIELD
+    return state == _IN_QUOTES
+
+
+async def iter_csv_rows(
+    lines: AsyncIterator[str],
+) -> AsyncIterator[Tuple[int, Optional[List[str]]]]:
+    """
+    Строки таблицы CSV с номером первой строки файла; многострочная запись
+    собирается целиком и разбирается одним csv.reader.
+
+    Незакрытые кавычки в конце файла - (номер, None).
+    """
+    pending: List[str] = []
+    start = line_no = 0
+    in_quotes = False
+    async for line in lines:
+        line_no += 1
+        if not pending:
+            if not line.strip():
+                continue
+            start = line_no
+        pending.append(line)
+        in_quotes = ends_in_quotes(line, in_quotes)
+        if in_quotes:
+            continue
+        yield start, next(csv.reader(line + "\n" for line in pending))
+        pending = []
+    if pending:
+        yield start, None
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Record]:
+    """
+    Записи CSV (первая строка - заголовок с именами полей UserCreate) или NDJSON.
+    """
+    if fmt == "csv":
+        header: Optional[List[str]] = None
+        async for line_no, values in iter_csv_rows(iter_lines(chunks)):
+            if values is None:
+                yield line_no, None, "Незакрытые кавычки в поле"
+            elif header is None:
+                header = [name.strip() for name in values]
+            elif len(values) != len(header):
+                yield line_no, None, "Количество столбцов не совпадает с заголовком"
+            else:
+                # Пустые ячейки - отсутствующие необязательные поля
+                yield line_no, {k: v for k, v in zip(header, values) if v != ""}, None
+        return
+
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Некорректный JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "Ожидался JSON-объект"
+            continue
+        yield line_no, record, None
@@ -0,0 +1,109 @@
+"""
+Курсорная (keyset) пагинация и потоковая выгрузка NDJSON.
+
+Вместо OFFSET следующая страница начинается после последнего ключа
+предыдущей (WHERE key > :last ORDER BY key LIMIT n) - стоимость запроса
+не зависит от номера страницы, если ключ проиндексирован.
+"""
+
+import base64
+import binascii
+import json
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Callable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_cursor(value: Any) -> str:
+    """Непрозрачный курсор из значения ключа последней строки."""
+    raw = json.dumps({"after": value}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Any:
+    """
+    Значение ключа из курсора (None - первая страница).
+
+    :raises HTTPException: 400, если курсор повреждён.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return json.loads(raw)["after"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор страницы.",
+        )
+
+
+async def keyset_page(
+    db: AsyncSession,
+    stmt: Select,
+    key: InstrumentedAttribute,
+    cursor: Optional[str],
+    limit: int,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Страница ORM-объектов по возрастанию уникального ключа.
+
+    Запрашивается limit + 1 строка: лишняя строка показывает, что есть
+    следующая страница, без отдельного COUNT.
+
+    :param stmt: Запрос без ORDER BY/LIMIT (фильтры уже применены).
+    :param key: Уникальный индексированный столбец (например, Tier.id).
+    :param cursor: Курсор из предыдущей страницы.
+    :param limit: Размер страницы.
+    :return: Объекты страницы и курсор следующей (или None).
+    """
+    after = decode_cursor(cursor)
+    if after is not None:
+        stmt = stmt.where(key > after)
+    result = await db.execute(stmt.order_by(key).limit(limit + 1))
+    items = list(result.scalars().all())
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(getattr(items[-1], key.key))
+
+
+async def stream_ndjson(
+    session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+    stmt: Select,
+    serialize: Callable[[Mapping[str, Any]], Mapping[str, Any]] = dict,
+    yield_per: int = 500,
+) -> AsyncIterator[bytes]:
+    """
+    Строки запроса в формате NDJSON через серверный курсор.
+
+    В памяти одновременно не больше yield_per строк. Сессия открывается
+    внутри генератора: зависимость session_getter закрывается раньше,
+    чем StreamingResponse дочитает генератор.
+
+    :param session_factory: Контекстный менеджер сессии (db_helper.session).
+    :param stmt: Запрос столбцов (строки отдаются как mapping).
+    :param serialize: Преобразование строки в JSON-совместимый словарь.
+    :param yield_per: Размер порции серверного курсора.
+    """
+    async with session_factory() as db:
+        result = await db.stream(stmt.execution_options(yield_per=yield_per))
+        async for rows in result.mappings().partitions():
+            yield "".join(
+                json.dumps(serialize(row), ensure_ascii=False, default=str) + "\n"
+                for row in rows
+            ).encode("utf-8")
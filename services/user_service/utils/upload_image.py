@@ -1,11 +1,26 @@
+import hashlib
 import os
-from fastapi import UploadFile
+import tempfile
+from typing import Union
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
 from .slug_generate import slugify
 
 # Константы для работы с файлами
 MEDIA_DIR = "media"
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/jpg"}
+# Расширение сохранённого файла - по типу содержимого, а не по имени от клиента
+IMAGE_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/jpg": ".jpg"}
 MAX_IMAGE_SIZE = 10_485_760  # 10MB в байтах
+CHUNK_SIZE = 64 * 1024  # Размер порции при чтении загрузки (байт)
+# Запас на границы multipart и текстовые поля формы сверх самого изображения
+MULTIPART_OVERHEAD = 64 * 1024
+HASH_LENGTH = 16  # Символов sha256 содержимого в имени файла
 
 
 class ImageUploadError(Exception):
@@ -14,13 +29,93 @@ class ImageUploadError(Exception):
     pass
 
 
-async def save_image(image: UploadFile, title: str) -> str:
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI-middleware: ограничение размера multipart-запросов до разбора формы.
+
+    Starlette сохраняет часть multipart целиком (в память или во временный
+    файл) ещё до вызова обработчика, поэтому проверка в save_image срабатывает
+    только после того, как весь файл получен. Здесь запрос с Content-Length
+    больше предела отклоняется сразу, а без Content-Length (chunked) - как
+    только прочитано больше max_body_size байт.
+
+    Подключается через app.add_middleware(UploadSizeLimitMiddleware).
+    """
+
+    def __init__(
+        self, app: ASGIApp, max_body_size: int = MAX_IMAGE_SIZE + MULTIPART_OVERHEAD
+    ):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_body_size:
+            response = JSONResponse(
+                {"detail": "Размер запроса превышает допустимый"},
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # FastAPI пробрасывает HTTPException из разбора тела как есть
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Размер запроса превышает допустимый",
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _commit(file, temp_path: str, file_path: str) -> None:
+    """Дописать временный файл на диск и атомарно переименовать его."""
+    file.flush()
+    os.fsync(file.fileno())
+    file.close()
+    # mkstemp создаёт файл с правами 0600 - делаем читаемым, как обычные файлы media
+    os.chmod(temp_path, 0o644)
+    os.replace(temp_path, file_path)
+
+
+async def save_image(image: UploadFile, title: str, record_id: Union[int, str]) -> str:
     """
     Сохраняет загруженное изображение в папку media
 
+    Файл читается порциями по CHUNK_SIZE во временный файл в той же папке;
+    загрузка прерывается, как только размер превысит MAX_IMAGE_SIZE.
+    Размер всего запроса ограничивает UploadSizeLimitMiddleware ещё до
+    разбора формы. Операции с диском выполняются в пуле потоков, готовый
+    файл атомарно переименовывается. Имя - slug названия, id записи и хеш
+    содержимого: у каждой записи свой файл, и delete_image одной записи
+    не удаляет изображение другой с тем же названием и содержимым.
+
     Args:
         image: Загруженный файл изображения
         title: Название услуги для генерации slug
+        record_id: Id записи, которой принадлежит изображение
 
     Returns:
         str: Путь к сохраненному файлу относительно папки media
@@ -33,36 +128,39 @@ async def save_image(image: UploadFile, title: str) -> str:
         raise ImageUploadError(
             "Неподдерживаемый тип файла. Разрешены только JPEG и PNG"
         )
+    try:
+        await run_in_threadpool(os.makedirs, MEDIA_DIR, exist_ok=True)
+        fd, temp_path = await run_in_threadpool(
+            tempfile.mkstemp, dir=MEDIA_DIR, suffix=".part"
+        )
+    except OSError as e:
+        raise ImageUploadError(f"Ошибка при сохранении файла: {str(e)}")
 
-    # Создаем папку media если её нет
-    if not os.path.exists(MEDIA_DIR):
-        os.makedirs(MEDIA_DIR)
-
-    # Генерируем имя файла из slug названия услуги
-    file_extension = os.path.splitext(image.filename)[1]
-    slug = slugify(title)
-    filename = f"{slug}{file_extension}"
-
-    # Если файл с таким именем уже существует, добавляем числовой суффикс
-    counter = 1
-    original_filename = filename
-    while os.path.exists(os.path.join(MEDIA_DIR, filename)):
-        name_without_ext = os.path.splitext(original_filename)[0]
-        filename = f"{name_without_ext}-{counter}{file_extension}"
-        counter += 1
-
-    file_path = os.path.join(MEDIA_DIR, filename)
-
-    # Читаем и проверяем размер файла
-    content = await image.read()
-    if len(content) > MAX_IMAGE_SIZE:
-        raise ImageUploadError("Размер файла превышает 10MB")
-
-    # Сохраняем файл
+    file = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    size = 0
     try:
-        with open(file_path, "wb") as f:
-            f.write(content)
+        while chunk := await image.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_IMAGE_SIZE:
+                raise ImageUploadError("Размер файла превышает 10MB")
+            digest.update(chunk)
+            await run_in_threadpool(file.write, chunk)
+
+        # Генерируем имя файла из slug названия услуги, id записи и хеша содержимого
+        filename = (
+            f"{slugify(title)}-{record_id}-{digest.hexdigest()[:HASH_LENGTH]}"
+            f"{IMAGE_EXTENSIONS[image.content_type]}"
+        )
+        await run_in_threadpool(
+            _commit, file, temp_path, os.path.join(MEDIA_DIR, filename)
+        )
     except Exception as e:
+        # Недописанный временный файл не должен остаться в media
+        await run_in_threadpool(file.close)
+        await run_in_threadpool(_remove, temp_path)
+        if isinstance(e, ImageUploadError):
+            raise
         raise ImageUploadError(f"Ошибка при сохранении файла: {str(e)}")
 
     return filename
@@ -71,6 +169,4 @@ async def save_image(image: UploadFile, title: str) -> str:
 async def delete_image(filename: str) -> None:
     """Удаляет изображение из папки media"""
     if filename:
-        file_path = os.path.join(MEDIA_DIR, filename)
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        await run_in_threadpool(_remove, os.path.join(MEDIA_DIR, filename))
@@ -0,0 +1,80 @@
+"""
+Разбор файлов импорта пользователей (сервис user): CSV с многострочными
+полями в кавычках и NDJSON, тело приходит произвольными порциями байтов.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "services", "user_service")
+)
+
+from utils.import_records import ends_in_quotes, iter_records  # noqa: E402
+
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def collect(data: bytes, fmt: str, size: int = 7):
+    async def scenario():
+        return [record async for record in iter_records(chunked(data, size), fmt)]
+
+    return asyncio.run(scenario())
+
+
+def test_csv_quoted_field_with_newlines():
+    data = (
+        "username,email,first_name\r\n"
+        'alice,alice@example.com,"Alice\r\nSecond line, with comma"\r\n'
+        '\r\nbob,bob@example.com,"say ""hi""\nand\nbye"\r\n'
+        "carol,carol@example.com,\r\n"
+    ).encode()
+    assert collect(data, "csv") == [
+        (
+            2,
+            {
+                "username": "alice",
+                "email": "alice@example.com",
+                "first_name": "Alice\nSecond line, with comma",
+            },
+            None,
+        ),
+        (
+            5,
+            {
+                "username": "bob",
+                "email": "bob@example.com",
+                "first_name": 'say "hi"\nand\nbye',
+            },
+            None,
+        ),
+        (8, {"username": "carol", "email": "carol@example.com"}, None),
+    ]
+
+
+def test_csv_unterminated_quotes_and_column_count():
+    data = 'username,email\nalice\nbob,"open\nstill open\n'.encode()
+    assert collect(data, "csv", size=3) == [
+        (2, None, "Количество столбцов не совпадает с заголовком"),
+        (3, None, "Незакрытые кавычки в поле"),
+    ]
+
+
+def test_ends_in_quotes_follows_csv_quoting():
+    assert ends_in_quotes('a,"b')
+    assert not ends_in_quotes('a,"b""c"')
+    assert not ends_in_quotes('a,b"c')  # Кавычка в середине поля - обычный символ
+    assert not ends_in_quotes('end"', in_quotes=True)
+    assert ends_in_quotes('end"",x', in_quotes=True)
+
+
+def test_ndjson_lines():
+    data = b'{"username": "alice"}\n\n[1]\nnot json\n'
+    records = collect(data, "ndjson")
+    assert records[0] == (1, {"username": "alice"}, None)
+    assert records[1] == (3, None, "Ожидался JSON-объект")
+    assert records[2][0] == 4 and records[2][2].startswith("Некорректный JSON")
@@ -0,0 +1,164 @@
+"""
+Брокер в памяти (memory://): публикация, потребление и RPC через
+ServicePublisher / ServiceConsumer, а также семантика RabbitMQ, на которую
+опирается остановка консьюмера.
+"""
+
+import asyncio
+import uuid
+
+import aio_pika
+
+from rabbit.aio_config import RabbitMQConfig
+from rabbit.base_aio import ServiceConsumer, ServicePublisher
+from rabbit.memory_broker import MemoryBroker, MemoryConnection
+from rabbit.supervisor import RabbitSupervisor
+
+
+def make_config(url: str) -> RabbitMQConfig:
+    prefix = f"test_{uuid.uuid4().hex[:8]}"
+    return RabbitMQConfig(
+        exchange_name=f"{prefix}_exchange",
+        routing_key=f"{prefix}_queue",
+        dlx_name=f"{prefix}_dlx",
+        dlx_key=f"{prefix}_dlq",
+        connection_url=url,
+        binding_keys=[f"{prefix}_queue", "test.#"],
+    )
+
+
+def test_publish_consume_and_rpc_round_trip():
+    async def scenario():
+        url = f"memory://{uuid.uuid4().hex}"
+        supervisor = RabbitSupervisor(url)
+        server_config, client_config = make_config(url), make_config(url)
+        received = asyncio.Queue()
+
+        consumer = ServiceConsumer(server_config, supervisor, prefetch_count=4)
+
+        @consumer.on("test.echo")
+        async def echo(payload):
+            return {"value": payload["value"] * 2}
+
+        await consumer.start(message_callback=received.put)
+
+        publisher = ServicePublisher(server_config, supervisor)
+        await publisher.publish_message({"value": 1}, routing_key="test.event")
+        assert await asyncio.wait_for(received.get(), 1) == {"value": 1}
+
+        client = ServicePublisher(client_config, supervisor)
+        response = await client.rpc_request(
+            {"value": 21},
+            routing_key=server_config.routing_key,
+            message_type="test.echo",
+            timeout=1,
+        )
+        assert response == {"value": 42}
+
+        await consumer.stop(drain_timeout=1)
+        await supervisor.close()
+
+    asyncio.run(scenario())
+
+
+def test_channel_close_requeues_unacked_messages():
+    async def scenario():
+        connection = MemoryConnection(MemoryBroker())
+        channel = await connection.channel()
+        await channel.set_qos(prefetch_count=2)
+        queue = await channel.declare_queue("jobs")
+        delivered = []
+
+        async def hold(message):
+            delivered.append(message)
+
+        await queue.consume(hold)
+        for body in (b"1", b"2", b"3"):
+            await channel.default_exchange.publish(
+                aio_pika.Message(body=body), routing_key="jobs"
+            )
+        await asyncio.sleep(0)
+        assert [m.body for m in delivered] == [b"1", b"2"]
+
+        await channel.close()
+        assert [m.body for m in queue.state.messages] == [b"1", b"2", b"3"]
+        assert [m.redelivered for m in queue.state.messages] == [True, True, False]
+
+        other = await connection.channel()
+        redelivered = []
+        other_queue = await other.declare_queue("jobs")
+        await other_queue.consume(lambda m: _append(redelivered, m))
+        await asyncio.sleep(0)
+        assert [m.body for m in redelivered] == [b"1", b"2", b"3"]
+        await connection.close()
+
+    asyncio.run(scenario())
+
+
+async def _append(items, message):
+    items.append(message)
+    await message.ack()
+
+
+def test_exclusive_queue_deleted_with_connection():
+    async def scenario():
+        broker = MemoryBroker()
+        connection = MemoryConnection(broker)
+        channel = await connection.channel()
+        reply_queue = await channel.declare_queue(exclusive=True)
+        shared_queue = await channel.declare_queue("shared")
+        await connection.close()
+        assert reply_queue.name not in broker.queues
+        assert shared_queue.name in broker.queues
+
+    asyncio.run(scenario())
+
+
+def test_expired_message_is_dead_lettered():
+    async def scenario():
+        connection = MemoryConnection(MemoryBroker())
+        channel = await connection.channel()
+        dlx = await channel.declare_exchange("dlx", aio_pika.ExchangeType.FANOUT)
+        dlq = await channel.declare_queue("dlq")
+        await dlq.bind(dlx)
+        queue = await channel.declare_queue(
+            "rpc", arguments={"x-dead-letter-exchange": "dlx"}
+        )
+        await channel.default_exchange.publish(
+            aio_pika.Message(body=b"late", expiration=0.01), routing_key="rpc"
+        )
+        await asyncio.sleep(0.02)
+
+        assert await queue.get_message_count() == 0
+        assert [m.body for m in dlq.state.messages] == [b"late"]
+        await connection.close()
+
+    asyncio.run(scenario())
+
+
+def test_missing_dlx_drops_message():
+    async def scenario():
+        connection = MemoryConnection(MemoryBroker())
+        channel = await connection.channel()
+        queue = await channel.declare_queue(
+            "jobs", arguments={"x-dead-letter-exchange": "missing"}
+        )
+        await channel.default_exchange.publish(
+            aio_pika.Message(body=b"rejected"), routing_key="jobs"
+        )
+        rejected = asyncio.get_running_loop().create_future()
+
+        async def reject(message):
+            try:
+                await message.reject()
+            except Exception as e:
+                rejected.set_exception(e)
+            else:
+                rejected.set_result(None)
+
+        await queue.consume(reject)
+        await asyncio.wait_for(rejected, 1)
+        assert await queue.get_message_count() == 0
+        await connection.close()
+
+    asyncio.run(scenario())
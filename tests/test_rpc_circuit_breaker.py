@@ -0,0 +1,35 @@
+"""
+RPC при недоступном брокере: ответ-ошибка вместо исключения и размыкание цепи.
+"""
+
+import asyncio
+
+from rabbit.aio_config import RabbitMQConfig
+from rabbit.base_aio import ServicePublisher
+from rabbit.circuit_breaker import CircuitState
+from rabbit.supervisor import RabbitSupervisor
+
+
+def test_rpc_opens_circuit_when_broker_is_down():
+    async def scenario():
+        config = RabbitMQConfig(
+            exchange_name="breaker_exchange",
+            routing_key="breaker_queue",
+            dlx_name="breaker_dlx",
+            dlx_key="breaker_dlq",
+            connection_url="memory://breaker",
+        )
+        publisher = ServicePublisher(
+            config, RabbitSupervisor(config.connection_url), failure_threshold=2
+        )
+
+        async def broker_down() -> None:
+            raise ConnectionError("broker down")
+
+        publisher.start = broker_down
+        for _ in range(2):
+            response = await publisher.rpc_request({}, message_type="test.ping")
+            assert response == {"status": "error", "message": "Service unavailable"}
+        assert publisher.circuit_breaker("breaker_queue").state is CircuitState.OPEN
+
+    asyncio.run(scenario())